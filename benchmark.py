@@ -0,0 +1,364 @@
+import argparse
+import contextlib
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import networkx as nx
+import numpy as np
+
+import dynamic
+
+# --- Geração de Grafos Sintéticos (Redes Viárias Simuladas) ---
+def _nomear_nos(quantidade: int, densidade_bases: float, rng: random.Random) -> list:
+    """
+    Gera os nomes dos nós: uma fração `densidade_bases` vira 'Base_i' (reconhecida por
+    `dynamic.listar_bases`) e o restante 'Local_i'. Sempre há ao menos uma base.
+    """
+    quantidade_bases = max(1, round(quantidade * densidade_bases))
+    bases = set(rng.sample(range(quantidade), quantidade_bases))
+    return [f"Base_{i}" if i in bases else f"Local_{i}" for i in range(quantidade)]
+
+def gerar_grafo_grade(quantidade_nos: int, densidade_bases: float = 0.01, seed: int = 42, grafo=None):
+    """
+    Grade quadrada (~`quantidade_nos` nós) com rotas nos dois sentidos entre vizinhos,
+    cada sentido com peso próprio (subidas/descidas), simulando uma malha viária urbana.
+    """
+    rng = random.Random(seed)
+    lado = max(2, math.isqrt(quantidade_nos))
+    nomes = _nomear_nos(lado * lado, densidade_bases, rng)
+    grafo = nx.DiGraph() if grafo is None else grafo
+    grafo.add_nodes_from(nomes)
+    arestas = []
+    for linha in range(lado):
+        for coluna in range(lado):
+            no = nomes[linha * lado + coluna]
+            if coluna + 1 < lado:
+                vizinho = nomes[linha * lado + coluna + 1]
+                arestas.append((no, vizinho, rng.randint(1, 10)))
+                arestas.append((vizinho, no, rng.randint(1, 10)))
+            if linha + 1 < lado:
+                vizinho = nomes[(linha + 1) * lado + coluna]
+                arestas.append((no, vizinho, rng.randint(1, 10)))
+                arestas.append((vizinho, no, rng.randint(1, 10)))
+    grafo.add_weighted_edges_from(arestas)
+    return grafo
+
+def gerar_grafo_geometrico(quantidade_nos: int, densidade_bases: float = 0.01, grau_medio: float = 6.0, seed: int = 42, grafo=None):
+    """
+    Grafo geométrico aleatório: pontos no quadrado unitário ligados aos vizinhos dentro de um
+    raio escolhido para o `grau_medio` desejado, com peso proporcional à distância.
+    Usa uma grade de baldes (O(N)) em vez de comparar todos os pares (O(N²)).
+    """
+    rng = random.Random(seed)
+    nomes = _nomear_nos(quantidade_nos, densidade_bases, rng)
+    pontos = [(rng.random(), rng.random()) for _ in range(quantidade_nos)]
+    raio = math.sqrt(grau_medio / (math.pi * quantidade_nos))
+    baldes = {}
+    for i, (x, y) in enumerate(pontos):
+        baldes.setdefault((int(x / raio), int(y / raio)), []).append(i)
+
+    grafo = nx.DiGraph() if grafo is None else grafo
+    grafo.add_nodes_from(nomes)
+    arestas = []
+    for (bx, by), membros in baldes.items():
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for j in baldes.get((bx + dx, by + dy), ()):
+                    xj, yj = pontos[j]
+                    for i in membros:
+                        if i < j:
+                            distancia = math.hypot(pontos[i][0] - xj, pontos[i][1] - yj)
+                            if distancia <= raio:
+                                peso = 1 + round(distancia * 1000)
+                                arestas.append((nomes[i], nomes[j], peso))
+                                arestas.append((nomes[j], nomes[i], peso + rng.randint(0, 2)))
+    grafo.add_weighted_edges_from(arestas)
+    return grafo
+
+GERADORES_GRAFO = {'grade': gerar_grafo_grade, 'geometrico': gerar_grafo_geometrico}
+
+def gerar_fluxo_ocorrencias(nos: list, quantidade: int, seed: int = 42):
+    """
+    Gera leituras sintéticas (localizacao, temp, umid_ar, umid_solo) nos mesmos intervalos
+    usados por `simular_chamadas_aleatorias`, prontas para `dynamic.pipeline_ingestao`.
+    """
+    rng = random.Random(seed)
+    for _ in range(quantidade):
+        yield (rng.choice(nos), rng.randint(15, 45), rng.randint(5, 95), rng.randint(0, 90))
+
+# --- Medição ---
+def _medir(funcao, repeticoes: int = 1):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return time.perf_counter() - inicio
+
+# Operações rápidas são repetidas para reduzir o ruído da medição
+REPETICOES_CONSULTA = 20
+
+def _resultado(cenario: str, operacao: str, operacoes: int, segundos: float) -> dict:
+    return {
+        'cenario': cenario,
+        'operacao': operacao,
+        'operacoes': operacoes,
+        'total_s': segundos,
+        'por_operacao_us': segundos / operacoes * 1e6 if operacoes else 0.0,
+    }
+
+def carregar_cenario(tipo: str, quantidade_nos: int, densidade_bases: float, seed: int):
+    """Substitui o grafo global do simulador por um grafo sintético e zera as ocorrências."""
+    dynamic.rede_localizacoes_graph.clear()
+    GERADORES_GRAFO[tipo](quantidade_nos, densidade_bases, seed=seed, grafo=dynamic.rede_localizacoes_graph)
+    dynamic.roteador_pyrosai.invalidar()
+    dynamic.ocorrencias_ativas.limpar()
+    dynamic.fila_prioridade_atendimento.limpar()
+    dynamic.pyrosai_avaliar_criticidade_area.cache_clear()
+
+def executar_cenario(tipo: str, quantidade_nos: int, densidade_bases: float, quantidade_ocorrencias: int,
+                     despachos: int, seed: int) -> list:
+    """
+    Mede, em um grafo sintético, a avaliação de criticidade (escalar e em lote), a ingestão,
+    o reparo incremental de rotas após bloqueios, o despacho (`despachar_proxima_ocorrencia`,
+    núcleo de `atender_proxima_ocorrencia`), a busca por severidade, o relatório e o resumo
+    por localização e a exportação do relatório detalhado.
+    """
+    cenario = f"{tipo}-{quantidade_nos}-b{densidade_bases:g}"
+    resultados = []
+    rng = random.Random(seed)
+
+    inicio = time.perf_counter()
+    carregar_cenario(tipo, quantidade_nos, densidade_bases, seed)
+    resultados.append(_resultado(cenario, 'construcao_grafo', 1, time.perf_counter() - inicio))
+    nos = list(dynamic.rede_localizacoes_graph.nodes)
+
+    # Avaliação escalar: o `print` de cada cálculo fora do cache faz parte do custo real da função
+    leituras = [(rng.randint(15, 45), rng.randint(5, 95), rng.randint(0, 90)) for _ in range(quantidade_ocorrencias)]
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        segundos = _medir(lambda: [dynamic.pyrosai_avaliar_criticidade_area(*leitura) for leitura in leituras])
+    resultados.append(_resultado(cenario, 'criticidade_escalar', len(leituras), segundos))
+
+    temps, umids_ar, umids_solo = (np.array(coluna) for coluna in zip(*leituras))
+    segundos = _medir(lambda: dynamic.pyrosai_avaliar_criticidade_lote(temps, umids_ar, umids_solo))
+    resultados.append(_resultado(cenario, 'criticidade_lote', len(leituras), segundos))
+
+    estatisticas = dynamic.ingerir_leituras(gerar_fluxo_ocorrencias(nos, quantidade_ocorrencias, seed))
+    resultados.append(_resultado(cenario, 'ingestao', estatisticas.leituras,
+                                 estatisticas.tempo_leitura + estatisticas.tempo_pontuacao + estatisticas.tempo_registro))
+
+    segundos = _medir(lambda: dynamic.roteador_pyrosai.base_mais_proxima(nos[0]))
+    resultados.append(_resultado(cenario, 'tabela_roteamento', 1, segundos))
+
+    # Bloqueio de estradas: remove arestas aleatórias e repara só as subárvores afetadas
+    arestas = list(dynamic.rede_localizacoes_graph.edges(data='weight'))
+    bloqueios = rng.sample(arestas, min(REPETICOES_CONSULTA, len(arestas)))
+    segundos = _medir(lambda: [dynamic.remover_rota(origem, destino) for origem, destino, _ in bloqueios])
+    resultados.append(_resultado(cenario, 'reparo_bloqueio', len(bloqueios), segundos))
+    dynamic.atualizar_rotas_em_lote(bloqueios)
+
+    for severidade in dynamic.SEVERIDADES:
+        codigo = dynamic.SEVERIDADES[severidade]
+        segundos = _medir(lambda: dynamic.ocorrencias_ativas.por_severidade(codigo), REPETICOES_CONSULTA)
+        resultados.append(_resultado(cenario, f'busca_severidade_{severidade.lower()}', REPETICOES_CONSULTA, segundos))
+
+    segundos = _medir(dynamic.montar_relatorio_por_localizacao, REPETICOES_CONSULTA)
+    resultados.append(_resultado(cenario, 'relatorio_localizacao', REPETICOES_CONSULTA, segundos))
+
+    segundos = _medir(dynamic.montar_resumo_por_localizacao, REPETICOES_CONSULTA)
+    resultados.append(_resultado(cenario, 'resumo_localizacao', REPETICOES_CONSULTA, segundos))
+
+    segundos = _medir(lambda: dynamic.exportar_relatorio_detalhado(os.devnull, formato='csv'))
+    resultados.append(_resultado(cenario, 'exportacao_relatorio', len(dynamic.ocorrencias_ativas), segundos))
+
+    despachos = min(despachos, len(dynamic.fila_prioridade_atendimento))
+    segundos = _medir(dynamic.despachar_proxima_ocorrencia, despachos)
+    resultados.append(_resultado(cenario, 'despacho', despachos, segundos))
+    return resultados
+
+def medir_roteamento_paralelo(cenario: str, quantidade_consultas: int, max_processos: int, seed: int) -> list:
+    """
+    Curva de aceleração do `dynamic.RoteamentoParalelo` de 1 a `max_processos` processos
+    (dobrando a cada passo) para o mesmo lote de consultas base -> local aleatório.
+    A criação do pool e a carga do grafo em cada processo ficam fora da medição.
+    """
+    rng = random.Random(seed)
+    nos = list(dynamic.rede_localizacoes_graph.nodes)
+    bases = dynamic.listar_bases(dynamic.rede_localizacoes_graph)
+    consultas = [(rng.choice(bases), rng.choice(nos)) for _ in range(quantidade_consultas)]
+
+    resultados = []
+    processos = 1
+    tempo_um_processo = None
+    while processos <= max_processos:
+        with dynamic.RoteamentoParalelo(dynamic.rede_localizacoes_graph, processos) as roteamento:
+            roteamento.calcular_rotas(consultas[:processos]) # Aquece: garante os processos iniciados
+            segundos = _medir(lambda: roteamento.calcular_rotas(consultas))
+        tempo_um_processo = tempo_um_processo or segundos
+        resultado = _resultado(cenario, f'rotas_paralelas_{processos}p', len(consultas), segundos)
+        resultado['aceleracao'] = tempo_um_processo / segundos
+        resultados.append(resultado)
+        processos *= 2
+    return resultados
+
+def medir_ingestao_concorrente(cenario: str, quantidade_leituras: int, max_produtores: int, seed: int) -> list:
+    """
+    Vazão da ingestão em um `dynamic.EstadoOcorrenciasConcorrente` com 1 a `max_produtores`
+    processos produtores (dobrando a cada passo), dividindo o mesmo volume de leituras em
+    arquivos CSV, um por produtor: a leitura e a pontuação de cada arquivo são paralelas,
+    o registro no estado é feito pelo processo principal.
+    """
+    nos = list(dynamic.rede_localizacoes_graph.nodes)
+    resultados = []
+    produtores = 1
+    tempo_um_produtor = None
+    with tempfile.TemporaryDirectory() as diretorio:
+        while produtores <= max_produtores:
+            fontes = []
+            for i in range(produtores):
+                caminho = os.path.join(diretorio, f'leituras_{produtores}_{i}.csv')
+                with open(caminho, 'w', encoding='utf-8') as arquivo:
+                    arquivo.write("localizacao,temp,umid_ar,umid_solo\n")
+                    arquivo.writelines(f"{local},{temp},{umid_ar},{umid_solo}\n" for local, temp, umid_ar, umid_solo
+                                       in gerar_fluxo_ocorrencias(nos, quantidade_leituras // produtores, seed + i))
+                fontes.append(caminho)
+            estado = dynamic.EstadoOcorrenciasConcorrente()
+            segundos = _medir(lambda: dynamic.ingerir_leituras_concorrente(fontes, estado))
+            tempo_um_produtor = tempo_um_produtor or segundos
+            resultado = _resultado(cenario, f'ingestao_concorrente_{produtores}p',
+                                   quantidade_leituras // produtores * produtores, segundos)
+            resultado['aceleracao'] = tempo_um_produtor / segundos
+            resultados.append(resultado)
+            produtores *= 2
+    return resultados
+
+def _carregar_lista_arestas_networkx(caminho: str):
+    """Carga equivalente à do `GrafoCSR`, mas em um `nx.DiGraph` (linha de base da comparação)."""
+    grafo = nx.DiGraph()
+    with open(caminho, encoding='utf-8') as arquivo:
+        grafo.add_weighted_edges_from((u, v, float(peso)) for u, v, peso in (linha.split() for linha in arquivo))
+    return grafo
+
+def medir_backend_csr(cenario: str) -> list:
+    """
+    Compara o `nx.DiGraph` e o `dynamic.GrafoCSR` para o grafo do cenário: tempo de carga
+    a partir de uma lista de arestas (e do binário mapeado em memória, no CSR), memória
+    retida pelo grafo carregado (`tracemalloc`, em uma segunda carga) e tempo de montagem
+    da tabela de roteamento.
+    """
+    resultados = []
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'arestas.txt')
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            arquivo.writelines(f"{u} {v} {peso}\n" for u, v, peso in dynamic.rede_localizacoes_graph.edges(data='weight'))
+        dynamic.GrafoCSR.carregar_lista_arestas(caminho).salvar_binario(diretorio)
+
+        backends = [
+            ('networkx', lambda: _carregar_lista_arestas_networkx(caminho)),
+            ('csr', lambda: dynamic.GrafoCSR.carregar_lista_arestas(caminho)),
+            ('csr_mmap', lambda: dynamic.GrafoCSR.carregar_binario(diretorio)),
+        ]
+        for nome, carregar in backends:
+            inicio = time.perf_counter()
+            grafo = carregar()
+            resultados.append(_resultado(cenario, f'carga_{nome}', 1, time.perf_counter() - inicio))
+            tracemalloc.start()
+            copia = carregar()
+            resultados[-1]['memoria_mb'] = tracemalloc.get_traced_memory()[0] / 1e6
+            tracemalloc.stop()
+            del copia
+
+            roteador, destino = dynamic.RoteadorPyrosAI(grafo), next(iter(grafo))
+            segundos = _medir(lambda: roteador.base_mais_proxima(destino))
+            resultados.append(_resultado(cenario, f'tabela_roteamento_{nome}', 1, segundos))
+            del grafo, roteador
+    return resultados
+
+# --- Comparação Entre Execuções ---
+def comparar_resultados(atual: dict, referencia: dict, tolerancia: float) -> list:
+    """
+    Compara o tempo por operação de cada (cenário, operação) presente nas duas execuções.
+    Retorna as regressões: operações mais lentas que a referência além da `tolerancia` (fração).
+    """
+    base = {(r['cenario'], r['operacao']): r for r in referencia['resultados']}
+    regressoes = []
+    for resultado in atual['resultados']:
+        anterior = base.get((resultado['cenario'], resultado['operacao']))
+        if anterior is None or anterior['por_operacao_us'] <= 0:
+            continue
+        razao = resultado['por_operacao_us'] / anterior['por_operacao_us']
+        if razao > 1 + tolerancia:
+            regressoes.append({**resultado, 'referencia_us': anterior['por_operacao_us'], 'razao': razao})
+    return regressoes
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks do Projeto Artemis em grafos e ocorrências sintéticas")
+    parser.add_argument("--tipo", choices=sorted(GERADORES_GRAFO), nargs='+', default=['grade', 'geometrico'])
+    parser.add_argument("--nos", type=int, nargs='+', default=[10_000, 100_000], help="tamanhos de grafo (ex: 10000 1000000)")
+    parser.add_argument("--densidade-bases", type=float, default=0.01, help="fração de nós que são bases de equipes")
+    parser.add_argument("--ocorrencias", type=int, default=100_000, help="leituras sintéticas por cenário")
+    parser.add_argument("--despachos", type=int, default=1_000, help="despachos medidos por cenário")
+    parser.add_argument("--paralelo", type=int, default=0, metavar="N", help="mede a curva de aceleração do roteamento paralelo de 1 a N processos")
+    parser.add_argument("--consultas-paralelas", type=int, default=2_000, help="consultas de rota por medição paralela")
+    parser.add_argument("--produtores", type=int, default=0, metavar="N", help="mede a ingestão concorrente de 1 a N processos produtores")
+    parser.add_argument("--csr", action="store_true", help="compara carga, memória e roteamento do GrafoCSR com o nx.DiGraph")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--saida", help="arquivo JSON para gravar os resultados")
+    parser.add_argument("--comparar", metavar="JSON", help="resultados de referência para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="piora relativa aceita antes de acusar regressão")
+    argumentos = parser.parse_args(argv)
+
+    relatorio = {
+        'meta': {
+            'data': datetime.datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'seed': argumentos.seed,
+        },
+        'resultados': [],
+    }
+    for tipo in argumentos.tipo:
+        for quantidade_nos in argumentos.nos:
+            print(f"--- Cenário {tipo} com {quantidade_nos} nós ---", file=sys.stderr)
+            resultados = executar_cenario(tipo, quantidade_nos, argumentos.densidade_bases,
+                                          argumentos.ocorrencias, argumentos.despachos, argumentos.seed)
+            if argumentos.paralelo:
+                resultados += medir_roteamento_paralelo(resultados[0]['cenario'], argumentos.consultas_paralelas,
+                                                        argumentos.paralelo, argumentos.seed)
+            if argumentos.produtores:
+                resultados += medir_ingestao_concorrente(resultados[0]['cenario'], argumentos.ocorrencias,
+                                                         argumentos.produtores, argumentos.seed)
+            if argumentos.csr:
+                resultados += medir_backend_csr(resultados[0]['cenario'])
+            for resultado in resultados:
+                print(f"  {resultado['operacao']:<28} {resultado['operacoes']:>9} ops  "
+                      f"{resultado['total_s']:9.4f}s  {resultado['por_operacao_us']:12.2f} us/op"
+                      + (f"  {resultado['memoria_mb']:9.1f} MB" if 'memoria_mb' in resultado else ''), file=sys.stderr)
+            relatorio['resultados'].extend(resultados)
+
+    if argumentos.saida:
+        with open(argumentos.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump(relatorio, arquivo, indent=2)
+    else:
+        json.dump(relatorio, sys.stdout, indent=2)
+        print()
+
+    if argumentos.comparar:
+        with open(argumentos.comparar, encoding='utf-8') as arquivo:
+            referencia = json.load(arquivo)
+        regressoes = comparar_resultados(relatorio, referencia, argumentos.tolerancia)
+        for regressao in regressoes:
+            print(f"  REGRESSÃO {regressao['cenario']} / {regressao['operacao']}: "
+                  f"{regressao['por_operacao_us']:.2f} us/op vs {regressao['referencia_us']:.2f} us/op "
+                  f"({regressao['razao']:.2f}x)", file=sys.stderr)
+        return 1 if regressoes else 0
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,8 +1,28 @@
-import datetime
+import argparse
+import array
+import asyncio
+import bisect
+import concurrent.futures
+import csv
+import json
+import multiprocessing
+import os
+import pickle
+import queue
 import random
+import signal
+import sqlite3
 import heapq
+import http.server
+import itertools
+import struct
+import threading
+import time
 import networkx as nx
-from functools import lru_cache
+import numpy as np
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from functools import lru_cache, wraps
 
 # --- Constantes e Configurações Simuladas (mantidas) ---
 SEVERIDADES = {
@@ -11,12 +31,663 @@ SEVERIDADES = {
     "ALTA": 3,
     "CRITICA": 4
 }
+NOMES_SEVERIDADE = {codigo: nome for nome, codigo in SEVERIDADES.items()}
 STATUS_OCORRENCIA = ["DETECTADA", "EM_ATENDIMENTO", "SOB_CONTROLE", "EXTINTA"]
 
+# Instantes são guardados como segundos desde a época (float); o texto só é gerado na exibição
+FORMATO_DATA = "%Y-%m-%d %H:%M:%S"
+
+def formatar_timestamp(instante: float) -> str:
+    """Converte um instante numérico (segundos desde a época) em data/hora local legível."""
+    return time.strftime(FORMATO_DATA, time.localtime(instante))
+
+def interpretar_data(valor) -> float:
+    """Aceita um instante numérico ou um texto no `FORMATO_DATA` e devolve o instante numérico."""
+    if isinstance(valor, str):
+        return time.mktime(time.strptime(valor, FORMATO_DATA))
+    return valor
+
+# --- Registro Compacto de Ocorrência e Repositório Indexado ---
+@dataclass(slots=True)
+class Ocorrencia:
+    """
+    Registro de uma ocorrência de queimada simulada.
+    Usa `__slots__` (sem `__dict__` por instância) e guarda as leituras dos sensores
+    como campos simples, em vez de dicionários aninhados, para reduzir a memória
+    quando o sistema mantém milhões de ocorrências.
+    """
+    ID: int
+    severidade_num: int
+    localizacao: str
+    status: str
+    timestamp_deteccao: float
+    temp: int
+    umid_ar: int
+    umid_solo: int
+
+    @property
+    def severidade(self) -> str:
+        return NOMES_SEVERIDADE[self.severidade_num]
+
+    @property
+    def data_deteccao(self) -> str:
+        return formatar_timestamp(self.timestamp_deteccao)
+
+class AlocadorIds:
+    """
+    Gera IDs inteiros sequenciais de forma atômica entre threads. `reservar` devolve o
+    primeiro ID de um bloco contíguo, de modo que um lote inteiro custa uma única
+    aquisição da trava (e dois produtores nunca recebem o mesmo ID).
+    """
+
+    def __init__(self, proximo: int = 1):
+        self._proximo = proximo
+        self._trava = threading.Lock()
+
+    @property
+    def proximo(self) -> int:
+        """Próximo ID a ser entregue (apenas consulta, não reserva)."""
+        return self._proximo
+
+    def reservar(self, quantidade: int = 1) -> int:
+        with self._trava:
+            primeiro = self._proximo
+            self._proximo += quantidade
+            return primeiro
+
+    def avancar_para(self, proximo: int):
+        """Garante que os próximos IDs sejam >= `proximo` (ex: após restaurar ocorrências)."""
+        with self._trava:
+            if proximo > self._proximo:
+                self._proximo = proximo
+
+    def reiniciar(self, proximo: int = 1):
+        with self._trava:
+            self._proximo = proximo
+
+class RepositorioOcorrencias:
+    """
+    Armazena as ocorrências por ID (dicionário, acesso O(1)) e mantém índices secundários
+    atualizados incrementalmente a cada inserção ou mudança de status/severidade:
+      - por (severidade_num, status), que cobre buscas por severidade e por status;
+      - por localização, usado nos relatórios.
+    Cada índice é um dicionário {ID: None} (conjunto que preserva a ordem de inserção),
+    então as consultas custam O(resultado) em vez de varrer todas as ocorrências.
+    Contadores por (localização, status) acompanham os índices, de modo que os resumos
+    custam O(localizações) (as contagens por severidade/status são os tamanhos do índice).
+    Os IDs vêm de um `AlocadorIds` próprio, que acompanha também os IDs inseridos de fora
+    (ex: restauração do estado persistido).
+    Observadores (ex: `PersistenciaEstado`) são notificados de cada inserção e mudança.
+    """
+
+    def __init__(self):
+        self._registros = {}
+        self._por_severidade_status = defaultdict(dict)
+        self._por_localizacao = defaultdict(dict)
+        self._contagem_localizacao_status = defaultdict(dict)
+        self._ids = AlocadorIds()
+        self._observadores = []
+
+    def adicionar_observador(self, observador):
+        """
+        Registra um objeto com os métodos `ao_inserir(ocorrencia)`, `ao_inserir_lote(ocorrencias)`,
+        `ao_alterar_status(ocorrencia)`, `ao_alterar_severidade(ocorrencia)` e
+        `ao_remover_lote(ocorrencias)`.
+        """
+        self._observadores.append(observador)
+
+    def remover_observador(self, observador):
+        self._observadores.remove(observador)
+
+    def limpar(self):
+        """Remove todas as ocorrências e índices (os observadores são mantidos)."""
+        self._registros.clear()
+        self._por_severidade_status.clear()
+        self._por_localizacao.clear()
+        self._contagem_localizacao_status.clear()
+        self._ids.reiniciar()
+
+    def reservar_ids(self, quantidade: int = 1) -> int:
+        """Reserva atomicamente `quantidade` IDs consecutivos e retorna o primeiro."""
+        return self._ids.reservar(quantidade)
+
+    def avancar_ids_para(self, proximo: int):
+        """Evita reutilizar IDs que vivem fora do repositório (ex: ocorrências arquivadas)."""
+        self._ids.avancar_para(proximo)
+
+    @property
+    def proximo_id(self) -> int:
+        return self._ids.proximo
+
+    def __len__(self):
+        return len(self._registros)
+
+    def __contains__(self, ocorrencia_id):
+        return ocorrencia_id in self._registros
+
+    def __getitem__(self, ocorrencia_id) -> Ocorrencia:
+        return self._registros[ocorrencia_id]
+
+    def __iter__(self):
+        return iter(self._registros.values())
+
+    def get(self, ocorrencia_id, padrao=None):
+        return self._registros.get(ocorrencia_id, padrao)
+
+    def adicionar(self, ocorrencia: Ocorrencia):
+        """Insere (ou substitui) uma ocorrência, atualizando os índices."""
+        if ocorrencia.ID in self._registros:
+            self._desindexar(self._registros[ocorrencia.ID])
+        self._registros[ocorrencia.ID] = ocorrencia
+        self._por_severidade_status[(ocorrencia.severidade_num, ocorrencia.status)][ocorrencia.ID] = None
+        self._por_localizacao[ocorrencia.localizacao][ocorrencia.ID] = None
+        self._contar(ocorrencia.localizacao, ocorrencia.status, 1)
+        self._ids.avancar_para(ocorrencia.ID + 1)
+        for observador in self._observadores:
+            observador.ao_inserir(ocorrencia)
+
+    def adicionar_lote(self, ocorrencias):
+        """Insere várias ocorrências novas (IDs ainda não presentes) de uma só vez."""
+        registros = self._registros
+        por_severidade_status = self._por_severidade_status
+        por_localizacao = self._por_localizacao
+        contagem = self._contagem_localizacao_status
+        for ocorrencia in ocorrencias:
+            registros[ocorrencia.ID] = ocorrencia
+            por_severidade_status[(ocorrencia.severidade_num, ocorrencia.status)][ocorrencia.ID] = None
+            por_localizacao[ocorrencia.localizacao][ocorrencia.ID] = None
+            contagem_local = contagem[ocorrencia.localizacao]
+            contagem_local[ocorrencia.status] = contagem_local.get(ocorrencia.status, 0) + 1
+        if ocorrencias:
+            self._ids.avancar_para(max(ocorrencia.ID for ocorrencia in ocorrencias) + 1)
+        for observador in self._observadores:
+            observador.ao_inserir_lote(ocorrencias)
+
+    def remover_lote(self, ocorrencia_ids) -> list:
+        """
+        Retira do repositório (e dos índices e contadores) as ocorrências informadas,
+        ignorando IDs ausentes. Usado pelo arquivamento para manter apenas o conjunto quente.
+
+        Returns:
+            list: As ocorrências removidas.
+        """
+        removidas = []
+        for ocorrencia_id in ocorrencia_ids:
+            ocorrencia = self._registros.pop(ocorrencia_id, None)
+            if ocorrencia is not None:
+                self._desindexar(ocorrencia)
+                removidas.append(ocorrencia)
+        if removidas:
+            for observador in self._observadores:
+                observador.ao_remover_lote(removidas)
+        return removidas
+
+    def _desindexar(self, ocorrencia: Ocorrencia):
+        chave = (ocorrencia.severidade_num, ocorrencia.status)
+        del self._por_severidade_status[chave][ocorrencia.ID]
+        if not self._por_severidade_status[chave]:
+            del self._por_severidade_status[chave]
+        del self._por_localizacao[ocorrencia.localizacao][ocorrencia.ID]
+        if not self._por_localizacao[ocorrencia.localizacao]:
+            del self._por_localizacao[ocorrencia.localizacao]
+        self._contar(ocorrencia.localizacao, ocorrencia.status, -1)
+
+    def _contar(self, localizacao: str, status: str, delta: int):
+        contagem = self._contagem_localizacao_status[localizacao]
+        total = contagem.get(status, 0) + delta
+        if total:
+            contagem[status] = total
+        else:
+            del contagem[status]
+            if not contagem:
+                del self._contagem_localizacao_status[localizacao]
+
+    def _reindexar(self, ocorrencia: Ocorrencia, severidade_num: int, status: str):
+        chave = (ocorrencia.severidade_num, ocorrencia.status)
+        del self._por_severidade_status[chave][ocorrencia.ID]
+        if not self._por_severidade_status[chave]:
+            del self._por_severidade_status[chave]
+        if status != ocorrencia.status:
+            self._contar(ocorrencia.localizacao, ocorrencia.status, -1)
+            self._contar(ocorrencia.localizacao, status, 1)
+        ocorrencia.severidade_num = severidade_num
+        ocorrencia.status = status
+        self._por_severidade_status[(severidade_num, status)][ocorrencia.ID] = None
+
+    def atualizar_status(self, ocorrencia_id, novo_status: str) -> Ocorrencia:
+        ocorrencia = self._registros[ocorrencia_id]
+        self._reindexar(ocorrencia, ocorrencia.severidade_num, novo_status)
+        for observador in self._observadores:
+            observador.ao_alterar_status(ocorrencia)
+        return ocorrencia
+
+    def atualizar_severidade(self, ocorrencia_id, nova_severidade_num: int) -> Ocorrencia:
+        ocorrencia = self._registros[ocorrencia_id]
+        self._reindexar(ocorrencia, nova_severidade_num, ocorrencia.status)
+        for observador in self._observadores:
+            observador.ao_alterar_severidade(ocorrencia)
+        return ocorrencia
+
+    def _coletar(self, chaves) -> list:
+        ids = []
+        for chave in chaves:
+            ids.extend(self._por_severidade_status.get(chave, ()))
+        ids.sort()
+        return [self._registros[i] for i in ids]
+
+    def por_severidade(self, severidade_num: int, incluir_extintas: bool = False) -> list:
+        """Ocorrências com a severidade informada (por padrão apenas as não extintas), ordenadas por ID."""
+        return self._coletar((severidade_num, status) for status in STATUS_OCORRENCIA
+                             if incluir_extintas or status != "EXTINTA")
+
+    def por_status(self, status: str) -> list:
+        """Ocorrências com o status informado, ordenadas por ID."""
+        return self._coletar((severidade_num, status) for severidade_num in NOMES_SEVERIDADE)
+
+    def ativas(self) -> list:
+        """Ocorrências não extintas, ordenadas por ID."""
+        return self._coletar((severidade_num, status) for severidade_num in NOMES_SEVERIDADE
+                             for status in STATUS_OCORRENCIA if status != "EXTINTA")
+
+    def por_localizacao(self, localizacao: str) -> list:
+        """Todas as ocorrências (histórico, inclusive extintas) de uma localização, em ordem de registro."""
+        return [self._registros[i] for i in self._por_localizacao.get(localizacao, ())]
+
+    def localizacoes(self) -> list:
+        """Localizações com ao menos uma ocorrência registrada, na ordem da primeira ocorrência."""
+        return list(self._por_localizacao)
+
+    # --- Agregados Mantidos Incrementalmente ---
+    def contagem_por_localizacao(self) -> dict:
+        """{localização: {status: quantidade}}, em O(localizações), sem varrer as ocorrências."""
+        return {local: dict(contagem) for local, contagem in self._contagem_localizacao_status.items()}
+
+    def contagem_por_severidade_status(self) -> dict:
+        """{(severidade_num, status): quantidade}, lida diretamente dos tamanhos do índice."""
+        return {chave: len(ids) for chave, ids in self._por_severidade_status.items()}
+
+    def ids_por_localizacao(self, localizacao: str):
+        """IDs de uma localização em ordem de registro, sem materializar a lista de ocorrências."""
+        return iter(self._por_localizacao.get(localizacao, ()))
+
+# --- Fila de Prioridade Indexada (Heapq com Remoção Preguiçosa) ---
+class FilaPrioridadeIndexada:
+    """
+    Fila de prioridade de atendimento endereçável pelo ID da ocorrência.
+    Segue o padrão de remoção preguiçosa da documentação do `heapq`: cada ID aponta
+    para sua entrada no heap; atualizar ou remover apenas marca a entrada antiga como
+    obsoleta (O(1)) e, na atualização, empilha uma nova (O(log N)).
+    Entradas obsoletas são descartadas iterativamente ao extrair e, quando passam de
+    `limiar_compactacao` do heap, o heap é reconstruído (O(N), amortizado), mantendo
+    a memória limitada a um múltiplo do número de ocorrências realmente na fila.
+    Ocorrências que nenhuma base alcança ficam "estacionadas" fora do heap, agrupadas por
+    localização (`estacionar`), e só voltam a ele com `liberar_sem_rota` quando as rotas
+    mudam: o despacho não paga por elas a cada extração. Continuam contando em `len` e
+    `in`, e `inserir`/`remover` as tratam como qualquer outra entrada.
+    """
+
+    def __init__(self, limiar_compactacao: float = 0.5, tamanho_minimo_compactacao: int = 64):
+        self._heap = [] # Entradas [-severidade_num, ID, valida]
+        self._entradas = {}
+        self._obsoletas = 0
+        self._sem_rota = defaultdict(dict) # localização -> {ID: severidade_num}
+        self._local_sem_rota = {}          # ID -> localização
+        self.versao_rotas_sem_rota = None  # Versão da tabela de rotas da última liberação
+        self.limiar_compactacao = limiar_compactacao
+        self.tamanho_minimo_compactacao = tamanho_minimo_compactacao
+
+    def __len__(self):
+        return len(self._entradas) + len(self._local_sem_rota)
+
+    def __contains__(self, ocorrencia_id):
+        return ocorrencia_id in self._entradas or ocorrencia_id in self._local_sem_rota
+
+    @property
+    def quantidade_sem_rota(self) -> int:
+        return len(self._local_sem_rota)
+
+    @property
+    def profundidade_heap(self) -> int:
+        """Tamanho físico do heap, incluindo entradas obsoletas ainda não descartadas."""
+        return len(self._heap)
+
+    @property
+    def entradas_obsoletas(self) -> int:
+        return self._obsoletas
+
+    def inserir(self, ocorrencia_id, severidade_num: int):
+        """Insere a ocorrência ou, se já estiver na fila, re-prioriza no lugar."""
+        local = self._local_sem_rota.get(ocorrencia_id)
+        if local is not None:
+            self._sem_rota[local][ocorrencia_id] = severidade_num # Continua estacionada
+            return
+        entrada = self._entradas.get(ocorrencia_id)
+        if entrada is not None:
+            if entrada[0] == -severidade_num:
+                return
+            self._invalidar(entrada)
+        entrada = [-severidade_num, ocorrencia_id, True]
+        self._entradas[ocorrencia_id] = entrada
+        heapq.heappush(self._heap, entrada)
+        self._compactar_se_necessario()
+
+    def inserir_lote(self, pares):
+        """
+        Insere vários pares (ID, severidade_num) de IDs que ainda não estão na fila.
+        Para lotes grandes em relação ao heap, anexa tudo e chama `heapify` (O(N + K))
+        em vez de K empilhamentos de O(log N).
+        """
+        novas = [[-severidade_num, ocorrencia_id, True] for ocorrencia_id, severidade_num in pares]
+        for entrada in novas:
+            self._entradas[entrada[1]] = entrada
+        if len(novas) * (len(self._heap) + len(novas)).bit_length() > len(self._heap) + len(novas):
+            self._heap.extend(novas)
+            heapq.heapify(self._heap)
+        else:
+            for entrada in novas:
+                heapq.heappush(self._heap, entrada)
+
+    def remover(self, ocorrencia_id) -> bool:
+        """Retira a ocorrência da fila. Retorna False se ela não estava na fila."""
+        local = self._local_sem_rota.pop(ocorrencia_id, None)
+        if local is not None:
+            estacionadas = self._sem_rota[local]
+            del estacionadas[ocorrencia_id]
+            if not estacionadas:
+                del self._sem_rota[local]
+            return True
+        entrada = self._entradas.pop(ocorrencia_id, None)
+        if entrada is None:
+            return False
+        self._invalidar(entrada)
+        self._compactar_se_necessario()
+        return True
+
+    def _invalidar(self, entrada):
+        entrada[2] = False
+        self._obsoletas += 1
+
+    def _descartar_obsoletas_do_topo(self):
+        # Laço iterativo: nenhuma quantidade de entradas obsoletas estoura a pilha de recursão
+        while self._heap and not self._heap[0][2]:
+            heapq.heappop(self._heap)
+            self._obsoletas -= 1
+
+    def espiar(self):
+        """Retorna o ID de maior prioridade sem retirá-lo da fila (ou None se vazia)."""
+        self._descartar_obsoletas_do_topo()
+        return self._heap[0][1] if self._heap else None
+
+    def extrair(self):
+        """Retira e retorna o ID de maior prioridade (maior severidade, depois menor ID), ou None."""
+        self._descartar_obsoletas_do_topo()
+        if not self._heap:
+            return None
+        _, ocorrencia_id, _ = heapq.heappop(self._heap)
+        del self._entradas[ocorrencia_id]
+        return ocorrencia_id
+
+    def estacionar(self, ocorrencia_id, severidade_num: int, localizacao):
+        """Guarda fora do heap uma ocorrência já extraída que nenhuma base alcança."""
+        self._sem_rota[localizacao][ocorrencia_id] = severidade_num
+        self._local_sem_rota[ocorrencia_id] = localizacao
+
+    def liberar_sem_rota(self, alcancavel, versao_rotas) -> int:
+        """
+        Se a tabela de rotas mudou desde a última chamada (`versao_rotas`), devolve ao heap
+        as estacionadas das localizações para as quais `alcancavel(local)` é verdadeiro
+        (O(localizações estacionadas) consultas). Retorna quantas voltaram.
+        """
+        if versao_rotas == self.versao_rotas_sem_rota:
+            return 0
+        self.versao_rotas_sem_rota = versao_rotas
+        liberadas = []
+        for local in [local for local in self._sem_rota if alcancavel(local)]:
+            for ocorrencia_id, severidade_num in self._sem_rota.pop(local).items():
+                del self._local_sem_rota[ocorrencia_id]
+                liberadas.append((ocorrencia_id, severidade_num))
+        if liberadas:
+            self.inserir_lote(liberadas)
+        return len(liberadas)
+
+    def limpar(self):
+        self._heap.clear()
+        self._entradas.clear()
+        self._obsoletas = 0
+        self._sem_rota.clear()
+        self._local_sem_rota.clear()
+        self.versao_rotas_sem_rota = None
+
+    def _compactar_se_necessario(self):
+        if (len(self._heap) >= self.tamanho_minimo_compactacao
+                and self._obsoletas > self.limiar_compactacao * len(self._heap)):
+            self.compactar()
+
+    def compactar(self):
+        """Reconstrói o heap apenas com as entradas válidas (O(N) com `heapify`)."""
+        self._heap = [entrada for entrada in self._heap if entrada[2]]
+        heapq.heapify(self._heap)
+        self._obsoletas = 0
+
+# --- Instrumentação da PyrosAI (Métricas de Desempenho) ---
+class HistogramaLatencia:
+    """
+    Histograma de latências (em segundos) com baldes exponenciais fixos de 1µs a ~17s.
+    Registrar uma observação custa uma busca binária (`bisect`) e dois incrementos.
+    """
+    LIMITES = tuple(1e-6 * 4 ** k for k in range(13))
+    __slots__ = ('contagens', 'soma', 'total')
+
+    def __init__(self):
+        self.contagens = [0] * (len(self.LIMITES) + 1) # Último balde: acima do maior limite
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, segundos: float):
+        self.contagens[bisect.bisect_left(self.LIMITES, segundos)] += 1
+        self.soma += segundos
+        self.total += 1
+
+    def percentil(self, fracao: float) -> float:
+        """Estimativa do percentil pelo limite superior do balde (ex: fracao=0.99 para p99)."""
+        alvo = fracao * self.total
+        acumulado = 0
+        for limite, contagem in zip(self.LIMITES + (float('inf'),), self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo and acumulado > 0:
+                return limite
+        return 0.0
+
+class MetricasPyrosAI:
+    """
+    Instrumentação dos caminhos críticos do simulador. Desabilitada por padrão: cada ponto
+    instrumentado testa apenas `metricas_pyrosai.habilitado`, então o custo desligado é um
+    acesso a atributo. Métricas que já existem em outras estruturas (acertos do `lru_cache`,
+    profundidade e entradas obsoletas da fila) são lidas só no momento do `instantaneo`.
+    """
+
+    def __init__(self):
+        self.habilitado = False
+        self.contadores = defaultdict(float)
+        self.histogramas = defaultdict(HistogramaLatencia)
+        self._servidor = None
+
+    def habilitar(self):
+        self.habilitado = True
+
+    def desabilitar(self):
+        self.habilitado = False
+
+    def reiniciar(self):
+        self.contadores.clear()
+        self.histogramas.clear()
+
+    def incrementar(self, nome: str, valor: float = 1):
+        self.contadores[nome] += valor
+
+    def observar(self, nome: str, segundos: float):
+        self.histogramas[nome].observar(segundos)
+
+    def instantaneo(self) -> dict:
+        """Fotografia de todas as métricas em um dicionário serializável em JSON."""
+        cache = pyrosai_avaliar_criticidade_area.cache_info()
+        consultas_cache = cache.hits + cache.misses
+        profundidade = fila_prioridade_atendimento.profundidade_heap
+        return {
+            'timestamp': time.time(),
+            'criticidade_cache': {
+                'acertos': cache.hits,
+                'falhas': cache.misses,
+                'taxa_acerto': cache.hits / consultas_cache if consultas_cache else 0.0,
+                'tamanho': cache.currsize,
+            },
+            'fila_atendimento': {
+                'ocorrencias': len(fila_prioridade_atendimento),
+                'profundidade_heap': profundidade,
+                'entradas_obsoletas': fila_prioridade_atendimento.entradas_obsoletas,
+                'razao_obsoletas': fila_prioridade_atendimento.entradas_obsoletas / profundidade if profundidade else 0.0,
+            },
+            'contadores': dict(self.contadores),
+            'histogramas': {
+                nome: {
+                    'limites_s': list(HistogramaLatencia.LIMITES),
+                    'contagens': list(histograma.contagens),
+                    'soma_s': histograma.soma,
+                    'total': histograma.total,
+                    'p50_s': histograma.percentil(0.50),
+                    'p99_s': histograma.percentil(0.99),
+                }
+                for nome, histograma in self.histogramas.items()
+            },
+        }
+
+    def exportar_json(self, caminho: str):
+        with open(caminho, 'w', encoding='utf-8') as arquivo:
+            json.dump(self.instantaneo(), arquivo, indent=2)
+
+    def formatar_prometheus(self) -> str:
+        """Métricas no formato de exposição em texto do Prometheus."""
+        dados = self.instantaneo()
+        linhas = []
+
+        def metrica(nome, tipo, valor, descricao):
+            linhas.append(f"# HELP pyrosai_{nome} {descricao}")
+            linhas.append(f"# TYPE pyrosai_{nome} {tipo}")
+            linhas.append(f"pyrosai_{nome} {valor}")
+
+        cache = dados['criticidade_cache']
+        metrica('criticidade_cache_acertos_total', 'counter', cache['acertos'], 'Acertos do lru_cache da avaliação de criticidade.')
+        metrica('criticidade_cache_falhas_total', 'counter', cache['falhas'], 'Falhas do lru_cache da avaliação de criticidade.')
+        fila = dados['fila_atendimento']
+        metrica('fila_ocorrencias', 'gauge', fila['ocorrencias'], 'Ocorrências aguardando atendimento.')
+        metrica('fila_profundidade_heap', 'gauge', fila['profundidade_heap'], 'Entradas no heap, incluindo obsoletas.')
+        metrica('fila_razao_obsoletas', 'gauge', fila['razao_obsoletas'], 'Fração de entradas obsoletas no heap.')
+        for nome, valor in sorted(dados['contadores'].items()):
+            metrica(f"{nome}_total", 'counter', valor, f"Contador {nome}.")
+
+        for nome, histograma in sorted(self.histogramas.items()):
+            linhas.append(f"# HELP pyrosai_{nome}_segundos Latência de {nome}.")
+            linhas.append(f"# TYPE pyrosai_{nome}_segundos histogram")
+            acumulado = 0
+            for limite, contagem in zip(HistogramaLatencia.LIMITES, histograma.contagens):
+                acumulado += contagem
+                linhas.append(f'pyrosai_{nome}_segundos_bucket{{le="{limite!r}"}} {acumulado}') # Limite exato, sem arredondar
+            linhas.append(f'pyrosai_{nome}_segundos_bucket{{le="+Inf"}} {histograma.total}')
+            linhas.append(f"pyrosai_{nome}_segundos_sum {histograma.soma}")
+            linhas.append(f"pyrosai_{nome}_segundos_count {histograma.total}")
+        return "\n".join(linhas) + "\n"
+
+    def servir_prometheus(self, porta: int, endereco: str = '127.0.0.1'):
+        """Expõe `/metrics` em uma thread de fundo (servidor HTTP da biblioteca padrão)."""
+        metricas = self
+
+        class _Tratador(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self.send_error(404)
+                    return
+                corpo = metricas.formatar_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, formato, *args):
+                pass # Não polui o console do simulador
+
+        self._servidor = http.server.ThreadingHTTPServer((endereco, porta), _Tratador)
+        threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self._servidor
+
+    def parar_servidor(self):
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+
+# --- Relógio do Simulador ---
+class RelogioParede:
+    """Relógio real: instantes de `time.time()` (segundos desde a época)."""
+
+    def agora(self) -> float:
+        return time.time()
+
+class RelogioVirtual:
+    """
+    Relógio da simulação de eventos discretos: o tempo só anda quando a simulação salta
+    para o próximo evento, então semanas simuladas não custam semanas reais.
+    """
+
+    def __init__(self, inicio: float = 0.0):
+        self.tempo = inicio
+
+    def agora(self) -> float:
+        return self.tempo
+
+    def avancar_para(self, instante: float):
+        self.tempo = instante
+
+# --- Grafo de Localizações (com Contador de Mutações) ---
+def _contar_mutacao(metodo):
+    @wraps(metodo)
+    def envolvido(self, *args, **kwargs):
+        self.versao += 1 # Incrementa antes: mesmo uma mutação que falha no meio conta
+        return metodo(self, *args, **kwargs)
+    return envolvido
+
+class GrafoLocalizacoes(nx.DiGraph):
+    """
+    DiGraph da rede de localizações que conta as próprias mutações em `versao`. Todo
+    método que adiciona ou remove nós e arestas (inclusive `add_edge` sobre uma aresta
+    existente, que altera o peso) incrementa o contador, e o `RoteadorPyrosAI` o compara
+    em O(1) para saber se a tabela de rotas em cache ficou obsoleta.
+    Atributos editados no lugar (`grafo[u][v]['weight'] = ...`) não passam por nenhum
+    método e não são vistos: altere pesos com `alterar_rota`/`atualizar_rotas_em_lote`,
+    com `add_edge(u, v, weight=...)` ou chame `roteador_pyrosai.invalidar()`.
+    """
+    versao = 0
+
+    add_node = _contar_mutacao(nx.DiGraph.add_node)
+    add_nodes_from = _contar_mutacao(nx.DiGraph.add_nodes_from)
+    remove_node = _contar_mutacao(nx.DiGraph.remove_node)
+    remove_nodes_from = _contar_mutacao(nx.DiGraph.remove_nodes_from)
+    add_edge = _contar_mutacao(nx.DiGraph.add_edge)
+    add_edges_from = _contar_mutacao(nx.DiGraph.add_edges_from)
+    remove_edge = _contar_mutacao(nx.DiGraph.remove_edge)
+    remove_edges_from = _contar_mutacao(nx.DiGraph.remove_edges_from)
+    clear = _contar_mutacao(nx.DiGraph.clear)
+    clear_edges = _contar_mutacao(nx.DiGraph.clear_edges)
+
 # --- Estruturas de Dados Globais Simuladas (mantidas) ---
-ocorrencias_ativas = {} 
-fila_prioridade_atendimento = [] 
-rede_localizacoes_graph = nx.DiGraph()
+relogio_simulacao = RelogioParede() # Fonte dos timestamps; um `RelogioVirtual` torna as execuções reproduzíveis
+ocorrencias_ativas = RepositorioOcorrencias()
+# Contém exatamente as ocorrências com status DETECTADA, inclusive as que nenhuma base alcança ainda
+fila_prioridade_atendimento = FilaPrioridadeIndexada()
+rede_localizacoes_graph = GrafoLocalizacoes()
+persistencia_estado = None # Ativada por `ativar_persistencia`
+arquivo_ocorrencias = None # Ativado por `ativar_arquivamento`
+metricas_pyrosai = MetricasPyrosAI()
 
 # --- Configuração Inicial do Grafo (Simulação) (mantida) ---
 def configurar_grafo_localizacoes():
@@ -31,6 +702,9 @@ def configurar_grafo_localizacoes():
     nodes = ['Base_Alfa', 'Base_Beta', 'Floresta_Vermelha', 'Bosque_Azul', 
              'Montanha_Verde', 'Rio_Sereno', 'Vila_Clara', 'Pico_Alto', 'Estrada_Principal']
     rede_localizacoes_graph.add_nodes_from(nodes)
+    # Equipes disponíveis em cada base (atributo 'equipes'; bases sem o atributo têm 1 equipe)
+    rede_localizacoes_graph.nodes['Base_Alfa']['equipes'] = 2
+    rede_localizacoes_graph.nodes['Base_Beta']['equipes'] = 2
 
     # Arestas simuladas (origem, destino, peso)
     edges = [
@@ -51,69 +725,664 @@ def configurar_grafo_localizacoes():
         ('Pico_Alto', 'Montanha_Verde', 12) # Diferença de peso na volta simulando subida/descida
     ]
     rede_localizacoes_graph.add_weighted_edges_from(edges)
+    roteador_pyrosai.invalidar()
 
     print(f"  Rede de Localizações (Grafo DiGraph) simulada com sucesso!")
     print(f"  Nós no grafo: {list(rede_localizacoes_graph.nodes)}")
 
-# --- Nova Função da PyrosAI com Memoization (Simulação de Avaliação de Risco) ---
-@lru_cache(maxsize=128) # Cache para até 128 resultados diferentes
-def pyrosai_avaliar_criticidade_area(temperatura: int, umidade_ar: int, umidade_solo: int) -> str:
+# --- Roteamento da PyrosAI (Dijkstra Multi-Origem com Cache) ---
+def listar_bases(grafo) -> list:
     """
-    Simula uma avaliação detalhada da PyrosAI sobre a criticidade de uma micro-área.
-    Baseia-se em parâmetros simulados de temperatura, umidade do ar e umidade do solo,
-    utilizando um sistema de pontuação para maior variedade e realismo na simulação.
-    Esta função usa memoization (`lru_cache`) para otimizar chamadas repetidas
-    com os mesmos parâmetros, simulando a eficiência da IA em evitar recálculos.
+    Retorna as bases de equipes do grafo (nós cujo nome começa com 'Base'), na ordem dos nós.
+    """
+    return [node for node in grafo.nodes if str(node).startswith('Base')]
 
-    Args:
-        temperatura (int): Temperatura ambiente simulada (ex: 20-40°C).
-        umidade_ar (int): Umidade relativa do ar simulada (ex: 0-100%).
-        umidade_solo (int): Percentual de umidade do solo simulado (ex: 0-100%).
+def _dijkstra_multi_origem(grafo, origens, alvos=None, reverso=False, quantidade_alvos=None):
+    """
+    Executa um único Dijkstra partindo simultaneamente de todas as `origens`.
+    Cada nó alcançável recebe a distância até a origem mais próxima, o predecessor no
+    caminho e a origem (raiz) responsável. Em caso de empate de distância vence a origem
+    que aparece primeiro em `origens`, reproduzindo o critério do laço base a base.
+    Complexidade: O(E log V), independentemente do número de origens.
+    Se `alvos` for informado, a busca para assim que todos eles (ou os `quantidade_alvos`
+    mais próximos) forem finalizados; nesse caso apenas as entradas dos alvos finalizados
+    (e de seus caminhos) são garantidamente ótimas.
+    Com `reverso=True` percorre as rotas no sentido contrário (distância de cada nó ATÉ
+    a origem) e o "predecessor" passa a ser o próximo nó no caminho rumo à origem.
 
     Returns:
-        str: Nível de criticidade simulado ('BAIXA', 'MEDIA', 'ALTA', 'CRITICA').
+        tuple: (distancias, predecessores, raizes), dicionários indexados pelo nó.
     """
-    # Esta linha é visível APENAS quando a função é *realmente* executada (não do cache).
-    print(f"  [PyrosAI SIMULANDO Processamento de Criticidade para Temp={temperatura}°C, UmidAr={umidade_ar}%, UmidSolo={umidade_solo}%]")
-    
-    total_pontos_risco = 0
+    if hasattr(grafo, 'dijkstra_multi_origem'):
+        # Backends com Dijkstra próprio (ex: `GrafoCSR`) resolvem sobre suas estruturas
+        return grafo.dijkstra_multi_origem(origens, alvos, reverso, quantidade_alvos)
+    # Dicionários internos do DiGraph (como nos algoritmos do próprio NetworkX):
+    # evita criar uma view a cada nó visitado, ~30% mais rápido em grafos grandes
+    adjacencia = grafo._pred if reverso else grafo._adj
+    distancias = {}
+    predecessores = {}
+    raizes = {}
+    ordem_raiz = {}
+    contador = itertools.count()
+    heap = []
+    for ordem, origem in enumerate(origens):
+        distancias[origem] = 0
+        predecessores[origem] = None
+        raizes[origem] = origem
+        ordem_raiz[origem] = ordem
+        heap.append((0, ordem, next(contador), origem))
+    heapq.heapify(heap)
+
+    empilhar, desempilhar = heapq.heappush, heapq.heappop
+    pendentes = set(alvos) if alvos is not None else None
+    if pendentes is not None and quantidade_alvos is not None:
+        restantes = min(quantidade_alvos, len(pendentes))
+    else:
+        restantes = len(pendentes) if pendentes is not None else None
+    while heap:
+        dist_u, ordem_u, _, u = desempilhar(heap)
+        # Entrada obsoleta: o nó já foi finalizado com (distância, ordem) melhor
+        if dist_u > distancias[u] or ordem_u != ordem_raiz[u]:
+            continue
+        if pendentes is not None and u in pendentes:
+            pendentes.discard(u)
+            restantes -= 1
+            if restantes <= 0:
+                break
+        raiz_u = raizes[u]
+        for v, atributos in adjacencia[u].items():
+            nova_dist = dist_u + atributos.get('weight', 1)
+            dist_v = distancias.get(v)
+            if dist_v is None or nova_dist < dist_v or (nova_dist == dist_v and ordem_u < ordem_raiz[v]):
+                distancias[v] = nova_dist
+                predecessores[v] = u
+                raizes[v] = raiz_u
+                ordem_raiz[v] = ordem_u
+                empilhar(heap, (nova_dist, ordem_u, next(contador), v))
+    return distancias, predecessores, raizes
+
+def _caminho_ate_raiz(predecessores, no) -> list:
+    caminho = []
+    while no is not None:
+        caminho.append(no)
+        no = predecessores[no]
+    return caminho
+
+def _reconstruir_caminho(predecessores, destino) -> list:
+    caminho = _caminho_ate_raiz(predecessores, destino)
+    caminho.reverse()
+    return caminho
+
+# --- Grafo Compacto (CSR) para Redes Viárias Regionais ---
+class GrafoCSR:
+    """
+    Backend de grafo somente-leitura em formato CSR (Compressed Sparse Row): as rotas de
+    saída do nó i ocupam as posições `indptr[i]:indptr[i + 1]` dos arrays contíguos
+    `indices` (nó de destino, int32) e `pesos` (float64). Os nomes dos nós ficam em
+    `nomes` e o mapa nome -> índice é montado sob demanda. Cerca de 12 bytes por rota,
+    contra centenas de bytes dos dicionários aninhados do `nx.DiGraph`.
+    Oferece o subconjunto da API do DiGraph usado pelo roteamento (`nodes`, `in`,
+    `number_of_nodes`, ...) e seu próprio Dijkstra sobre os arrays, de modo que
+    `RoteadorPyrosAI`, `RoteamentoParalelo` e `_dijkstra_multi_origem` o aceitam no lugar
+    do DiGraph. Por ser imutável, mudanças de rotas exigem um DiGraph.
+    """
+
+    ARQUIVOS_BINARIOS = ('indptr.npy', 'indices.npy', 'pesos.npy', 'nomes.txt')
+
+    def __init__(self, nomes, indptr, indices, pesos):
+        self.nomes = list(nomes)
+        self.indptr = indptr
+        self.indices = indices
+        self.pesos = pesos
+        self._indice = None
+        self._transposto = None
+
+    def __getstate__(self):
+        # Caches reconstruíveis não viajam para os processos do pool
+        estado = self.__dict__.copy()
+        estado['_indice'] = None
+        estado['_transposto'] = None
+        return estado
+
+    # --- Construção e Carga ---
+    @classmethod
+    def de_arestas(cls, nomes, origens, destinos, pesos):
+        """
+        Monta o CSR a partir de arrays de arestas (índices inteiros de `nomes`).
+        Uma ordenação estável por origem agrupa as rotas de cada nó.
+        """
+        origens = np.asarray(origens, dtype=np.int64)
+        ordem = np.argsort(origens, kind='stable')
+        indptr = np.zeros(len(nomes) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(origens, minlength=len(nomes)), out=indptr[1:])
+        return cls(nomes, indptr,
+                   np.asarray(destinos, dtype=np.int32)[ordem],
+                   np.asarray(pesos, dtype=np.float64)[ordem])
+
+    @classmethod
+    def de_networkx(cls, grafo):
+        """Converte um `nx.DiGraph` (peso no atributo 'weight', padrão 1)."""
+        nomes = list(grafo.nodes)
+        indice = {nome: i for i, nome in enumerate(nomes)}
+        origens, destinos, pesos = [], [], []
+        for u, v, peso in grafo.edges(data='weight', default=1):
+            origens.append(indice[u])
+            destinos.append(indice[v])
+            pesos.append(peso)
+        return cls.de_arestas(nomes, origens, destinos, pesos)
+
+    @classmethod
+    def carregar_lista_arestas(cls, caminho: str, separador: str = None):
+        """
+        Carrega um arquivo texto com uma rota por linha: `origem destino peso`, separados
+        por espaços (ou por `separador`, ex: ','). Os nomes não podem conter o separador.
+        Os nós recebem índices na ordem em que aparecem pela primeira vez.
+        """
+        with open(caminho, encoding='utf-8') as arquivo:
+            texto = arquivo.read()
+        if separador is not None:
+            texto = texto.replace(separador, ' ')
+        campos = texto.split()
+        if len(campos) % 3:
+            raise ValueError(f"Lista de arestas malformada em '{caminho}': esperado 'origem destino peso' por linha.")
+        indice = {}
+        numerar = indice.setdefault
+        origens = [numerar(nome, len(indice)) for nome in campos[0::3]]
+        destinos = [numerar(nome, len(indice)) for nome in campos[1::3]]
+        grafo = cls.de_arestas(list(indice), origens, destinos, np.array(campos[2::3], dtype=np.float64))
+        grafo._indice = indice
+        return grafo
+
+    def salvar_binario(self, diretorio: str):
+        """Grava os arrays em .npy (mapeáveis em memória) e os nomes em texto, um por linha."""
+        os.makedirs(diretorio, exist_ok=True)
+        for nome_arquivo, array_csr in zip(self.ARQUIVOS_BINARIOS, (self.indptr, self.indices, self.pesos)):
+            np.save(os.path.join(diretorio, nome_arquivo), array_csr)
+        with open(os.path.join(diretorio, self.ARQUIVOS_BINARIOS[3]), 'w', encoding='utf-8') as arquivo:
+            arquivo.write('\n'.join(map(str, self.nomes)))
+
+    @classmethod
+    def carregar_binario(cls, diretorio: str, mmap: bool = True):
+        """
+        Carrega um grafo gravado por `salvar_binario`. Com `mmap=True` os arrays são
+        mapeados em memória (somente-leitura): a carga é praticamente instantânea e o
+        sistema operacional traz do disco apenas as páginas visitadas pelo Dijkstra.
+        """
+        modo = 'r' if mmap else None
+        indptr, indices, pesos = (np.load(os.path.join(diretorio, nome_arquivo), mmap_mode=modo)
+                                  for nome_arquivo in cls.ARQUIVOS_BINARIOS[:3])
+        with open(os.path.join(diretorio, cls.ARQUIVOS_BINARIOS[3]), encoding='utf-8') as arquivo:
+            # Um nome por nó: o recorte evita o nome fantasma '' de um grafo vazio
+            nomes = arquivo.read().split('\n')[:len(indptr) - 1]
+        return cls(nomes, indptr, indices, pesos)
+
+    # --- API Compatível com o DiGraph ---
+    @property
+    def indice(self) -> dict:
+        if self._indice is None:
+            self._indice = {nome: i for i, nome in enumerate(self.nomes)}
+        return self._indice
+
+    @property
+    def nodes(self) -> list:
+        return self.nomes
+
+    def number_of_nodes(self) -> int:
+        return len(self.nomes)
+
+    def number_of_edges(self) -> int:
+        return len(self.indices)
+
+    def __len__(self):
+        return len(self.nomes)
+
+    def __iter__(self):
+        return iter(self.nomes)
+
+    def __contains__(self, nome):
+        return nome in self.indice
+
+    def sucessores(self, nome) -> list:
+        """Rotas de saída de `nome` como [(destino, peso)]."""
+        i = self.indice[nome]
+        inicio, fim = self.indptr[i], self.indptr[i + 1]
+        return [(self.nomes[j], peso) for j, peso in zip(self.indices[inicio:fim].tolist(), self.pesos[inicio:fim].tolist())]
+
+    def _arrays(self, reverso: bool):
+        if not reverso:
+            return self.indptr, self.indices, self.pesos
+        if self._transposto is None:
+            # CSR do grafo reverso (rotas de entrada), construído na primeira busca reversa
+            origens = np.repeat(np.arange(len(self.nomes), dtype=np.int32), np.diff(self.indptr))
+            transposto = GrafoCSR.de_arestas(self.nomes, self.indices, origens, self.pesos)
+            self._transposto = (transposto.indptr, transposto.indices, transposto.pesos)
+        return self._transposto
+
+    # --- Dijkstra sobre os Arrays ---
+    def dijkstra_multi_origem(self, origens, alvos=None, reverso=False, quantidade_alvos=None):
+        """
+        Mesmo contrato de `_dijkstra_multi_origem` (inclusive o desempate pela ordem das
+        origens), trabalhando com índices inteiros e os arrays CSR. Os resultados são
+        traduzidos para nomes apenas para os nós alcançados.
+        """
+        indptr, vizinhos, pesos = self._arrays(reverso)
+        # memoryview devolve int/float nativos na indexação, bem mais rápido que escalares NumPy
+        indptr, vizinhos, pesos = memoryview(indptr), memoryview(vizinhos), memoryview(pesos)
+        indice = self.indice
+        distancias = {}
+        predecessores = {}
+        raizes = {}
+        ordem_raiz = {}
+        heap = []
+        for ordem, origem in enumerate(origens):
+            i = indice[origem]
+            distancias[i] = 0
+            predecessores[i] = -1
+            raizes[i] = i
+            ordem_raiz[i] = ordem
+            heap.append((0, ordem, i))
+        heapq.heapify(heap)
+
+        empilhar, desempilhar = heapq.heappush, heapq.heappop
+        pendentes = {indice[alvo] for alvo in alvos if alvo in indice} if alvos is not None else None
+        if pendentes is not None and quantidade_alvos is not None:
+            restantes = min(quantidade_alvos, len(pendentes))
+        else:
+            restantes = len(pendentes) if pendentes is not None else None
+        while heap:
+            dist_u, ordem_u, u = desempilhar(heap)
+            if dist_u > distancias[u] or ordem_u != ordem_raiz[u]:
+                continue
+            if pendentes is not None and u in pendentes:
+                pendentes.discard(u)
+                restantes -= 1
+                if restantes <= 0:
+                    break
+            raiz_u = raizes[u]
+            for k in range(indptr[u], indptr[u + 1]):
+                v = vizinhos[k]
+                nova_dist = dist_u + pesos[k]
+                dist_v = distancias.get(v)
+                if dist_v is None or nova_dist < dist_v or (nova_dist == dist_v and ordem_u < ordem_raiz[v]):
+                    distancias[v] = nova_dist
+                    predecessores[v] = u
+                    raizes[v] = raiz_u
+                    ordem_raiz[v] = ordem_u
+                    empilhar(heap, (nova_dist, ordem_u, v))
+
+        nomes = self.nomes
+        return ({nomes[i]: dist for i, dist in distancias.items()},
+                {nomes[i]: nomes[p] if p >= 0 else None for i, p in predecessores.items()},
+                {nomes[i]: nomes[r] for i, r in raizes.items()})
+
+class RoteadorPyrosAI:
+    """
+    Componente de roteamento da PyrosAI sobre a rede de localizações.
+    Em vez de rodar dois Dijkstra por base a cada despacho, mantém uma tabela
+    multi-origem (um único Dijkstra a partir de todas as bases) que responde
+    "base mais próxima + caminho" para qualquer nó em O(tamanho do caminho).
+    A tabela forma uma floresta de caminhos mínimos enraizada nas bases: mudanças de
+    rotas feitas por `aplicar_atualizacoes` reparam apenas as subárvores afetadas;
+    qualquer outra mutação de um `GrafoLocalizacoes` (ou, em outros grafos, a mudança
+    do número de nós) força o recálculo completo na próxima consulta.
+    """
+
+    def __init__(self, grafo):
+        self.grafo = grafo
+        self._tabela = None
+        self._assinatura = None
+        self._ordem_bases = None
+        self._filhos = None
+        self.versao_tabela = 0 # Incrementada a cada reconstrução ou reparo da tabela
+
+    def invalidar(self):
+        """Descarta a tabela em cache; a próxima consulta refaz o Dijkstra multi-origem."""
+        self._tabela = None
+        self._assinatura = None
+        self._ordem_bases = None
+        self._filhos = None
+
+    def _assinatura_grafo(self):
+        # O(1) a cada despacho: o contador de mutações do `GrafoLocalizacoes` cobre nós e
+        # arestas. Grafos sem contador (nx.DiGraph comum, `GrafoCSR`) só são conferidos pelo
+        # número de nós (`number_of_edges` do NetworkX é O(V)); neles, mudanças de rotas
+        # devem passar por `aplicar_atualizacoes` ou ser seguidas de `invalidar`.
+        return self.grafo.number_of_nodes(), getattr(self.grafo, 'versao', None)
+
+    def _garantir_tabela(self):
+        assinatura = self._assinatura_grafo()
+        if self._tabela is None or assinatura != self._assinatura:
+            inicio = time.perf_counter()
+            bases = listar_bases(self.grafo)
+            self._tabela = _dijkstra_multi_origem(self.grafo, bases)
+            self._assinatura = assinatura
+            self._ordem_bases = {base: ordem for ordem, base in enumerate(bases)}
+            self._filhos = None
+            self.versao_tabela += 1
+            if metricas_pyrosai.habilitado:
+                metricas_pyrosai.observar('dijkstra', time.perf_counter() - inicio)
+                metricas_pyrosai.incrementar('dijkstra_execucoes')
+                metricas_pyrosai.incrementar('dijkstra_nos_finalizados', len(self._tabela[0]))
+        return self._tabela
+
+    def _garantir_filhos(self):
+        # Índice reverso da floresta (nó -> filhos), construído só na primeira atualização
+        # incremental: consultas puras não pagam a memória extra.
+        if self._filhos is None:
+            filhos = defaultdict(set)
+            for no, predecessor in self._tabela[1].items():
+                if predecessor is not None:
+                    filhos[predecessor].add(no)
+            self._filhos = filhos
+        return self._filhos
+
+    def base_mais_proxima(self, destino):
+        """
+        Encontra a base mais próxima de `destino` e a rota otimizada até ele.
+
+        Returns:
+            tuple | None: (base, distancia, caminho) ou None se nenhuma base alcança o destino.
+        """
+        distancias, predecessores, raizes = self._garantir_tabela()
+        if destino not in distancias:
+            return None
+        return raizes[destino], distancias[destino], _reconstruir_caminho(predecessores, destino)
+
+    # --- Manutenção Incremental ---
+    def aplicar_atualizacoes(self, atualizacoes) -> dict:
+        """
+        Aplica um lote de mudanças de rotas ao grafo e repara a floresta de caminhos mínimos.
+        Cada atualização é `(origem, destino, peso)`; `peso=None` remove a rota (estrada
+        bloqueada). Aumentos e remoções de arestas da floresta invalidam só a subárvore
+        pendurada nelas, que é re-semeada a partir dos vizinhos de entrada ainda válidos;
+        reduções e novas rotas propagam a melhora a partir do nó de destino. Um único
+        Dijkstra parcial atende o lote inteiro, e o resultado (distâncias e base escolhida,
+        inclusive no desempate pela ordem das bases) é idêntico ao recálculo completo.
+        Se a tabela ainda não existe, apenas altera o grafo (ela será construída sob demanda).
+        O lote é validado por inteiro antes de qualquer mudança: se um item for inválido
+        (remoção de rota inexistente ou peso negativo), nada é aplicado.
+
+        Returns:
+            dict: Nós invalidados e nós re-finalizados pelo reparo.
+        """
+        if not isinstance(self.grafo, nx.DiGraph):
+            raise TypeError("Atualizações de rotas exigem um nx.DiGraph; o GrafoCSR é somente-leitura.")
+        atualizacoes = list(atualizacoes)
+        adjacencia = self.grafo._adj
+        existentes = {} # (origem, destino) -> a rota existe após os itens anteriores do lote
+        for origem, destino, peso in atualizacoes:
+            existe = existentes.get((origem, destino))
+            if existe is None:
+                existe = destino in adjacencia.get(origem, {})
+            if peso is None and not existe:
+                raise nx.NetworkXError(f"A rota {origem} -> {destino} não existe no grafo; nenhuma atualização do lote foi aplicada.")
+            if peso is not None and peso < 0:
+                raise ValueError(f"Peso negativo na rota {origem} -> {destino}; nenhuma atualização do lote foi aplicada.")
+            existentes[(origem, destino)] = peso is not None
+
+        reparo = self._tabela is not None and self._assinatura_grafo() == self._assinatura
+        quantidade_nos = self.grafo.number_of_nodes()
+        pioradas = []      # arestas que ficaram mais caras ou sumiram
+        melhoradas = []     # arestas novas ou mais baratas
+        try:
+            for origem, destino, peso in atualizacoes:
+                atributos = adjacencia.get(origem, {}).get(destino)
+                peso_anterior = atributos.get('weight', 1) if atributos is not None else None
+                if peso is None:
+                    self.grafo.remove_edge(origem, destino)
+                else:
+                    self.grafo.add_edge(origem, destino, weight=peso)
+                if not reparo:
+                    continue
+                if peso_anterior is not None and (peso is None or peso > peso_anterior):
+                    pioradas.append((origem, destino))
+                elif peso is not None and (peso_anterior is None or peso < peso_anterior):
+                    melhoradas.append((origem, destino))
+        except BaseException:
+            self.invalidar() # Falha inesperada no meio do lote: a tabela não reflete mais o grafo
+            raise
+
+        if not reparo or self.grafo.number_of_nodes() != quantidade_nos:
+            # Nós novos (podem ser bases) ou tabela inexistente: a próxima consulta reconstrói do zero
+            self.invalidar()
+            return {'invalidados': 0, 'finalizados': 0}
+        self._assinatura = self._assinatura_grafo() # As mutações acima são reparadas a seguir
+
+        inicio = time.perf_counter()
+        distancias, predecessores, raizes = self._tabela
+        ordem_bases = self._ordem_bases
+        filhos = self._garantir_filhos()
+
+        # 1. Invalida as subárvores penduradas em arestas da floresta que pioraram
+        invalidados = []
+        for origem, destino in pioradas:
+            if predecessores.get(destino) != origem:
+                continue
+            filhos[origem].discard(destino)
+            pilha = [destino]
+            while pilha:
+                no = pilha.pop()
+                invalidados.append(no)
+                del distancias[no], predecessores[no], raizes[no]
+                pilha.extend(filhos.pop(no, ()))
+
+        # 2. Semeia o Dijkstra parcial com rótulos (distância, ordem da base)
+        contador = itertools.count()
+        heap = []
+        predecessores_entrada = self.grafo._pred
+        for no in invalidados:
+            if no in ordem_bases:
+                heap.append((0, ordem_bases[no], next(contador), no, None))
+            for vizinho, atributos in predecessores_entrada[no].items():
+                dist_vizinho = distancias.get(vizinho)
+                if dist_vizinho is not None:
+                    heap.append((dist_vizinho + atributos.get('weight', 1),
+                                 ordem_bases[raizes[vizinho]], next(contador), no, vizinho))
+        for origem, destino in melhoradas:
+            dist_origem = distancias.get(origem)
+            atributos = adjacencia[origem].get(destino) # Pode ter sido removida mais adiante no lote
+            if dist_origem is None or atributos is None:
+                continue  # origem inalcançável ou invalidada: será relaxada ao ser finalizada
+            rotulo = (dist_origem + atributos.get('weight', 1), ordem_bases[raizes[origem]])
+            dist_destino = distancias.get(destino)
+            if dist_destino is None or rotulo < (dist_destino, ordem_bases[raizes[destino]]):
+                heap.append((*rotulo, next(contador), destino, origem))
+        heapq.heapify(heap)
+
+        # 3. Dijkstra parcial: finaliza um nó quando o rótulo extraído supera o atual
+        empilhar, desempilhar = heapq.heappush, heapq.heappop
+        finalizados = 0
+        while heap:
+            dist_u, ordem_u, _, u, predecessor = desempilhar(heap)
+            dist_atual = distancias.get(u)
+            if dist_atual is not None and (dist_atual, ordem_bases[raizes[u]]) <= (dist_u, ordem_u):
+                continue
+            anterior = predecessores.get(u)
+            if anterior is not None:
+                filhos[anterior].discard(u)
+            if predecessor is not None:
+                filhos[predecessor].add(u)
+            distancias[u] = dist_u
+            predecessores[u] = predecessor
+            raiz_u = raizes[predecessor] if predecessor is not None else u
+            raizes[u] = raiz_u
+            finalizados += 1
+            for v, atributos in adjacencia[u].items():
+                nova_dist = dist_u + atributos.get('weight', 1)
+                dist_v = distancias.get(v)
+                if dist_v is None or (nova_dist, ordem_u) < (dist_v, ordem_bases[raizes[v]]):
+                    empilhar(heap, (nova_dist, ordem_u, next(contador), v, u))
+
+        self.versao_tabela += 1
+        if metricas_pyrosai.habilitado:
+            metricas_pyrosai.observar('reparo_rotas', time.perf_counter() - inicio)
+            metricas_pyrosai.incrementar('reparo_rotas_execucoes')
+            metricas_pyrosai.incrementar('reparo_rotas_nos_finalizados', finalizados)
+        return {'invalidados': len(invalidados), 'finalizados': finalizados}
+
+roteador_pyrosai = RoteadorPyrosAI(rede_localizacoes_graph)
+
+def atualizar_rotas_em_lote(atualizacoes) -> dict:
+    """
+    Aplica várias mudanças de rotas de uma vez (ex: boletim de estradas bloqueadas pelo fogo).
+    Cada item é `(origem, destino, peso)`; `peso=None` remove a rota. O roteador repara
+    a floresta de caminhos mínimos uma única vez para o lote inteiro. O lote é atômico:
+    se algum item for inválido, nada é aplicado nem registrado na persistência.
+
+    Returns:
+        dict: Estatísticas do reparo incremental (nós invalidados e re-finalizados).
+    """
+    atualizacoes = list(atualizacoes)
+    resultado = roteador_pyrosai.aplicar_atualizacoes(atualizacoes)
+    if persistencia_estado is not None:
+        for origem, destino, peso in atualizacoes:
+            if peso is None:
+                persistencia_estado.registrar_remocao_rota(origem, destino)
+            else:
+                persistencia_estado.registrar_rota(origem, destino, peso)
+    return resultado
+
+def alterar_rota(origem, destino, peso):
+    """
+    Cria ou altera o peso de uma rota no grafo simulado, reparando apenas as rotas afetadas.
+    """
+    return atualizar_rotas_em_lote([(origem, destino, peso)])
+
+def remover_rota(origem, destino):
+    """
+    Remove uma rota (ex: estrada bloqueada pelo fogo), reparando apenas as rotas afetadas.
+    """
+    return atualizar_rotas_em_lote([(origem, destino, None)])
 
-    # Pontuação da Temperatura
+# --- Roteamento Paralelo (Pool de Processos) ---
+_grafo_worker = None # Cópia somente-leitura do grafo em cada processo do pool
+
+def _inicializar_worker_rotas(nos, arestas):
+    """Executado uma vez por processo: monta a cópia local do grafo de localizações."""
+    global _grafo_worker
+    _grafo_worker = nx.DiGraph()
+    _grafo_worker.add_nodes_from(nos)
+    _grafo_worker.add_weighted_edges_from(arestas)
+
+def _receber_grafo_worker(grafo):
+    """Variante do initializer para backends compactos (ex: `GrafoCSR`), enviados como estão."""
+    global _grafo_worker
+    _grafo_worker = grafo
+
+def _resolver_bloco_rotas(bloco):
+    """
+    Resolve, dentro de um processo do pool, um bloco [(origem, [destinos])]: um Dijkstra
+    por origem, interrompido quando todos os seus destinos são alcançados.
+    """
+    respostas = []
+    for origem, destinos in bloco:
+        if origem not in _grafo_worker:
+            respostas.append([None] * len(destinos))
+            continue
+        distancias, predecessores, _ = _dijkstra_multi_origem(_grafo_worker, [origem], alvos=destinos)
+        respostas.append([(_reconstruir_caminho(predecessores, destino), distancias[destino])
+                          if destino in distancias else None for destino in destinos])
+    return respostas
+
+class RoteamentoParalelo:
+    """
+    Distribui lotes de consultas de rota (origem, destino) entre processos, contornando o
+    GIL nos períodos de pico. Cada processo recebe uma única vez (no `initializer`) uma
+    cópia somente-leitura do grafo. As consultas são agrupadas por origem para que cada
+    origem custe um só Dijkstra, e os grupos são divididos em blocos entre os processos.
+    Alterações no grafo depois da criação do pool não são vistas: crie um novo pool.
+    """
+
+    def __init__(self, grafo=None, processos: int = None):
+        grafo = rede_localizacoes_graph if grafo is None else grafo
+        self.processos = processos or os.cpu_count() or 1
+        if isinstance(grafo, GrafoCSR):
+            # Os arrays CSR são serializados em bloco, bem mais barato que a lista de arestas
+            inicializador, argumentos = _receber_grafo_worker, (grafo,)
+        else:
+            arestas = [(u, v, dados.get('weight', 1)) for u, v, dados in grafo.edges(data=True)]
+            inicializador, argumentos = _inicializar_worker_rotas, (list(grafo.nodes), arestas)
+        self._executor = concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.processos, initializer=inicializador, initargs=argumentos)
+
+    def calcular_rotas(self, consultas, blocos_por_processo: int = 4) -> list:
+        """
+        Args:
+            consultas: Sequência de pares (origem, destino).
+            blocos_por_processo (int): Granularidade da divisão (mais blocos = melhor balanceamento).
+
+        Returns:
+            list: Para cada consulta, na mesma ordem, (caminho, distancia) ou None se não há rota.
+        """
+        por_origem = defaultdict(list)
+        for posicao, (origem, destino) in enumerate(consultas):
+            por_origem[origem].append((posicao, destino))
+        grupos = list(por_origem.items())
+        if not grupos:
+            return []
+
+        quantidade_blocos = min(len(grupos), self.processos * blocos_por_processo)
+        blocos = [grupos[i::quantidade_blocos] for i in range(quantidade_blocos)]
+        tarefas = [[(origem, [destino for _, destino in itens]) for origem, itens in bloco] for bloco in blocos]
+
+        resultados = [None] * len(consultas)
+        for bloco, respostas in zip(blocos, self._executor.map(_resolver_bloco_rotas, tarefas)):
+            for (_, itens), respostas_origem in zip(bloco, respostas):
+                for (posicao, _), resposta in zip(itens, respostas_origem):
+                    resultados[posicao] = resposta
+        return resultados
+
+    def fechar(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excecao):
+        self.fechar()
+
+# --- Faixas de Pontuação de Risco da PyrosAI ---
+# Cada fator contribui de 0 a 4 pontos. Todas as faixas são intervalos do tipo (a, b],
+# o que permite reutilizá-las tanto na avaliação escalar quanto na tabela vetorizada.
+def _pontos_temperatura(temperatura) -> int:
     if temperatura <= 20:
-        total_pontos_risco += 0
+        return 0
     elif 20 < temperatura <= 25:
-        total_pontos_risco += 1
+        return 1
     elif 25 < temperatura <= 30:
-        total_pontos_risco += 2
+        return 2
     elif 30 < temperatura <= 35:
-        total_pontos_risco += 3
+        return 3
     else: # temperatura > 35
-        total_pontos_risco += 4
+        return 4
 
-    # Pontuação da Umidade do Ar (inversamente proporcional ao risco)
+def _pontos_umidade_ar(umidade_ar) -> int:
+    # Inversamente proporcional ao risco
     if umidade_ar > 70:
-        total_pontos_risco += 0
+        return 0
     elif 50 < umidade_ar <= 70:
-        total_pontos_risco += 1
+        return 1
     elif 30 < umidade_ar <= 50:
-        total_pontos_risco += 2
+        return 2
     elif 15 < umidade_ar <= 30:
-        total_pontos_risco += 3
+        return 3
     else: # umidade_ar <= 15
-        total_pontos_risco += 4
+        return 4
 
-    # Pontuação da Umidade do Solo (inversamente proporcional ao risco)
+def _pontos_umidade_solo(umidade_solo) -> int:
+    # Inversamente proporcional ao risco
     if umidade_solo > 60:
-        total_pontos_risco += 0
+        return 0
     elif 40 < umidade_solo <= 60:
-        total_pontos_risco += 1
+        return 1
     elif 20 < umidade_solo <= 40:
-        total_pontos_risco += 2
+        return 2
     elif 10 < umidade_solo <= 20:
-        total_pontos_risco += 3
+        return 3
     else: # umidade_solo <= 10
-        total_pontos_risco += 4
+        return 4
 
+def _classificar_pontos_risco(total_pontos_risco: int) -> str:
     # Mapeamento da pontuação total para o nível de criticidade
     if total_pontos_risco <= 3:
         return "BAIXA"
@@ -124,38 +1393,168 @@ def pyrosai_avaliar_criticidade_area(temperatura: int, umidade_ar: int, umidade_
     else: # total_pontos_risco > 9 (até 12)
         return "CRITICA"
 
-# --- Funções do Simulador (restante do código permanece o mesmo) ---
+# --- Nova Função da PyrosAI com Memoization (Simulação de Avaliação de Risco) ---
+@lru_cache(maxsize=128) # Cache para até 128 resultados diferentes
+def pyrosai_avaliar_criticidade_area(temperatura: int, umidade_ar: int, umidade_solo: int) -> str:
+    """
+    Simula uma avaliação detalhada da PyrosAI sobre a criticidade de uma micro-área.
+    Baseia-se em parâmetros simulados de temperatura, umidade do ar e umidade do solo,
+    utilizando um sistema de pontuação para maior variedade e realismo na simulação.
+    Esta função usa memoization (`lru_cache`) para otimizar chamadas repetidas
+    com os mesmos parâmetros, simulando a eficiência da IA em evitar recálculos.
+
+    Args:
+        temperatura (int): Temperatura ambiente simulada (ex: 20-40°C).
+        umidade_ar (int): Umidade relativa do ar simulada (ex: 0-100%).
+        umidade_solo (int): Percentual de umidade do solo simulado (ex: 0-100%).
 
-def gerar_id_ocorrencia():
+    Returns:
+        str: Nível de criticidade simulado ('BAIXA', 'MEDIA', 'ALTA', 'CRITICA').
     """
-    Simula a geração de um ID único para cada nova ocorrência de queimada no sistema.
+    # Esta linha é visível APENAS quando a função é *realmente* executada (não do cache).
+    print(f"  [PyrosAI SIMULANDO Processamento de Criticidade para Temp={temperatura}°C, UmidAr={umidade_ar}%, UmidSolo={umidade_solo}%]")
+
+    total_pontos_risco = (_pontos_temperatura(temperatura)
+                          + _pontos_umidade_ar(umidade_ar)
+                          + _pontos_umidade_solo(umidade_solo))
+    return _classificar_pontos_risco(total_pontos_risco)
+
+# --- Avaliação Vetorizada em Lote (Tabela de Consulta) ---
+# Fora destes intervalos a pontuação de cada fator é constante, então as leituras são
+# "grampeadas" (clip) para dentro deles sem alterar o resultado.
+_DOMINIO_TEMPERATURA = (20, 36)
+_DOMINIO_UMIDADE_AR = (15, 71)
+_DOMINIO_UMIDADE_SOLO = (10, 61)
+# Leituras NaN caem no ramo `else` de cada faixa escalar (toda comparação com NaN é falsa):
+# pontuação máxima em todos os fatores. Na tabela, isso equivale ao limite superior do
+# domínio de temperatura e ao limite inferior dos de umidade.
+
+def _construir_tabela_criticidade():
     """
-    return len(ocorrencias_ativas) + 1
+    Pré-calcula o código de severidade (valores de `SEVERIDADES`) para todo o domínio
+    inteiro relevante das três leituras, usando as mesmas faixas da avaliação escalar.
+    A tabela 3D resultante (~50 mil entradas int8) transforma a avaliação em lote
+    em uma simples indexação.
+    """
+    def pontos(funcao, dominio):
+        return np.array([funcao(v) for v in range(dominio[0], dominio[1] + 1)], dtype=np.int8)
 
-def inserir_nova_ocorrencia():
+    pontos_totais = (pontos(_pontos_temperatura, _DOMINIO_TEMPERATURA)[:, None, None]
+                     + pontos(_pontos_umidade_ar, _DOMINIO_UMIDADE_AR)[None, :, None]
+                     + pontos(_pontos_umidade_solo, _DOMINIO_UMIDADE_SOLO)[None, None, :])
+    codigo_por_pontos = np.array([SEVERIDADES[_classificar_pontos_risco(p)] for p in range(13)], dtype=np.int8)
+    return codigo_por_pontos[pontos_totais]
+
+TABELA_CRITICIDADE = _construir_tabela_criticidade()
+
+def _indices_dominio(leituras, dominio, valor_nan):
     """
-    Simula a detecção de uma nova ocorrência de queimada pelo sistema Artemis.
-    Coleta dados de sensores simulados e utiliza a `pyrosai_avaliar_criticidade_area`
-    (com memoization) para determinar a severidade da ocorrência.
-    Registra a ocorrência no dicionário `ocorrencias_ativas` e na fila de prioridade.
+    Converte leituras (qualquer sequência ou buffer) em índices da tabela.
+    Como as faixas são intervalos (a, b] com limites inteiros, arredondar valores
+    fracionários para cima (`ceil`) preserva exatamente a faixa de cada leitura.
+    Leituras NaN são substituídas por `valor_nan`, reproduzindo a avaliação escalar.
     """
-    print("\n--- Registrar Nova Ocorrência Simulada ---")
-    ocorrencia_id = gerar_id_ocorrencia()
+    valores = np.asarray(leituras)
+    if not np.issubdtype(valores.dtype, np.integer):
+        valores = np.nan_to_num(np.ceil(valores), nan=valor_nan, posinf=dominio[1], neginf=dominio[0])
+    return np.clip(valores, dominio[0], dominio[1]).astype(np.intp) - dominio[0]
 
-    print(f"  ID da Ocorrência Simulada: {ocorrencia_id}")
+def pyrosai_avaliar_criticidade_lote(temperaturas, umidades_ar, umidades_solo) -> np.ndarray:
+    """
+    Versão vetorizada de `pyrosai_avaliar_criticidade_area` para grandes volumes de leituras.
+    Recebe arrays NumPy (ou qualquer sequência/buffer) de mesmo formato e retorna, em uma
+    única passada, um array int8 com os códigos de severidade (1=BAIXA ... 4=CRITICA).
+    Não imprime nada e não passa pelo `lru_cache`: a avaliação é uma consulta à
+    `TABELA_CRITICIDADE` pré-calculada.
+    Leituras NaN (sensor sem valor) recebem a mesma severidade da função escalar, que
+    as pontua como risco máximo em cada fator.
 
-    # Simula a leitura de sensores para alimentar a PyrosAI
-    print("  Simulando leitura de dados de sensores para avaliação da PyrosAI...")
-    temp_sim = random.randint(15, 45) # Maior variação de temperatura
-    umid_ar_sim = random.randint(5, 95) # Maior variação de umidade
-    umid_solo_sim = random.randint(0, 90) # Maior variação de umidade do solo
+    Args:
+        temperaturas: Temperaturas simuladas (°C).
+        umidades_ar: Umidades relativas do ar simuladas (%).
+        umidades_solo: Umidades do solo simuladas (%).
 
-    # A PyrosAI avalia a criticidade usando a função memorizada
-    severidade_str = pyrosai_avaliar_criticidade_area(temp_sim, umid_ar_sim, umid_solo_sim)
-    print(f"  PyrosAI SIMULOU a avaliação de criticidade como: {severidade_str}")
+    Returns:
+        np.ndarray: Códigos de severidade (int8); use `NOMES_SEVERIDADE` para obter os nomes.
+    """
+    return TABELA_CRITICIDADE[_indices_dominio(temperaturas, _DOMINIO_TEMPERATURA, _DOMINIO_TEMPERATURA[1]),
+                              _indices_dominio(umidades_ar, _DOMINIO_UMIDADE_AR, _DOMINIO_UMIDADE_AR[0]),
+                              _indices_dominio(umidades_solo, _DOMINIO_UMIDADE_SOLO, _DOMINIO_UMIDADE_SOLO[0])]
 
+# --- Funções do Simulador (restante do código permanece o mesmo) ---
 
-    # Validação de localização (deve ser um nó no nosso grafo simulado)
+def gerar_id_ocorrencia(quantidade: int = 1):
+    """
+    Simula a geração de um ID único para cada nova ocorrência de queimada no sistema.
+    Reserva atomicamente `quantidade` IDs consecutivos e retorna o primeiro.
+    """
+    return ocorrencias_ativas.reservar_ids(quantidade)
+
+def registrar_ocorrencia(localizacao: str, severidade_str: str, temp: int, umid_ar: int, umid_solo: int) -> Ocorrencia:
+    """
+    Registra uma nova ocorrência detectada (sem interação com o usuário) no repositório
+    `ocorrencias_ativas` e na fila de prioridade de atendimento.
+    """
+    ocorrencia = Ocorrencia(
+        ID=gerar_id_ocorrencia(),
+        severidade_num=SEVERIDADES[severidade_str],
+        localizacao=localizacao,
+        status="DETECTADA",
+        timestamp_deteccao=relogio_simulacao.agora(),
+        temp=temp, umid_ar=umid_ar, umid_solo=umid_solo # Mantém os dados simulados para referência
+    )
+    ocorrencias_ativas.adicionar(ocorrencia)
+    # Adiciona à fila de prioridade (heapq) para simular o atendimento por prioridade
+    fila_prioridade_atendimento.inserir(ocorrencia.ID, ocorrencia.severidade_num)
+    return ocorrencia
+
+def alterar_status_ocorrencia(ocorrencia_id, novo_status: str) -> Ocorrencia:
+    """
+    Altera o status de uma ocorrência (sem interação com o usuário), mantendo a fila
+    de prioridade coerente: apenas ocorrências DETECTADA aguardam atendimento.
+    Com o arquivamento automático ativo, ocorrências EXTINTA saem da memória na hora.
+    """
+    ocorrencia = ocorrencias_ativas.atualizar_status(ocorrencia_id, novo_status)
+    if novo_status == "DETECTADA":
+        fila_prioridade_atendimento.inserir(ocorrencia_id, ocorrencia.severidade_num)
+    else:
+        fila_prioridade_atendimento.remover(ocorrencia_id)
+    if novo_status == "EXTINTA" and arquivo_ocorrencias is not None and arquivo_ocorrencias.automatico:
+        arquivar_ocorrencias([ocorrencia_id])
+    return ocorrencia
+
+def escalonar_severidade_ocorrencia(ocorrencia_id, nova_severidade: str) -> Ocorrencia:
+    """
+    Altera a severidade de uma ocorrência (ex: o fogo se alastrou) e, se ela ainda
+    aguarda atendimento, re-prioriza sua posição na fila em O(log N).
+    """
+    ocorrencia = ocorrencias_ativas.atualizar_severidade(ocorrencia_id, SEVERIDADES[nova_severidade.upper()])
+    if ocorrencia_id in fila_prioridade_atendimento:
+        fila_prioridade_atendimento.inserir(ocorrencia_id, ocorrencia.severidade_num)
+    return ocorrencia
+
+def inserir_nova_ocorrencia():
+    """
+    Simula a detecção de uma nova ocorrência de queimada pelo sistema Artemis.
+    Coleta dados de sensores simulados e utiliza a `pyrosai_avaliar_criticidade_area`
+    (com memoization) para determinar a severidade da ocorrência.
+    Registra a ocorrência no repositório `ocorrencias_ativas` e na fila de prioridade.
+    """
+    print("\n--- Registrar Nova Ocorrência Simulada ---")
+    print(f"  ID da Ocorrência Simulada: {ocorrencias_ativas.proximo_id}")
+
+    # Simula a leitura de sensores para alimentar a PyrosAI
+    print("  Simulando leitura de dados de sensores para avaliação da PyrosAI...")
+    temp_sim = random.randint(15, 45) # Maior variação de temperatura
+    umid_ar_sim = random.randint(5, 95) # Maior variação de umidade
+    umid_solo_sim = random.randint(0, 90) # Maior variação de umidade do solo
+
+    # A PyrosAI avalia a criticidade usando a função memorizada
+    severidade_str = pyrosai_avaliar_criticidade_area(temp_sim, umid_ar_sim, umid_solo_sim)
+    print(f"  PyrosAI SIMULOU a avaliação de criticidade como: {severidade_str}")
+
+
+    # Validação de localização (deve ser um nó no nosso grafo simulado)
     localizacao_ocorrencia = ""
     disponivel_locais = list(rede_localizacoes_graph.nodes)
     while localizacao_ocorrencia not in disponivel_locais:
@@ -163,26 +1562,14 @@ def inserir_nova_ocorrencia():
         if localizacao_ocorrencia not in disponivel_locais:
             print("  Localização inválida ou não mapeada no sistema simulado. Tente novamente.")
 
-    ocorrencia_details = {
-        'ID': ocorrencia_id,
-        'severidade': severidade_str,
-        'severidade_num': SEVERIDADES[severidade_str],
-        'localizacao': localizacao_ocorrencia,
-        'status': "DETECTADA",
-        'timestamp_deteccao': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        'sensor_data_simulated': {'temp': temp_sim, 'umid_ar': umid_ar_sim, 'umid_solo': umid_solo_sim} # Adiciona os dados simulados para referência
-    }
-
-    ocorrencias_ativas[ocorrencia_id] = ocorrencia_details
-    # Adiciona à fila de prioridade (heapq) para simular o atendimento por prioridade
-    heapq.heappush(fila_prioridade_atendimento, (-ocorrencia_details['severidade_num'], ocorrencia_id))
+    ocorrencia = registrar_ocorrencia(localizacao_ocorrencia, severidade_str, temp_sim, umid_ar_sim, umid_solo_sim)
 
-    print(f"Ocorrência {ocorrencia_id} registrada com sucesso: {ocorrencia_details['severidade']} em {ocorrencia_details['localizacao']}.")
+    print(f"Ocorrência {ocorrencia.ID} registrada com sucesso: {ocorrencia.severidade} em {ocorrencia.localizacao}.")
 
 def exibir_ocorrencias_ativas():
     """
     Exibe todas as ocorrências de queimada que estão ativas (não extintas) no simulador.
-    Itera sobre o dicionário `ocorrencias_ativas`.
+    Consulta os índices de status do repositório `ocorrencias_ativas`, sem varrer as extintas.
     """
     print("\n--- Ocorrências Ativas Simuladas ---")
     if not ocorrencias_ativas:
@@ -191,16 +1578,15 @@ def exibir_ocorrencias_ativas():
 
     print(f"{'ID':<5} | {'Severidade':<12} | {'Localização':<20} | {'Status':<15} | {'Detecção':<20}")
     print("-" * 75)
-    for id, details in ocorrencias_ativas.items():
-        if details['status'] != "EXTINTA":
-            print(f"{id:<5} | {details['severidade']:<12} | {details['localizacao']:<20} | {details['status']:<15} | {details['timestamp_deteccao']:<20}")
+    for details in ocorrencias_ativas.ativas():
+        print(f"{details.ID:<5} | {details.severidade:<12} | {details.localizacao:<20} | {details.status:<15} | {details.data_deteccao:<20}")
 
 def buscar_ocorrencia_por_severidade(severidade_alvo: str):
     """
     Simula a busca por ocorrências com uma severidade específica.
-    Demonstra o conceito de Busca Binária. Para fins didáticos, uma lista temporária
-    é criada e ordenada para permitir a aplicação da busca binária.
-    Complexidade: O(N log N) para ordenar a lista + O(log N) para a busca.
+    Usa o índice (severidade, status) mantido incrementalmente pelo repositório
+    `ocorrencias_ativas`, em vez de montar e ordenar uma lista temporária a cada busca.
+    Complexidade: O(R log R), onde R é o número de ocorrências encontradas.
     """
     print(f"\n--- Simulando Busca por Ocorrências com Severidade '{severidade_alvo}' ---")
     severidade_alvo_upper = severidade_alvo.upper()
@@ -208,108 +1594,283 @@ def buscar_ocorrencia_por_severidade(severidade_alvo: str):
         print("  Severidade alvo inválida.")
         return
 
-    severidade_num_alvo = SEVERIDADES[severidade_alvo_upper]
-    
-    # Criar uma lista de tuplas (severidade_numerica, ID_ocorrencia) das ocorrências ativas simuladas
-    ocorrencias_ordenadas_por_severidade = []
-    for id, details in ocorrencias_ativas.items():
-        if details['status'] != "EXTINTA": # Considera apenas ocorrências ainda ativas
-            ocorrencias_ordenadas_por_severidade.append((details['severidade_num'], id))
-    
-    # Ordena a lista para permitir a busca binária (O(N log N))
-    ocorrencias_ordenadas_por_severidade.sort() 
-
-    # --- Implementação da Busca Binária ---
-    low, high = 0, len(ocorrencias_ordenadas_por_severidade) - 1
-    primeiro_match_idx = -1
-
-    while low <= high:
-        mid = (low + high) // 2
-        if ocorrencias_ordenadas_por_severidade[mid][0] >= severidade_num_alvo:
-            primeiro_match_idx = mid
-            high = mid - 1 # Tenta encontrar uma correspondência mais à esquerda (primeira ocorrência)
-        else:
-            low = mid + 1
-            
-    encontradas = []
-    if primeiro_match_idx != -1:
-        # Percorre a partir do primeiro_match_idx para coletar todas as ocorrências com a severidade exata
-        for i in range(primeiro_match_idx, len(ocorrencias_ordenadas_por_severidade)):
-            if ocorrencias_ordenadas_por_severidade[i][0] == severidade_num_alvo:
-                encontradas.append(ocorrencias_ativas[ocorrencias_ordenadas_por_severidade[i][1]])
-            else:
-                # Como a lista está ordenada, se a severidade já aumentou, não haverá mais com a severidade alvo
-                break 
+    # Considera apenas ocorrências ainda ativas (não extintas)
+    encontradas = ocorrencias_ativas.por_severidade(SEVERIDADES[severidade_alvo_upper])
 
     if encontradas:
         print(f"{'ID':<5} | {'Severidade':<12} | {'Localização':<20} | {'Status':<15}")
         print("-" * 55)
         for details in encontradas:
-            print(f"{details['ID']:<5} | {details['severidade']:<12} | {details['localizacao']:<20} | {details['status']:<15}")
+            print(f"{details.ID:<5} | {details.severidade:<12} | {details.localizacao:<20} | {details.status:<15}")
     else:
         print(f"  Nenhuma ocorrência com severidade '{severidade_alvo}' encontrada na simulação.")
 
 
+def _extrair_despachavel(fila, repositorio, roteador):
+    """
+    Retira da `fila` a ocorrência de maior prioridade que alguma base alcança e a marca
+    EM_ATENDIMENTO. As que nenhuma base alcança são estacionadas na própria fila (continuam
+    DETECTADA, fora do heap) e só voltam a ser testadas quando a tabela de rotas é
+    reconstruída ou reparada; assim o custo do despacho não cresce com elas.
+
+    Returns:
+        tuple | None: None se não há ocorrência despachável; (ocorrencia, rota) para a
+        ocorrência despachada; ou (ocorrencia, None) com a primeira ocorrência estacionada
+        nesta chamada, se nenhuma das extraídas tem rota.
+    """
+    roteador._garantir_tabela()
+    fila.liberar_sem_rota(lambda local: roteador.base_mais_proxima(local) is not None, roteador.versao_tabela)
+    primeira_sem_rota = None
+    while True:
+        # Ocorrências extintas ou re-priorizadas já foram retiradas/atualizadas na fila
+        # indexada, então não há entradas obsoletas aqui.
+        ocorrencia_id = fila.extrair()
+        if ocorrencia_id is None:
+            break
+        ocorrencia = repositorio[ocorrencia_id]
+        # Um único Dijkstra multi-origem (em cache) responde base mais próxima + rota
+        rota = roteador.base_mais_proxima(ocorrencia.localizacao)
+        if rota is not None:
+            repositorio.atualizar_status(ocorrencia_id, "EM_ATENDIMENTO") # Já saiu da fila ao ser extraída
+            return ocorrencia, rota
+        fila.estacionar(ocorrencia_id, ocorrencia.severidade_num, ocorrencia.localizacao)
+        primeira_sem_rota = primeira_sem_rota or ocorrencia
+    return (primeira_sem_rota, None) if primeira_sem_rota else None
+
+def despachar_proxima_ocorrencia():
+    """
+    Núcleo (sem saída no console) do atendimento: retira da fila a ocorrência de maior
+    prioridade que alguma base alcança, consulta o `roteador_pyrosai` e a marca
+    EM_ATENDIMENTO. Ocorrências sem rota ficam estacionadas na fila (ver `_extrair_despachavel`).
+
+    Returns:
+        tuple | None: None se não há ocorrência despachável; senão (ocorrencia, rota), onde
+        `rota` é (base, distancia, caminho) ou None se nenhuma das extraídas tem rota.
+    """
+    inicio = time.perf_counter()
+    resultado = _extrair_despachavel(fila_prioridade_atendimento, ocorrencias_ativas, roteador_pyrosai)
+    if resultado is None:
+        return None
+    ocorrencia, rota = resultado
+    if metricas_pyrosai.habilitado:
+        metricas_pyrosai.observar('estagio_despacho', time.perf_counter() - inicio)
+        metricas_pyrosai.incrementar('despachos' if rota is not None else 'despachos_sem_rota')
+    return ocorrencia, rota
+
 def atender_proxima_ocorrencia():
     """
     Simula o atendimento da próxima ocorrência de queimada com maior prioridade (severidade).
     Utiliza a fila de prioridade (`heapq`) e simula a otimização de rota da PyrosAI
-    usando algoritmos de caminho mais curto do NetworkX.
+    com o `roteador_pyrosai` (um Dijkstra multi-origem em cache sobre o grafo).
     """
     print("\n--- Simulando Atendimento da Próxima Ocorrência (PyrosAI Otimização) ---")
     if not fila_prioridade_atendimento:
         print("  Nenhuma ocorrência na fila simulada para atendimento.")
         return
 
-    # Pega a ocorrência de maior prioridade (menor valor negativo na fila)
-    severidade_neg, ocorrencia_id = heapq.heappop(fila_prioridade_atendimento)
-    
-    # Verifica se a ocorrência ainda existe e não foi extinta por outro meio na simulação
-    if ocorrencia_id not in ocorrencias_ativas or ocorrencias_ativas[ocorrencia_id]['status'] == "EXTINTA":
-        print(f"  Ocorrência {ocorrencia_id} já foi tratada ou não existe mais. Buscando a próxima na simulação...")
-        return atender_proxima_ocorrencia() # Tenta a próxima recursivamente (simulando re-fila)
-
-    ocorrencia = ocorrencias_ativas[ocorrencia_id]
-    
     # Simula a "PyrosAI" encontrando a base mais próxima usando o grafo do NetworkX
-    bases_disponiveis = [node for node in rede_localizacoes_graph.nodes if node.startswith('Base')]
-    
-    if not bases_disponiveis:
+    if not listar_bases(rede_localizacoes_graph):
         print("  Nenhuma base de equipes disponível no grafo simulado.")
         return
 
-    melhor_base = None
-    menor_distancia = float('infinity')
-    melhor_caminho = None
-
     print("\n  PyrosAI SIMULANDO cálculo de rota otimizada...")
-    for base in bases_disponiveis:
-        try:
-            # Utiliza o algoritmo de Dijkstra do NetworkX para encontrar o caminho mais curto
-            caminho = nx.shortest_path(rede_localizacoes_graph, source=base, target=ocorrencia['localizacao'], weight='weight')
-            distancia = nx.shortest_path_length(rede_localizacoes_graph, source=base, target=ocorrencia['localizacao'], weight='weight')
-            
-            if distancia < menor_distancia:
-                menor_distancia = distancia
-                melhor_base = base
-                melhor_caminho = caminho
-        except nx.NetworkXNoPath:
-            # Simula a ausência de um caminho direto entre a base e a ocorrência
-            continue
-        except nx.NodeNotFound:
-            # Simula um erro onde um nó (base ou localização) não foi encontrado no grafo
-            print(f"  Erro simulado: Nó '{base}' ou '{ocorrencia['localizacao']}' não encontrado no grafo simulado.")
-            continue
-    
-    if melhor_base:
-        print(f"  PyrosAI SIMULOU recomendação: equipe da '{melhor_base}' para Ocorrência {ocorrencia_id} (Severidade: {ocorrencia['severidade']}).")
+    resultado = despachar_proxima_ocorrencia()
+    if resultado is None:
+        print(f"  As {fila_prioridade_atendimento.quantidade_sem_rota} ocorrências na fila estão sem rota simulada. Verifique a conectividade do grafo.")
+        return
+    ocorrencia, rota = resultado
+
+    if rota:
+        melhor_base, menor_distancia, melhor_caminho = rota
+        print(f"  PyrosAI SIMULOU recomendação: equipe da '{melhor_base}' para Ocorrência {ocorrencia.ID} (Severidade: {ocorrencia.severidade}).")
         print(f"  Rota otimizada simulada ({menor_distancia}km): {' -> '.join(melhor_caminho)}")
-        
-        ocorrencias_ativas[ocorrencia_id]['status'] = "EM_ATENDIMENTO"
-        print(f"  Ocorrência {ocorrencia_id} agora está '{ocorrencias_ativas[ocorrencia_id]['status']}' (status simulado).")
+        print(f"  Ocorrência {ocorrencia.ID} agora está '{ocorrencia.status}' (status simulado).")
+    else:
+        print(f"  Nenhuma ocorrência da fila tem rota simulada (a mais prioritária é a {ocorrencia.ID}, que aguarda uma rota na fila). Verifique a conectividade do grafo.")
+
+
+# --- Despacho em Lote (Atribuição Ótima por Custo Mínimo) ---
+def _atribuicao_custo_minimo(custos) -> list:
+    """
+    Algoritmo Húngaro (versão com potenciais, O(n² m)) para a matriz retangular `custos`
+    de n linhas por m colunas (n <= m, custos finitos). Cada linha recebe uma coluna
+    distinta minimizando a soma total dos custos.
+
+    Returns:
+        list: Para cada linha, o índice da coluna atribuída.
+    """
+    n, m = len(custos), len(custos[0])
+    infinito = float('inf')
+    u = [0.0] * (n + 1)
+    v = [0.0] * (m + 1)
+    dono = [0] * (m + 1)  # dono[j]: linha (1-indexada) atribuída à coluna j
+    anterior = [0] * (m + 1)
+    for i in range(1, n + 1):
+        dono[0] = i
+        j0 = 0
+        minimo = [infinito] * (m + 1)
+        usada = [False] * (m + 1)
+        while True:
+            usada[j0] = True
+            i0 = dono[j0]
+            linha = custos[i0 - 1]
+            delta = infinito
+            j1 = 0
+            for j in range(1, m + 1):
+                if not usada[j]:
+                    reduzido = linha[j - 1] - u[i0] - v[j]
+                    if reduzido < minimo[j]:
+                        minimo[j] = reduzido
+                        anterior[j] = j0
+                    if minimo[j] < delta:
+                        delta = minimo[j]
+                        j1 = j
+            for j in range(m + 1):
+                if usada[j]:
+                    u[dono[j]] += delta
+                    v[j] -= delta
+                else:
+                    minimo[j] -= delta
+            j0 = j1
+            if dono[j0] == 0:
+                break
+        while j0:
+            j1 = anterior[j0]
+            dono[j0] = dono[j1]
+            j0 = j1
+
+    atribuicao = [-1] * n
+    for j in range(1, m + 1):
+        if dono[j]:
+            atribuicao[dono[j] - 1] = j - 1
+    return atribuicao
+
+def equipes_das_bases(grafo) -> dict:
+    """Equipes disponíveis por base, lidas do atributo de nó 'equipes' (padrão: 1)."""
+    return {base: grafo.nodes[base].get('equipes', 1) for base in listar_bases(grafo)}
+
+def despachar_lote(quantidade: int = 10, equipes_por_base: dict = None) -> list:
+    """
+    Despacho em lote para ondas de incêndios simultâneos: retira da fila as `quantidade`
+    ocorrências de maior prioridade e calcula a atribuição globalmente ótima às equipes
+    das bases. A cobertura é lexicográfica por severidade: atende o máximo possível das
+    CRITICA, depois das ALTA e assim por diante, e só então minimiza a soma de
+    (severidade × distância). Cada base recebe no máximo o seu número de equipes.
+    Ocorrências que ficarem sem equipe voltam à fila; as que nenhuma base alcança ficam
+    estacionadas (ver `_extrair_despachavel`) e não ocupam vagas do lote.
+    A matriz de distâncias é montada com um Dijkstra por base (interrompido quando todos
+    os locais do lote são alcançados), em vez de um por par base × ocorrência; se o lote
+    tiver menos locais distintos que bases, faz uma busca reversa por local, que para
+    nas K bases mais próximas (nenhuma ocorrência precisa de mais opções que o tamanho
+    do lote para que a atribuição continue ótima).
+
+    Args:
+        quantidade (int): Máximo de ocorrências retiradas da fila (top-K).
+        equipes_por_base (dict): {base: equipes}; padrão `equipes_das_bases(rede_localizacoes_graph)`.
+
+    Returns:
+        list: Pares (ocorrencia, rota) em ordem de prioridade, com `rota` = (base, distancia, caminho)
+        ou None para as ocorrências devolvidas à fila.
+    """
+    inicio = time.perf_counter()
+    roteador_pyrosai._garantir_tabela()
+    alcancavel = lambda local: roteador_pyrosai.base_mais_proxima(local) is not None
+    fila_prioridade_atendimento.liberar_sem_rota(alcancavel, roteador_pyrosai.versao_tabela)
+    ocorrencias = []
+    while len(ocorrencias) < quantidade:
+        ocorrencia_id = fila_prioridade_atendimento.extrair()
+        if ocorrencia_id is None:
+            break
+        ocorrencia = ocorrencias_ativas[ocorrencia_id]
+        if alcancavel(ocorrencia.localizacao):
+            ocorrencias.append(ocorrencia)
+        else: # Nenhuma base alcança: estaciona em vez de ocupar uma vaga do lote
+            fila_prioridade_atendimento.estacionar(ocorrencia_id, ocorrencia.severidade_num, ocorrencia.localizacao)
+    if not ocorrencias:
+        return []
+
+    if equipes_por_base is None:
+        equipes_por_base = equipes_das_bases(rede_localizacoes_graph)
+    locais = {ocorrencia.localizacao for ocorrencia in ocorrencias}
+
+    bases = [base for base, equipes in equipes_por_base.items() if equipes > 0 and base in rede_localizacoes_graph]
+    colunas = []  # Uma coluna por equipe (cada base contribui com até `quantidade` colunas)
+    for base in bases:
+        colunas.extend([base] * min(equipes_por_base[base], len(ocorrencias)))
+
+    # Matriz de distâncias compartilhada: min(bases, locais) buscas no total
+    distancias = {}
+    caminhos = {}
+    if len(locais) < len(bases):
+        for local in locais:
+            dist, proximos, _ = _dijkstra_multi_origem(rede_localizacoes_graph, [local], alvos=bases, reverso=True,
+                                                       quantidade_alvos=len(ocorrencias))
+            for base in bases:
+                # Bases alcançadas mas não finalizadas têm uma rota real (não necessariamente a
+                # mais curta); manter essas colunas nunca piora a atribuição ótima
+                if base in dist:
+                    distancias[(base, local)] = dist[base]
+                    caminhos[(base, local)] = lambda proximos=proximos, base=base: _caminho_ate_raiz(proximos, base)
     else:
-        print(f"  Não foi possível encontrar uma rota simulada para a Ocorrência {ocorrencia_id}. Verifique a conectividade do grafo.")
+        for base in bases:
+            dist, predecessores, _ = _dijkstra_multi_origem(rede_localizacoes_graph, [base], alvos=locais)
+            for local in locais:
+                if local in dist:
+                    distancias[(base, local)] = dist[local]
+                    caminhos[(base, local)] = lambda predecessores=predecessores, local=local: _reconstruir_caminho(predecessores, local)
+
+    # Deixar sem equipe uma ocorrência de um nível custa mais que qualquer rearranjo das
+    # rotas do lote somado a deixar de fora todas as de nível inferior: o ótimo nunca troca
+    # uma ocorrência mais severa por outras menos severas ou mais próximas.
+    # Pares sem rota custam ainda mais, para nunca serem escolhidos.
+    penalidade = max(distancias.values(), default=0) + 1
+    acumulado = sum(ocorrencia.severidade_num for ocorrencia in ocorrencias) * penalidade # > soma de quaisquer rotas
+    custo_sem_equipe = {}
+    for nivel in sorted({ocorrencia.severidade_num for ocorrencia in ocorrencias}):
+        custo_sem_equipe[nivel] = acumulado + 1
+        acumulado += custo_sem_equipe[nivel] * sum(1 for ocorrencia in ocorrencias if ocorrencia.severidade_num == nivel)
+    custos = []
+    for ocorrencia in ocorrencias:
+        peso, sem_equipe = ocorrencia.severidade_num, custo_sem_equipe[ocorrencia.severidade_num]
+        linha = [peso * distancias[(base, ocorrencia.localizacao)] if (base, ocorrencia.localizacao) in distancias
+                 else 2 * sem_equipe for base in colunas]
+        linha.extend([sem_equipe] * len(ocorrencias)) # Colunas fictícias "sem equipe"
+        custos.append(linha)
+
+    resultado = []
+    for ocorrencia, coluna in zip(ocorrencias, _atribuicao_custo_minimo(custos)):
+        par = (colunas[coluna], ocorrencia.localizacao) if coluna < len(colunas) else None
+        if par in distancias:
+            rota = (par[0], distancias[par], caminhos[par]())
+            ocorrencias_ativas.atualizar_status(ocorrencia.ID, "EM_ATENDIMENTO")
+        else:
+            rota = None
+            fila_prioridade_atendimento.inserir(ocorrencia.ID, ocorrencia.severidade_num)
+        resultado.append((ocorrencia, rota))
+
+    if metricas_pyrosai.habilitado:
+        metricas_pyrosai.observar('despacho_lote', time.perf_counter() - inicio)
+        metricas_pyrosai.incrementar('despachos', sum(1 for _, rota in resultado if rota is not None))
+    return resultado
 
+def atender_ocorrencias_em_lote():
+    """
+    Simula o despacho em lote da PyrosAI: as ocorrências mais prioritárias da fila são
+    distribuídas entre as equipes das bases por atribuição ótima de custo mínimo.
+    """
+    print("\n--- Simulando Despacho em Lote (PyrosAI Atribuição Ótima) ---")
+    if not fila_prioridade_atendimento:
+        print("  Nenhuma ocorrência na fila simulada para atendimento.")
+        return
+    equipes = equipes_das_bases(rede_localizacoes_graph)
+    print(f"  Equipes disponíveis: {', '.join(f'{base} ({n})' for base, n in equipes.items())}")
+
+    for ocorrencia, rota in despachar_lote(sum(equipes.values()), equipes):
+        if rota:
+            base, distancia, caminho = rota
+            print(f"  Ocorrência {ocorrencia.ID} ({ocorrencia.severidade}) -> equipe da '{base}' ({distancia}km): {' -> '.join(caminho)}")
+        else:
+            print(f"  Ocorrência {ocorrencia.ID} ({ocorrencia.severidade}) permanece na fila (sem equipe ou rota disponível).")
 
 def atualizar_status_ocorrencia():
     """
@@ -323,11 +1884,15 @@ def atualizar_status_ocorrencia():
         return
 
     if ocorrencia_id not in ocorrencias_ativas:
-        print("  Ocorrência não encontrada na simulação.")
+        arquivada = arquivo_ocorrencias.get(ocorrencia_id) if arquivo_ocorrencias is not None else None
+        if arquivada is not None:
+            print(f"  Ocorrência {ocorrencia_id} já foi arquivada (status final: {arquivada.status}).")
+        else:
+            print("  Ocorrência não encontrada na simulação.")
         return
 
     ocorrencia = ocorrencias_ativas[ocorrencia_id]
-    print(f"  Status atual da Ocorrência {ocorrencia_id}: {ocorrencia['status']}")
+    print(f"  Status atual da Ocorrência {ocorrencia_id}: {ocorrencia.status}")
     print(f"  Novos status disponíveis: {', '.join(STATUS_OCORRENCIA)}")
 
     novo_status = ""
@@ -336,32 +1901,93 @@ def atualizar_status_ocorrencia():
         if novo_status not in STATUS_OCORRENCIA:
             print("  Status inválido. Tente novamente.")
 
-    ocorrencia['status'] = novo_status
+    alterar_status_ocorrencia(ocorrencia_id, novo_status)
     if novo_status == "EXTINTA":
         print(f"  Ocorrência {ocorrencia_id} marcada como EXTINTA (simulação).")
+        if ocorrencia_id not in ocorrencias_ativas:
+            print(f"  Ocorrência {ocorrencia_id} movida para o arquivo histórico.")
     
     print(f"  Status da Ocorrência {ocorrencia_id} atualizado para '{novo_status}'.")
 
+def montar_relatorio_por_localizacao() -> dict:
+    """
+    Núcleo (sem saída no console) do relatório: {localização: [ocorrências em ordem de registro]}.
+    O índice por localização do repositório já agrupa o histórico de cada local.
+    """
+    return {local: ocorrencias_ativas.por_localizacao(local) for local in ocorrencias_ativas.localizacoes()}
+
+def montar_resumo_por_localizacao() -> dict:
+    """
+    Resumo do relatório: {localização: {status: quantidade}}, a partir dos contadores
+    mantidos pelo repositório a cada inserção/mudança de status (O(localizações)).
+    """
+    return ocorrencias_ativas.contagem_por_localizacao()
+
+# Colunas do relatório detalhado exportado
+CAMPOS_RELATORIO = ("localizacao", "ID", "severidade", "status", "timestamp_deteccao", "temp", "umid_ar", "umid_solo")
+
+def _linhas_relatorio_detalhado():
+    """Gera as linhas do relatório detalhado (agrupadas por localização), uma a uma."""
+    for local in ocorrencias_ativas.localizacoes():
+        for ocorrencia_id in ocorrencias_ativas.ids_por_localizacao(local):
+            o = ocorrencias_ativas[ocorrencia_id]
+            yield (local, o.ID, o.severidade, o.status, o.timestamp_deteccao, o.temp, o.umid_ar, o.umid_solo)
+
+def exportar_relatorio_detalhado(caminho: str, formato: str = None, tamanho_bloco: int = 10_000) -> int:
+    """
+    Grava o relatório detalhado (todas as ocorrências, por localização) em CSV ou JSONL,
+    em blocos de `tamanho_bloco` linhas: apenas um bloco fica em memória por vez.
+    O formato é deduzido da extensão do arquivo quando não informado.
+
+    Returns:
+        int: Quantidade de ocorrências exportadas.
+    """
+    formato = formato or os.path.splitext(caminho)[1].lstrip('.').lower()
+    if formato not in ("csv", "jsonl"):
+        raise ValueError(f"Formato de exportação não suportado: '{formato}'. Use 'csv' ou 'jsonl'.")
+
+    total = 0
+    linhas = _linhas_relatorio_detalhado()
+    with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+        if formato == "csv":
+            escritor = csv.writer(arquivo)
+            escritor.writerow(CAMPOS_RELATORIO)
+            gravar_bloco = escritor.writerows
+        else:
+            def gravar_bloco(bloco):
+                arquivo.write(''.join(json.dumps(dict(zip(CAMPOS_RELATORIO, linha)), ensure_ascii=False) + '\n' for linha in bloco))
+        while bloco := list(itertools.islice(linhas, tamanho_bloco)):
+            gravar_bloco(bloco)
+            total += len(bloco)
+    return total
+
 def gerar_relatorio_atendimento_por_localizacao():
     """
-    Gera um relatório simulado de ocorrências por localização, mostrando o histórico.
+    Gera um relatório simulado por localização: contagens por status de cada local (lidas dos
+    agregados incrementais, sem percorrer o histórico) e, opcionalmente, exporta o
+    histórico completo para um arquivo CSV/JSONL.
     """
     print("\n--- Relatório Simulado de Ocorrências por Localização ---")
     if not ocorrencias_ativas:
         print("  Nenhuma ocorrência registrada na simulação.")
         return
 
-    relatorio = {}
-    for id, details in ocorrencias_ativas.items():
-        local = details['localizacao']
-        if local not in relatorio:
-            relatorio[local] = []
-        relatorio[local].append(f"ID {id} | Severidade: {details['severidade']} | Status: {details['status']} | Detecção: {details['timestamp_deteccao']}")
-    
-    for local, ocorrencias in relatorio.items():
-        print(f"\n  Localização: {local}")
-        for ocorrencia_info in ocorrencias:
-            print(f"    - {ocorrencia_info}")
+    for local, contagem in montar_resumo_por_localizacao().items():
+        detalhes = " | ".join(f"{status}: {contagem[status]}" for status in STATUS_OCORRENCIA if status in contagem)
+        print(f"  Localização: {local} | Total: {sum(contagem.values())} | {detalhes}")
+
+    print("\n  Ocorrências por severidade (não extintas):")
+    contagem_severidade = ocorrencias_ativas.contagem_por_severidade_status()
+    for codigo, nome in NOMES_SEVERIDADE.items():
+        quantidade = sum(n for (severidade, status), n in contagem_severidade.items() if severidade == codigo and status != "EXTINTA")
+        print(f"    - {nome}: {quantidade}")
+
+    caminho = input("\n  Exportar o histórico detalhado (arquivo .csv/.jsonl, Enter para pular): ").strip()
+    if caminho:
+        try:
+            print(f"  {exportar_relatorio_detalhado(caminho)} ocorrências exportadas para '{caminho}'.")
+        except (ValueError, OSError) as erro:
+            print(f"  Erro ao exportar: {erro}")
 
 def simular_chamadas_aleatorias():
     """
@@ -376,7 +2002,6 @@ def simular_chamadas_aleatorias():
     locais_validos = list(rede_localizacoes_graph.nodes) # Usar nós do grafo para simular locais
     
     for i in range(num_simulacoes):
-        ocorrencia_id = gerar_id_ocorrencia()
         localizacao_ocorrencia = random.choice(locais_validos)
 
         # Simula leituras de sensores para a PyrosAI com ranges mais amplos para maior variedade
@@ -386,19 +2011,1523 @@ def simular_chamadas_aleatorias():
 
         # A PyrosAI avalia a criticidade usando a função memorizada (lru_cache)
         severidade_str = pyrosai_avaliar_criticidade_area(temp_sim, umid_ar_sim, umid_solo_sim)
-        
-        ocorrencia_details = {
-            'ID': ocorrencia_id,
-            'severidade': severidade_str,
-            'severidade_num': SEVERIDADES[severidade_str],
-            'localizacao': localizacao_ocorrencia,
-            'status': "DETECTADA",
-            'timestamp_deteccao': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            'sensor_data_simulated': {'temp': temp_sim, 'umid_ar': umid_ar_sim, 'umid_solo': umid_solo_sim}
+
+        ocorrencia = registrar_ocorrencia(localizacao_ocorrencia, severidade_str, temp_sim, umid_ar_sim, umid_solo_sim)
+        print(f"  - Simulação: Ocorrência {ocorrencia.ID} ({severidade_str}) em {localizacao_ocorrencia} detectada.")
+
+
+# --- Ingestão Contínua de Leituras de Sensores (Sem Interação) ---
+@dataclass
+class EstatisticasIngestao:
+    """
+    Contadores e tempos acumulados (em segundos) de cada estágio da ingestão:
+    leitura da fonte, avaliação de criticidade e registro das ocorrências.
+    """
+    leituras: int = 0
+    registradas: int = 0
+    rejeitadas: int = 0
+    lotes: int = 0
+    tempo_leitura: float = 0.0
+    tempo_pontuacao: float = 0.0
+    tempo_registro: float = 0.0
+
+    def vazao_por_estagio(self) -> dict:
+        """Leituras processadas por segundo em cada estágio e no total."""
+        def vazao(tempo):
+            return self.leituras / tempo if tempo > 0 else float('inf')
+        total = self.tempo_leitura + self.tempo_pontuacao + self.tempo_registro
+        return {
+            'leitura': vazao(self.tempo_leitura),
+            'pontuacao': vazao(self.tempo_pontuacao),
+            'registro': vazao(self.tempo_registro),
+            'total': vazao(total),
         }
-        ocorrencias_ativas[ocorrencia_id] = ocorrencia_details
-        heapq.heappush(fila_prioridade_atendimento, (-ocorrencia_details['severidade_num'], ocorrencia_id))
-        print(f"  - Simulação: Ocorrência {ocorrencia_id} ({severidade_str}) em {localizacao_ocorrencia} detectada.")
+
+    def resumo(self) -> str:
+        vazoes = self.vazao_por_estagio()
+        linhas = [f"  Leituras: {self.leituras} | Registradas: {self.registradas} | Rejeitadas: {self.rejeitadas} | Lotes: {self.lotes}"]
+        for estagio, tempo in (('leitura', self.tempo_leitura), ('pontuacao', self.tempo_pontuacao), ('registro', self.tempo_registro)):
+            linhas.append(f"  - {estagio:<10}: {tempo:8.3f}s ({vazoes[estagio]:,.0f} leituras/s)")
+        linhas.append(f"  - {'total':<10}: {self.tempo_leitura + self.tempo_pontuacao + self.tempo_registro:8.3f}s ({vazoes['total']:,.0f} leituras/s)")
+        return "\n".join(linhas)
+
+def _numero(valor):
+    # Campo vazio, nulo ou inválido vira NaN (sensor sem valor), como na avaliação escalar
+    if isinstance(valor, str):
+        try:
+            return int(valor)
+        except ValueError:
+            try:
+                return float(valor)
+            except ValueError:
+                return float('nan')
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return valor
+    return float('nan')
+
+# Leitura de linha corrompida: a localização vazia faz o pipeline contá-la como rejeitada
+_LEITURA_INVALIDA = ('', float('nan'), float('nan'), float('nan'))
+
+def ler_leituras_csv(caminho):
+    """
+    Gera leituras (localizacao, temp, umid_ar, umid_solo) a partir de um CSV com
+    cabeçalho `localizacao,temp,umid_ar,umid_solo`, sem carregar o arquivo inteiro.
+    Campos numéricos vazios ou inválidos viram NaN; linhas incompletas são rejeitadas
+    pelo pipeline.
+    """
+    with open(caminho, newline='', encoding='utf-8') as arquivo:
+        leitor = csv.reader(arquivo)
+        cabecalho = next(leitor, None)
+        if cabecalho is None:
+            return
+        colunas = [cabecalho.index(nome) for nome in ('localizacao', 'temp', 'umid_ar', 'umid_solo')]
+        i_local, i_temp, i_ar, i_solo = colunas
+        minimo_campos = max(colunas) + 1
+        for linha in leitor:
+            if len(linha) < minimo_campos:
+                if linha: # Linhas em branco não são leituras
+                    yield _LEITURA_INVALIDA
+                continue
+            yield (linha[i_local], _numero(linha[i_temp]), _numero(linha[i_ar]), _numero(linha[i_solo]))
+
+def ler_leituras_jsonl(caminho):
+    """
+    Gera leituras (localizacao, temp, umid_ar, umid_solo) a partir de um arquivo JSONL,
+    um objeto por linha com as mesmas chaves do CSV. Valores ausentes, nulos ou
+    inválidos viram NaN; linhas que não são um objeto JSON são rejeitadas pelo pipeline.
+    """
+    with open(caminho, encoding='utf-8') as arquivo:
+        for linha in arquivo:
+            if linha.strip():
+                try:
+                    registro = json.loads(linha)
+                except ValueError:
+                    yield _LEITURA_INVALIDA
+                    continue
+                if not isinstance(registro, dict):
+                    yield _LEITURA_INVALIDA
+                    continue
+                localizacao = registro.get('localizacao')
+                yield (localizacao if isinstance(localizacao, str) else '', _numero(registro.get('temp')),
+                       _numero(registro.get('umid_ar')), _numero(registro.get('umid_solo')))
+
+def _criar_ocorrencias(primeiro_id: int, localizacoes, codigos_severidade, temps, umids_ar, umids_solo) -> list:
+    """Cria as ocorrências DETECTADA de um lote, com IDs a partir de `primeiro_id` e um único timestamp."""
+    timestamp = relogio_simulacao.agora()
+    # Argumentos posicionais na ordem dos campos de `Ocorrencia` (mais rápido em lotes grandes)
+    return [
+        Ocorrencia(ocorrencia_id, codigo, local, "DETECTADA", timestamp, temp, umid_ar, umid_solo)
+        for ocorrencia_id, local, codigo, temp, umid_ar, umid_solo
+        in zip(itertools.count(primeiro_id), localizacoes, codigos_severidade, temps, umids_ar, umids_solo)
+    ]
+
+def registrar_ocorrencias_em_lote(localizacoes, codigos_severidade, temps, umids_ar, umids_solo) -> list:
+    """
+    Versão em lote de `registrar_ocorrencia`: cria as ocorrências, insere todas no
+    repositório e na fila de prioridade de uma vez, com um único timestamp por lote.
+    """
+    ocorrencias = _criar_ocorrencias(gerar_id_ocorrencia(len(localizacoes)), localizacoes, codigos_severidade,
+                                     temps, umids_ar, umids_solo)
+    ocorrencias_ativas.adicionar_lote(ocorrencias)
+    fila_prioridade_atendimento.inserir_lote((o.ID, o.severidade_num) for o in ocorrencias)
+    return ocorrencias
+
+def _pontuar_lote(lote: list, codigo_minimo: int, locais_validos: set) -> tuple:
+    """
+    Avalia a criticidade de um lote de leituras de uma só vez e separa as aceitas.
+
+    Returns:
+        tuple: (posições no lote das leituras aceitas, colunas `(localizacoes, codigos,
+        temps, umids_ar, umids_solo)` só com as aceitas, prontas para `registrar_ocorrencias_em_lote`).
+    """
+    localizacoes, temps, umids_ar, umids_solo = zip(*lote)
+    codigos = pyrosai_avaliar_criticidade_lote(np.array(temps), np.array(umids_ar), np.array(umids_solo))
+    aceitas = (codigos >= codigo_minimo) & np.fromiter((local in locais_validos for local in localizacoes), dtype=bool, count=len(lote))
+    indices = np.flatnonzero(aceitas).tolist()
+    colunas = ([localizacoes[i] for i in indices], codigos[indices].tolist(),
+               [temps[i] for i in indices], [umids_ar[i] for i in indices], [umids_solo[i] for i in indices])
+    return indices, colunas
+
+def _contabilizar_lote(estatisticas: EstatisticasIngestao, leituras: int, registradas: int,
+                       tempo_pontuacao: float, tempo_registro: float):
+    estatisticas.tempo_pontuacao += tempo_pontuacao
+    estatisticas.tempo_registro += tempo_registro
+    if metricas_pyrosai.habilitado:
+        # Latência por lote de cada estágio do caminho ingestão -> pontuação -> fila
+        metricas_pyrosai.observar('estagio_pontuacao', tempo_pontuacao)
+        metricas_pyrosai.observar('estagio_fila', tempo_registro)
+        metricas_pyrosai.incrementar('leituras_ingeridas', leituras)
+    estatisticas.lotes += 1
+    estatisticas.leituras += leituras
+    estatisticas.registradas += registradas
+    estatisticas.rejeitadas += leituras - registradas
+
+def _processar_lote_leituras(lote: list, codigo_minimo: int, locais_validos: set, estatisticas: EstatisticasIngestao,
+                             registrar=registrar_ocorrencias_em_lote):
+    """
+    Avalia a criticidade de um lote de leituras de uma só vez e registra as aceitas
+    com `registrar` (por padrão no estado global do simulador).
+
+    Returns:
+        tuple: (ocorrências registradas, posições no lote das leituras que as originaram).
+    """
+    inicio = time.perf_counter()
+    indices, colunas = _pontuar_lote(lote, codigo_minimo, locais_validos)
+    tempo_pontuacao = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    registradas = registrar(*colunas)
+    _contabilizar_lote(estatisticas, len(lote), len(registradas), tempo_pontuacao, time.perf_counter() - inicio)
+    return registradas, indices
+
+def pipeline_ingestao(leituras, tamanho_lote: int = 10_000, severidade_minima: str = "BAIXA", estatisticas=None):
+    """
+    Pipeline de ingestão baseado em geradores: consome `leituras` (qualquer iterável de
+    tuplas (localizacao, temp, umid_ar, umid_solo), ex: `ler_leituras_csv`) em lotes,
+    avalia a criticidade de cada lote com `pyrosai_avaliar_criticidade_lote` e registra
+    as ocorrências em bloco. Nada é impresso no console.
+    Leituras em localizações fora do grafo ou abaixo de `severidade_minima` são rejeitadas.
+
+    Yields:
+        list[Ocorrencia]: As ocorrências registradas em cada lote.
+    """
+    if estatisticas is None:
+        estatisticas = EstatisticasIngestao()
+    codigo_minimo = SEVERIDADES[severidade_minima.upper()]
+    locais_validos = set(rede_localizacoes_graph.nodes)
+    iterador = iter(leituras)
+
+    while True:
+        inicio = time.perf_counter()
+        lote = list(itertools.islice(iterador, tamanho_lote))
+        tempo_leitura = time.perf_counter() - inicio
+        estatisticas.tempo_leitura += tempo_leitura
+        if not lote:
+            return
+
+        if metricas_pyrosai.habilitado:
+            metricas_pyrosai.observar('estagio_ingestao', tempo_leitura)
+        registradas, _ = _processar_lote_leituras(lote, codigo_minimo, locais_validos, estatisticas)
+        yield registradas
+
+def ingerir_leituras(leituras, tamanho_lote: int = 10_000, severidade_minima: str = "BAIXA") -> EstatisticasIngestao:
+    """
+    Consome todo o `pipeline_ingestao` e retorna as estatísticas de vazão por estágio.
+    """
+    estatisticas = EstatisticasIngestao()
+    for _ in pipeline_ingestao(leituras, tamanho_lote, severidade_minima, estatisticas):
+        pass
+    return estatisticas
+
+def ler_leituras_arquivo(caminho):
+    """Gera as leituras de um arquivo `.csv` ou `.jsonl` (pelo sufixo do nome)."""
+    caminho = os.fspath(caminho)
+    leitor = ler_leituras_jsonl if caminho.endswith(('.jsonl', '.ndjson')) else ler_leituras_csv
+    return leitor(caminho)
+
+def ingerir_arquivo(caminho: str, **opcoes) -> EstatisticasIngestao:
+    """
+    Ingere um arquivo de leituras `.csv` ou `.jsonl` (pelo sufixo do nome).
+    """
+    return ingerir_leituras(ler_leituras_arquivo(caminho), **opcoes)
+
+
+# --- Estado Concorrente (Vários Produtores, Um Despachante) ---
+class FilaPrioridadeConcorrente:
+    """
+    Fila de prioridade para vários produtores e um único consumidor (o despachante), sem
+    trava global. Os produtores apenas anexam lotes a um `deque` (`append` é atômico no
+    CPython); o despachante drena o `deque` para uma `FilaPrioridadeIndexada` privada
+    antes de cada consulta, então só ele toca o heap.
+    """
+
+    def __init__(self):
+        self._entrada = deque()
+        self._fila = FilaPrioridadeIndexada()
+
+    # --- Lado dos produtores (qualquer thread) ---
+    def inserir(self, ocorrencia_id, severidade_num: int):
+        self._entrada.append([(ocorrencia_id, severidade_num)])
+
+    def inserir_lote(self, pares):
+        # O lote é materializado antes: um único `append` publica todos os pares
+        self._entrada.append(list(pares))
+
+    def remover(self, ocorrencia_id):
+        self._entrada.append([(ocorrencia_id, None)])
+
+    # --- Lado do despachante (uma única thread) ---
+    def _drenar(self):
+        entrada, fila = self._entrada, self._fila
+        while entrada:
+            lote = entrada.popleft()
+            if len(lote) == 1:
+                ocorrencia_id, severidade_num = lote[0]
+                if severidade_num is None:
+                    fila.remover(ocorrencia_id)
+                else:
+                    fila.inserir(ocorrencia_id, severidade_num)
+            else:
+                fila.inserir_lote(lote)
+
+    def __len__(self):
+        """
+        Somente leitura, de qualquer thread: entradas já no heap mais inserções ainda
+        pendentes. É um limite superior (exato quando não há remoções ou reinserções
+        pendentes); só o despachante drena o `deque`.
+        """
+        pendentes = list(self._entrada) # Cópia atômica no CPython; os produtores seguem anexando
+        return len(self._fila) + sum(1 for lote in pendentes for _, severidade_num in lote if severidade_num is not None)
+
+    def espiar(self):
+        self._drenar()
+        return self._fila.espiar()
+
+    def extrair(self):
+        self._drenar()
+        return self._fila.extrair()
+
+    def estacionar(self, ocorrencia_id, severidade_num: int, localizacao):
+        self._fila.estacionar(ocorrencia_id, severidade_num, localizacao)
+
+    def liberar_sem_rota(self, alcancavel, versao_rotas) -> int:
+        self._drenar()
+        return self._fila.liberar_sem_rota(alcancavel, versao_rotas)
+
+class RepositorioOcorrenciasFragmentado:
+    """
+    Repositório de ocorrências dividido em `quantidade_fragmentos` instâncias de
+    `RepositorioOcorrencias`, cada uma protegida por sua própria trava. O fragmento de
+    uma ocorrência é definido pela faixa do seu ID (`ID // tamanho_faixa`, circular), de
+    modo que um lote de IDs consecutivos toca poucos fragmentos e produtores diferentes
+    raramente disputam a mesma trava. Consultas que atravessam fragmentos intercalam os
+    resultados por ID. Observadores (persistência) não são suportados nesta camada.
+    """
+
+    def __init__(self, quantidade_fragmentos: int = 16, tamanho_faixa: int = 1024):
+        self.tamanho_faixa = tamanho_faixa
+        self._fragmentos = [RepositorioOcorrencias() for _ in range(quantidade_fragmentos)]
+        self._travas = [threading.Lock() for _ in range(quantidade_fragmentos)]
+        self._ids = AlocadorIds()
+
+    def _indice(self, ocorrencia_id) -> int:
+        return (ocorrencia_id // self.tamanho_faixa) % len(self._fragmentos)
+
+    def reservar_ids(self, quantidade: int = 1) -> int:
+        return self._ids.reservar(quantidade)
+
+    def __len__(self):
+        return sum(len(fragmento) for fragmento in self._fragmentos)
+
+    def __contains__(self, ocorrencia_id):
+        return ocorrencia_id in self._fragmentos[self._indice(ocorrencia_id)]
+
+    def __getitem__(self, ocorrencia_id) -> Ocorrencia:
+        return self._fragmentos[self._indice(ocorrencia_id)][ocorrencia_id]
+
+    def get(self, ocorrencia_id, padrao=None):
+        return self._fragmentos[self._indice(ocorrencia_id)].get(ocorrencia_id, padrao)
+
+    def adicionar_lote(self, ocorrencias):
+        """Insere ocorrências novas, agrupadas por fragmento: uma aquisição de trava por fragmento tocado."""
+        grupos = defaultdict(list)
+        for ocorrencia in ocorrencias:
+            grupos[self._indice(ocorrencia.ID)].append(ocorrencia)
+        for indice, grupo in grupos.items():
+            with self._travas[indice]:
+                self._fragmentos[indice].adicionar_lote(grupo)
+
+    def atualizar_status(self, ocorrencia_id, novo_status: str) -> Ocorrencia:
+        indice = self._indice(ocorrencia_id)
+        with self._travas[indice]:
+            return self._fragmentos[indice].atualizar_status(ocorrencia_id, novo_status)
+
+    def atualizar_severidade(self, ocorrencia_id, nova_severidade_num: int) -> Ocorrencia:
+        indice = self._indice(ocorrencia_id)
+        with self._travas[indice]:
+            return self._fragmentos[indice].atualizar_severidade(ocorrencia_id, nova_severidade_num)
+
+    def _consultar(self, consulta) -> list:
+        # Cada fragmento responde em ordem de ID sob a própria trava; o resultado é intercalado
+        parciais = []
+        for trava, fragmento in zip(self._travas, self._fragmentos):
+            with trava:
+                parciais.append(consulta(fragmento))
+        return list(heapq.merge(*parciais, key=lambda ocorrencia: ocorrencia.ID))
+
+    def por_severidade(self, severidade_num: int, incluir_extintas: bool = False) -> list:
+        return self._consultar(lambda fragmento: fragmento.por_severidade(severidade_num, incluir_extintas))
+
+    def por_status(self, status: str) -> list:
+        return self._consultar(lambda fragmento: fragmento.por_status(status))
+
+    def ativas(self) -> list:
+        return self._consultar(RepositorioOcorrencias.ativas)
+
+    def por_localizacao(self, localizacao: str) -> list:
+        return self._consultar(lambda fragmento: fragmento.por_localizacao(localizacao))
+
+    def contagem_por_localizacao(self) -> dict:
+        total = defaultdict(dict)
+        for trava, fragmento in zip(self._travas, self._fragmentos):
+            with trava:
+                parcial = fragmento.contagem_por_localizacao()
+            for local, contagem in parcial.items():
+                destino = total[local]
+                for status, quantidade in contagem.items():
+                    destino[status] = destino.get(status, 0) + quantidade
+        return dict(total)
+
+    def contagem_por_severidade_status(self) -> dict:
+        total = {}
+        for trava, fragmento in zip(self._travas, self._fragmentos):
+            with trava:
+                parcial = fragmento.contagem_por_severidade_status()
+            for chave, quantidade in parcial.items():
+                total[chave] = total.get(chave, 0) + quantidade
+        return total
+
+class EstadoOcorrenciasConcorrente:
+    """
+    Camada de estado segura para ingestão com várias threads produtoras: IDs atômicos,
+    repositório fragmentado com travas por fragmento e fila de prioridade MPSC.
+    `registrar_lote` pode ser chamado de qualquer thread; `despachar_proxima` deve ser
+    chamado sempre pela mesma thread (o despachante).
+    """
+
+    def __init__(self, quantidade_fragmentos: int = 16, roteador=None):
+        self.repositorio = RepositorioOcorrenciasFragmentado(quantidade_fragmentos)
+        self.fila = FilaPrioridadeConcorrente()
+        self.roteador = roteador or roteador_pyrosai
+
+    def registrar_lote(self, localizacoes, codigos_severidade, temps, umids_ar, umids_solo) -> list:
+        """Mesmo contrato de `registrar_ocorrencias_em_lote`, sobre este estado."""
+        ocorrencias = _criar_ocorrencias(self.repositorio.reservar_ids(len(localizacoes)), localizacoes,
+                                         codigos_severidade, temps, umids_ar, umids_solo)
+        self.repositorio.adicionar_lote(ocorrencias)
+        self.fila.inserir_lote((o.ID, o.severidade_num) for o in ocorrencias)
+        return ocorrencias
+
+    def despachar_proxima(self):
+        """Equivalente a `despachar_proxima_ocorrencia` para este estado (thread do despachante)."""
+        return _extrair_despachavel(self.fila, self.repositorio, self.roteador)
+
+# Lotes já pontuados que cada produtor pode deixar na fila antes de esperar o registrador
+LOTES_PENDENTES_POR_PRODUTOR = 4
+
+def _produzir_leituras(indice: int, fonte, tamanho_lote: int, codigo_minimo: int, locais_validos: set, saida):
+    """
+    Corpo de um processo produtor de `ingerir_leituras_concorrente`: lê a `fonte`, pontua
+    cada lote e publica em `saida` (indice, (leituras no lote, tempo de leitura, tempo de
+    pontuação, colunas das aceitas)). Termina publicando (indice, None), ou a exceção
+    que interrompeu a fonte.
+    """
+    try:
+        iterador = iter(ler_leituras_arquivo(fonte) if isinstance(fonte, (str, os.PathLike)) else fonte)
+        while True:
+            inicio = time.perf_counter()
+            lote = list(itertools.islice(iterador, tamanho_lote))
+            tempo_leitura = time.perf_counter() - inicio
+            if not lote:
+                break
+            inicio = time.perf_counter()
+            _, colunas = _pontuar_lote(lote, codigo_minimo, locais_validos)
+            saida.put((indice, (len(lote), tempo_leitura, time.perf_counter() - inicio, colunas)))
+        saida.put((indice, None))
+    except Exception as erro:
+        saida.put((indice, erro))
+
+def ingerir_leituras_concorrente(fontes, estado: EstadoOcorrenciasConcorrente, tamanho_lote: int = 10_000,
+                                 severidade_minima: str = "BAIXA") -> EstatisticasIngestao:
+    """
+    Ingere várias fontes de leituras em paralelo, um processo produtor por fonte, todas
+    registrando no mesmo `estado`. Cada fonte é um caminho de arquivo `.csv`/`.jsonl`
+    (aberto pelo próprio produtor) ou um iterável de leituras que possa ser enviado ao
+    processo (ex: uma lista).
+
+    Os produtores fazem fora do GIL do processo principal a leitura, a conversão e a
+    pontuação, e enviam só as colunas das leituras aceitas por uma fila limitada
+    (`LOTES_PENDENTES_POR_PRODUTOR` lotes por produtor). A thread chamadora registra os
+    lotes no `estado` conforme chegam: o repositório fragmentado e a fila MPSC continuam
+    disponíveis ao despachante durante a ingestão. Os tempos de leitura e pontuação
+    somados são tempo de CPU dos produtores, não tempo de parede.
+    """
+    fontes = list(fontes)
+    total = EstatisticasIngestao()
+    if not fontes:
+        return total
+    codigo_minimo = SEVERIDADES[severidade_minima.upper()]
+    locais_validos = set(rede_localizacoes_graph.nodes)
+    saida = multiprocessing.Queue(maxsize=LOTES_PENDENTES_POR_PRODUTOR * len(fontes))
+    produtores = [multiprocessing.Process(target=_produzir_leituras, daemon=True,
+                                          args=(indice, fonte, tamanho_lote, codigo_minimo, locais_validos, saida))
+                  for indice, fonte in enumerate(fontes)]
+    for produtor in produtores:
+        produtor.start()
+
+    pendentes = set(range(len(produtores)))
+    try:
+        while pendentes:
+            # Quem já tinha terminado antes da espera já entregou tudo o que publicou
+            encerrados = [indice for indice in pendentes if produtores[indice].exitcode is not None]
+            try:
+                indice, mensagem = saida.get(timeout=0.5)
+            except queue.Empty:
+                if encerrados:
+                    raise RuntimeError(f"O produtor da fonte {encerrados[0]} terminou sem concluir a leitura.") from None
+                continue
+            if mensagem is None:
+                pendentes.discard(indice)
+            elif isinstance(mensagem, BaseException):
+                raise mensagem
+            else:
+                leituras, tempo_leitura, tempo_pontuacao, colunas = mensagem
+                inicio = time.perf_counter()
+                registradas = estado.registrar_lote(*colunas)
+                total.tempo_leitura += tempo_leitura
+                _contabilizar_lote(total, leituras, len(registradas), tempo_pontuacao, time.perf_counter() - inicio)
+    finally:
+        for produtor in produtores:
+            if pendentes and produtor.is_alive():
+                produtor.terminate() # Falha: descarta o que os demais ainda produziriam
+            produtor.join()
+        saida.close()
+    return total
+
+
+# --- Simulação de Propagação do Fogo (Autômato Celular Vetorizado) ---
+# Estados das células da grade
+CELULA_INTACTA, CELULA_QUEIMANDO, CELULA_QUEIMADA = 0, 1, 2
+
+# Probabilidade de o fogo passar de uma célula em chamas para uma vizinha intacta,
+# conforme a criticidade da vizinha (mesmas faixas de `pyrosai_avaliar_criticidade_area`)
+PROBABILIDADE_PROPAGACAO = {
+    "BAIXA": 0.10,
+    "MEDIA": 0.30,
+    "ALTA": 0.55,
+    "CRITICA": 0.80,
+}
+
+def gerar_clima_sintetico(altura: int, largura: int, resolucao: int = 32, seed: int = None) -> tuple:
+    """
+    Gera rasters sintéticos de temperatura, umidade do ar e umidade do solo (float32),
+    sorteando uma grade grossa `resolucao`x`resolucao` nas mesmas faixas de
+    `simular_chamadas_aleatorias` e ampliando-a para `altura`x`largura`.
+
+    Returns:
+        tuple: (temperaturas, umidades_ar, umidades_solo).
+    """
+    rng = np.random.default_rng(seed)
+    linhas = np.arange(altura) * resolucao // altura
+    colunas = np.arange(largura) * resolucao // largura
+
+    def raster(minimo, maximo):
+        grossa = rng.uniform(minimo, maximo, (resolucao, resolucao)).astype(np.float32)
+        return grossa[np.ix_(linhas, colunas)]
+
+    return raster(15, 45), raster(5, 95), raster(0, 90)
+
+def _mapa_regioes_em_blocos(altura: int, largura: int, quantidade: int) -> np.ndarray:
+    """
+    Divide a grade em blocos retangulares (ceil(sqrt(quantidade)) por lado), um por região.
+    Blocos excedentes recebem -1 (área fora da rede monitorada).
+    """
+    lado = max(1, int(np.ceil(np.sqrt(quantidade))))
+    linhas = (np.arange(altura) * lado // altura).astype(np.int32)
+    colunas = (np.arange(largura) * lado // largura).astype(np.int32)
+    mapa = linhas[:, None] * lado + colunas[None, :]
+    mapa[mapa >= quantidade] = -1
+    return mapa
+
+class SimuladorPropagacaoFogo:
+    """
+    Autômato celular de propagação do fogo sobre rasters de temperatura, umidade do ar e
+    umidade do solo. Cada célula pertence a uma região (nó do grafo de localizações); a
+    cada passo, toda célula intacta com vizinhas (4-vizinhança) em chamas pega fogo com
+    probabilidade 1 - (1 - p)^k, onde p vem de `PROBABILIDADE_PROPAGACAO` para a
+    criticidade da célula e k é o número de vizinhas queimando. Células em chamas
+    queimam por um passo. As regiões que passam a ter fogo viram ocorrências em lote.
+    O passo é todo vetorizado: deslocamentos de arrays para contar vizinhas e sorteios
+    apenas nas células da frente de fogo.
+    """
+
+    def __init__(self, temperaturas, umidades_ar, umidades_solo, nos: list = None, mapa_regioes=None, seed: int = None):
+        self.temperaturas = np.ascontiguousarray(temperaturas, dtype=np.float32)
+        self.umidades_ar = np.ascontiguousarray(umidades_ar, dtype=np.float32)
+        self.umidades_solo = np.ascontiguousarray(umidades_solo, dtype=np.float32)
+        self.formato = self.temperaturas.shape
+        if nos is None:
+            bases = set(listar_bases(rede_localizacoes_graph))
+            nos = [no for no in rede_localizacoes_graph.nodes if no not in bases]
+        self.nos = list(nos)
+        if mapa_regioes is None:
+            mapa_regioes = _mapa_regioes_em_blocos(*self.formato, len(self.nos))
+        self.mapa_regioes = np.ascontiguousarray(mapa_regioes, dtype=np.int32)
+        self.rng = np.random.default_rng(seed)
+
+        self.estado = np.zeros(self.formato, dtype=np.int8)
+        self.passos = 0
+        self._frente = 0  # células queimando no momento
+        self._regioes_em_chamas = np.zeros(len(self.nos), dtype=bool)
+        # Tabela (código de severidade, vizinhas em chamas) -> probabilidade de ignição;
+        # a célula guarda código * 5 e o passo soma a contagem de vizinhas para indexá-la
+        self._tabela_ignicao = np.zeros((len(SEVERIDADES) + 1, 5), dtype=np.float32)
+        for severidade, probabilidade in PROBABILIDADE_PROPAGACAO.items():
+            self._tabela_ignicao[SEVERIDADES[severidade]] = 1 - (1 - probabilidade) ** np.arange(5)
+        self._tabela_ignicao = self._tabela_ignicao.ravel()
+        self.codigos = pyrosai_avaliar_criticidade_lote(self.temperaturas, self.umidades_ar, self.umidades_solo)
+        self._indice_ignicao = self.codigos.astype(np.uint8) * 5
+
+    @property
+    def celulas_queimando(self) -> int:
+        return self._frente
+
+    @property
+    def celulas_queimadas(self) -> int:
+        return int(np.count_nonzero(self.estado == CELULA_QUEIMADA))
+
+    def ignitar(self, linhas, colunas) -> list:
+        """Coloca fogo nas células informadas (ex: raios, focos detectados por satélite)."""
+        indices = np.unique(np.ravel_multi_index((np.asarray(linhas), np.asarray(colunas)), self.formato))
+        indices = indices[self.estado.ravel()[indices] == CELULA_INTACTA]
+        self.estado.ravel()[indices] = CELULA_QUEIMANDO
+        self._frente += int(indices.size)
+        return self._registrar_regioes_ignitadas(indices)
+
+    def ignitar_aleatorio(self, quantidade: int) -> list:
+        """Sorteia `quantidade` focos iniciais pela grade."""
+        linhas = self.rng.integers(0, self.formato[0], quantidade)
+        colunas = self.rng.integers(0, self.formato[1], quantidade)
+        return self.ignitar(linhas, colunas)
+
+    def passo(self) -> list:
+        """
+        Avança a simulação em um passo de tempo.
+
+        Returns:
+            list: Ocorrências registradas para as regiões que passaram a ter fogo.
+        """
+        inicio = time.perf_counter()
+        estado = self.estado
+        queimando = estado == CELULA_QUEIMANDO
+        vizinhas = np.zeros(self.formato, dtype=np.uint8)
+        vizinhas[1:, :] += queimando[:-1, :]
+        vizinhas[:-1, :] += queimando[1:, :]
+        vizinhas[:, 1:] += queimando[:, :-1]
+        vizinhas[:, :-1] += queimando[:, 1:]
+
+        vizinhas_plano = vizinhas.ravel()
+        candidatas = np.flatnonzero((vizinhas_plano > 0) & (estado.ravel() == CELULA_INTACTA))
+        probabilidades = self._tabela_ignicao[self._indice_ignicao.ravel()[candidatas] + vizinhas_plano[candidatas]]
+        novas = candidatas[self.rng.random(candidatas.size, dtype=np.float32) < probabilidades]
+
+        estado[queimando] = CELULA_QUEIMADA
+        estado.ravel()[novas] = CELULA_QUEIMANDO
+        self.passos += 1
+        self._frente = int(novas.size)
+        ocorrencias = self._registrar_regioes_ignitadas(novas, substituir=True)
+        if metricas_pyrosai.habilitado:
+            metricas_pyrosai.observar('propagacao_passo', time.perf_counter() - inicio)
+            metricas_pyrosai.incrementar('propagacao_celulas_ignitadas', int(novas.size))
+        return ocorrencias
+
+    def executar(self, passos: int) -> list:
+        """Executa `passos` passos (ou até o fogo se extinguir) e retorna todas as ocorrências geradas."""
+        ocorrencias = []
+        for _ in range(passos):
+            ocorrencias.extend(self.passo())
+            if not self._frente:
+                break
+        return ocorrencias
+
+    def _registrar_regioes_ignitadas(self, indices, substituir: bool = False) -> list:
+        """
+        Atualiza as regiões em chamas e registra, em lote, uma ocorrência por região que
+        acabou de pegar fogo, com as leituras da célula mais crítica entre as ignitadas.
+        Com `substituir=True` as células informadas são todas as que estão queimando
+        (caso de `passo`, em que as anteriores já viraram cinzas).
+        """
+        regioes = self.mapa_regioes.ravel()[indices]
+        dentro = regioes >= 0
+        indices, regioes = indices[dentro], regioes[dentro]
+
+        em_chamas = np.zeros_like(self._regioes_em_chamas)
+        em_chamas[regioes] = True
+        novas_regioes = em_chamas & ~self._regioes_em_chamas
+        self._regioes_em_chamas = em_chamas if substituir else (self._regioes_em_chamas | em_chamas)
+        if not novas_regioes.any():
+            return []
+
+        selecionadas = novas_regioes[regioes]
+        indices, regioes = indices[selecionadas], regioes[selecionadas]
+        codigos = self.codigos.ravel()[indices]
+        # Ordena por (região, código): a última célula de cada região é a mais crítica
+        ordem = np.lexsort((codigos, regioes))
+        regioes_ordenadas = regioes[ordem]
+        ultimas = ordem[np.r_[regioes_ordenadas[1:] != regioes_ordenadas[:-1], True]]
+        celulas = indices[ultimas]
+        return registrar_ocorrencias_em_lote(
+            [self.nos[r] for r in regioes[ultimas].tolist()], codigos[ultimas].tolist(),
+            self.temperaturas.ravel()[celulas].tolist(), self.umidades_ar.ravel()[celulas].tolist(),
+            self.umidades_solo.ravel()[celulas].tolist())
+
+def simular_propagacao_fogo(passos: int = 50, altura: int = 512, largura: int = 512, focos: int = 5, seed: int = None) -> list:
+    """
+    Roda o `SimuladorPropagacaoFogo` sobre um clima sintético mapeado nos nós do grafo
+    e exibe a evolução do incêndio e as ocorrências geradas.
+    """
+    print(f"\n--- Simulação de Propagação do Fogo ({altura}x{largura} células, {passos} passos) ---")
+    simulador = SimuladorPropagacaoFogo(*gerar_clima_sintetico(altura, largura, seed=seed), seed=seed)
+    ocorrencias = simulador.ignitar_aleatorio(focos)
+    inicio = time.perf_counter()
+    ocorrencias.extend(simulador.executar(passos))
+    duracao = time.perf_counter() - inicio
+    print(f"  Passos executados: {simulador.passos} ({duracao / max(simulador.passos, 1) * 1000:.1f} ms/passo)")
+    print(f"  Células queimando: {simulador.celulas_queimando} | Células queimadas: {simulador.celulas_queimadas}")
+    print(f"  Ocorrências geradas pela propagação: {len(ocorrencias)}")
+    for ocorrencia in ocorrencias[:10]:
+        print(f"  - Ocorrência {ocorrencia.ID} ({ocorrencia.severidade}) em {ocorrencia.localizacao}")
+    return ocorrencias
+
+
+# --- Serviço de Despacho Assíncrono (asyncio) com Contrapressão ---
+class ServicoDespachoAsync:
+    """
+    Modo serviço do simulador, sem menu nem `input()`: vários feeds de sensores alimentam
+    uma fila limitada (`capacidade_fila`); quando ela enche, os feeds aguardam em `put`
+    (contrapressão) em vez de acumular memória. Um estágio de pontuação agrupa as leituras
+    em lotes (até `tamanho_lote` ou `espera_lote` segundos) para a avaliação vetorizada e um
+    despachante drena continuamente a `fila_prioridade_atendimento`.
+    Mede a latência ponta a ponta de cada ocorrência (chegada da leitura -> despacho).
+    """
+
+    def __init__(self, capacidade_fila: int = 10_000, tamanho_lote: int = 1_000, espera_lote: float = 0.01,
+                 severidade_minima: str = "BAIXA", despachos_por_fatia: int = 256):
+        self.capacidade_fila = capacidade_fila
+        self.tamanho_lote = tamanho_lote
+        self.espera_lote = espera_lote
+        self.codigo_minimo = SEVERIDADES[severidade_minima.upper()]
+        self.despachos_por_fatia = despachos_por_fatia # Despachos entre cessões do laço de eventos
+        self.estatisticas = EstatisticasIngestao()
+        self.latencias = array.array('d')
+        self.despachadas = 0
+        self._chegadas = {}
+        self._leituras = None
+        self._ha_ocorrencias = None
+        self._parar = None
+        self._ingestao_encerrada = False
+
+    def parar(self):
+        """Pede um encerramento gracioso: os feeds param e o que já entrou é pontuado e despachado."""
+        if self._parar is not None:
+            self._parar.set()
+
+    async def _alimentar(self, feed):
+        # Aceita iteráveis assíncronos (feeds reais) ou comuns (arquivos, listas)
+        if hasattr(feed, '__aiter__'):
+            async for leitura in feed:
+                if self._parar.is_set():
+                    return
+                await self._leituras.put((time.perf_counter(), leitura))
+        else:
+            for leitura in feed:
+                if self._parar.is_set():
+                    return
+                await self._leituras.put((time.perf_counter(), leitura))
+                if self._leituras.full():
+                    await asyncio.sleep(0)
+
+    async def _pontuar(self, locais_validos: set):
+        try:
+            fim_dos_dados = False
+            while not fim_dos_dados:
+                item = await self._leituras.get()
+                if item is None:
+                    break
+                lote = [item]
+                limite = time.perf_counter() + self.espera_lote
+                while len(lote) < self.tamanho_lote:
+                    try:
+                        item = self._leituras.get_nowait()
+                    except asyncio.QueueEmpty:
+                        restante = limite - time.perf_counter()
+                        if restante <= 0:
+                            break
+                        try:
+                            item = await asyncio.wait_for(self._leituras.get(), restante)
+                        except asyncio.TimeoutError:
+                            break
+                    if item is None:
+                        fim_dos_dados = True
+                        break
+                    lote.append(item)
+
+                chegadas = [chegada for chegada, _ in lote]
+                registradas, indices = _processar_lote_leituras([leitura for _, leitura in lote], self.codigo_minimo,
+                                                                locais_validos, self.estatisticas)
+                for ocorrencia, indice in zip(registradas, indices):
+                    self._chegadas[ocorrencia.ID] = chegadas[indice]
+                if registradas:
+                    self._ha_ocorrencias.set()
+                await asyncio.sleep(0)
+        finally:
+            # Fim dos dados (ou falha da pontuação): o despachante drena o que restou e encerra
+            self._ingestao_encerrada = True
+            self._ha_ocorrencias.set()
+
+    async def _despachar(self):
+        while True:
+            self._ha_ocorrencias.clear()
+            resultado = None
+            for _ in range(self.despachos_por_fatia):
+                resultado = despachar_proxima_ocorrencia()
+                if resultado is None or resultado[1] is None:
+                    break # Fila vazia ou só com ocorrências que nenhuma base alcança
+                chegada = self._chegadas.pop(resultado[0].ID, None)
+                if chegada is not None:
+                    latencia = time.perf_counter() - chegada
+                    self.latencias.append(latencia)
+                    if metricas_pyrosai.habilitado:
+                        metricas_pyrosai.observar('latencia_ponta_a_ponta', latencia)
+                self.despachadas += 1
+            if resultado is not None and resultado[1] is not None:
+                await asyncio.sleep(0) # Fatia cheia: cede o laço aos feeds e à pontuação
+            elif self._ingestao_encerrada:
+                return
+            else:
+                await self._ha_ocorrencias.wait()
+
+    async def executar(self, feeds, duracao: float = None) -> dict:
+        """
+        Executa o serviço até os feeds se esgotarem, `duracao` segundos passarem ou `parar`
+        ser chamado; então encerra graciosamente e retorna o resumo de vazão e latência.
+        """
+        self._leituras = asyncio.Queue(maxsize=self.capacidade_fila)
+        self._ha_ocorrencias = asyncio.Event()
+        self._parar = asyncio.Event()
+        self._ingestao_encerrada = False
+        inicio = time.perf_counter()
+
+        alimentadores = [asyncio.create_task(self._alimentar(feed)) for feed in feeds]
+        estagios = [asyncio.create_task(self._pontuar(set(rede_localizacoes_graph.nodes))),
+                    asyncio.create_task(self._despachar())]
+        try:
+            # Um estágio que termina antes do fim (só acontece se falhar) também encerra a espera
+            espera_parada = asyncio.create_task(self._parar.wait())
+            feeds_esgotados = asyncio.create_task(asyncio.wait(alimentadores))
+            await asyncio.wait([feeds_esgotados, espera_parada, *estagios], timeout=duracao,
+                               return_when=asyncio.FIRST_COMPLETED)
+            self._parar.set()
+            for tarefa in alimentadores:
+                tarefa.cancel()
+            await asyncio.gather(*alimentadores, feeds_esgotados, espera_parada, return_exceptions=True)
+
+            # Encerramento gracioso: o que já está na fila limitada ainda é pontuado e despachado.
+            # `gather` propaga a primeira falha de um estágio sem esperar os demais.
+            estagios.append(asyncio.create_task(self._leituras.put(None)))
+            await asyncio.gather(*estagios)
+        finally:
+            for tarefa in (*alimentadores, *estagios):
+                tarefa.cancel()
+            await asyncio.gather(*alimentadores, *estagios, return_exceptions=True)
+        return self.resumo(time.perf_counter() - inicio)
+
+    def resumo(self, duracao: float) -> dict:
+        latencias = np.frombuffer(self.latencias, dtype=np.float64) if self.latencias else np.zeros(1)
+        return {
+            'duracao_s': duracao,
+            'leituras': self.estatisticas.leituras,
+            'registradas': self.estatisticas.registradas,
+            'despachadas': self.despachadas,
+            'leituras_por_s': self.estatisticas.leituras / duracao if duracao > 0 else 0.0,
+            'latencia_p50_ms': float(np.percentile(latencias, 50)) * 1000,
+            'latencia_p99_ms': float(np.percentile(latencias, 99)) * 1000,
+        }
+
+async def feed_sensores_simulado(quantidade: int = None, leituras_por_segundo: float = 10_000, seed: int = None):
+    """
+    Feed assíncrono de sensores simulados (mesmos intervalos de `simular_chamadas_aleatorias`),
+    emitindo cerca de `leituras_por_segundo` leituras em rajadas. `quantidade=None` não termina.
+    """
+    aleatorio = random.Random(seed)
+    locais = list(rede_localizacoes_graph.nodes)
+    rajada = max(1, int(leituras_por_segundo / 100))
+    emitidas = 0
+    while quantidade is None or emitidas < quantidade:
+        for _ in range(rajada if quantidade is None else min(rajada, quantidade - emitidas)):
+            yield (aleatorio.choice(locais), aleatorio.randint(15, 45), aleatorio.randint(5, 95), aleatorio.randint(0, 90))
+            emitidas += 1
+        await asyncio.sleep(rajada / leituras_por_segundo)
+
+def executar_servico_simulado(duracao: float = 5.0, quantidade_feeds: int = 4, leituras_por_segundo: float = 5_000):
+    """
+    Roda o `ServicoDespachoAsync` com feeds simulados por `duracao` segundos (Ctrl+C encerra
+    graciosamente antes) e exibe vazão e latências p50/p99.
+    """
+    print(f"\n--- Serviço de Despacho Assíncrono ({quantidade_feeds} feeds, {duracao:g}s) ---")
+    servico = ServicoDespachoAsync()
+
+    async def principal():
+        laco = asyncio.get_running_loop()
+        try:
+            laco.add_signal_handler(signal.SIGINT, servico.parar)
+        except (NotImplementedError, RuntimeError):
+            pass # Plataformas sem suporte a sinais no laço de eventos
+        feeds = [feed_sensores_simulado(leituras_por_segundo=leituras_por_segundo / quantidade_feeds, seed=i)
+                 for i in range(quantidade_feeds)]
+        try:
+            return await servico.executar(feeds, duracao)
+        finally:
+            try:
+                laco.remove_signal_handler(signal.SIGINT)
+            except (NotImplementedError, RuntimeError):
+                pass
+
+    resumo = asyncio.run(principal())
+    print(f"  Leituras: {resumo['leituras']} ({resumo['leituras_por_s']:,.0f}/s) | Registradas: {resumo['registradas']} | Despachadas: {resumo['despachadas']}")
+    print(f"  Latência ponta a ponta: p50 = {resumo['latencia_p50_ms']:.2f} ms | p99 = {resumo['latencia_p99_ms']:.2f} ms")
+    return resumo
+
+
+# --- Persistência: Log Binário Somente-Anexo + Snapshots ---
+# Registros do log (little-endian). Strings (localizações) são internadas: cada string
+# nova é gravada uma única vez (OP_STRING) e depois referenciada por índice.
+OP_STRING, OP_INSERCAO, OP_STATUS, OP_SEVERIDADE, OP_ROTA, OP_REMOCAO_ROTA, OP_REMOCAO = range(7)
+_FORMATO_STRING = struct.Struct('<BIH')             # op, índice, tamanho (+ bytes UTF-8)
+_FORMATO_INSERCAO = struct.Struct('<BIBIBdddd')     # op, ID, severidade, local, status, timestamp, temp, umid_ar, umid_solo
+_FORMATO_ALTERACAO = struct.Struct('<BIB')          # op, ID, novo status/severidade
+_FORMATO_ROTA = struct.Struct('<BIId')              # op, origem, destino, peso
+_FORMATO_REMOCAO_ROTA = struct.Struct('<BII')       # op, origem, destino
+_FORMATO_REMOCAO = struct.Struct('<BI')             # op, ID (ocorrência arquivada)
+_INDICE_STATUS = {status: i for i, status in enumerate(STATUS_OCORRENCIA)}
+
+def _leitura_sensor(valor: float):
+    # Devolve leituras inteiras como int, como foram registradas
+    return int(valor) if valor.is_integer() else valor
+
+class PersistenciaEstado:
+    """
+    Torna durável o estado do simulador (ocorrências, fila de atendimento e grafo).
+    Cada inserção e mudança de status/severidade é anexada a um log binário compacto
+    (`ocorrencias.log`); a cada `intervalo_snapshot` registros o estado completo é gravado
+    em `snapshot.pkl` (colunas, gravação atômica via arquivo temporário + `os.replace`)
+    e o log é truncado. Na inicialização, `restaurar` carrega o snapshot e reaplica apenas
+    a cauda do log. Todas as operações do log são idempotentes (inserção = sobrescrita),
+    então uma queda entre o snapshot e o truncamento não corrompe o estado.
+    """
+
+    def __init__(self, diretorio: str, intervalo_snapshot: int = 1_000_000, fsync: bool = False):
+        self.diretorio = diretorio
+        self.intervalo_snapshot = intervalo_snapshot
+        self.fsync = fsync
+        self.caminho_log = os.path.join(diretorio, 'ocorrencias.log')
+        self.caminho_snapshot = os.path.join(diretorio, 'snapshot.pkl')
+        os.makedirs(diretorio, exist_ok=True)
+        self._strings = {}
+        self._registros_desde_snapshot = 0
+        self._log = None
+
+    # --- Escrita do log ---
+    def _abrir_log(self):
+        if self._log is None:
+            self._log = open(self.caminho_log, 'ab')
+
+    def _indice_string(self, texto: str, partes: list) -> int:
+        indice = self._strings.get(texto)
+        if indice is None:
+            indice = len(self._strings)
+            self._strings[texto] = indice
+            dados = texto.encode('utf-8')
+            partes.append(_FORMATO_STRING.pack(OP_STRING, indice, len(dados)))
+            partes.append(dados)
+        return indice
+
+    def _registro_insercao(self, ocorrencia: Ocorrencia, partes: list):
+        partes.append(_FORMATO_INSERCAO.pack(
+            OP_INSERCAO, ocorrencia.ID, ocorrencia.severidade_num,
+            self._indice_string(ocorrencia.localizacao, partes), _INDICE_STATUS[ocorrencia.status],
+            ocorrencia.timestamp_deteccao, ocorrencia.temp, ocorrencia.umid_ar, ocorrencia.umid_solo))
+
+    def _gravar(self, partes: list, quantidade: int):
+        self._abrir_log()
+        self._log.write(b''.join(partes))
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        self._registros_desde_snapshot += quantidade
+        if self._registros_desde_snapshot >= self.intervalo_snapshot:
+            self.gravar_snapshot()
+
+    def ao_inserir(self, ocorrencia: Ocorrencia):
+        partes = []
+        self._registro_insercao(ocorrencia, partes)
+        self._gravar(partes, 1)
+
+    def ao_inserir_lote(self, ocorrencias):
+        partes = []
+        for ocorrencia in ocorrencias:
+            self._registro_insercao(ocorrencia, partes)
+        self._gravar(partes, len(ocorrencias))
+
+    def ao_alterar_status(self, ocorrencia: Ocorrencia):
+        self._gravar([_FORMATO_ALTERACAO.pack(OP_STATUS, ocorrencia.ID, _INDICE_STATUS[ocorrencia.status])], 1)
+
+    def ao_alterar_severidade(self, ocorrencia: Ocorrencia):
+        self._gravar([_FORMATO_ALTERACAO.pack(OP_SEVERIDADE, ocorrencia.ID, ocorrencia.severidade_num)], 1)
+
+    def ao_remover_lote(self, ocorrencias):
+        self._gravar([_FORMATO_REMOCAO.pack(OP_REMOCAO, ocorrencia.ID) for ocorrencia in ocorrencias], len(ocorrencias))
+
+    def registrar_rota(self, origem, destino, peso):
+        partes = []
+        indice_origem = self._indice_string(origem, partes)
+        indice_destino = self._indice_string(destino, partes)
+        partes.append(_FORMATO_ROTA.pack(OP_ROTA, indice_origem, indice_destino, peso))
+        self._gravar(partes, 1)
+
+    def registrar_remocao_rota(self, origem, destino):
+        partes = []
+        indice_origem = self._indice_string(origem, partes)
+        indice_destino = self._indice_string(destino, partes)
+        partes.append(_FORMATO_REMOCAO_ROTA.pack(OP_REMOCAO_ROTA, indice_origem, indice_destino))
+        self._gravar(partes, 1)
+
+    # --- Snapshots ---
+    def gravar_snapshot(self):
+        """Grava o estado completo de forma atômica e reinicia o log."""
+        registros = list(ocorrencias_ativas)
+        estado = {
+            'ocorrencias': (
+                [o.ID for o in registros], [o.severidade_num for o in registros],
+                [o.localizacao for o in registros], [o.status for o in registros],
+                [o.timestamp_deteccao for o in registros], [o.temp for o in registros],
+                [o.umid_ar for o in registros], [o.umid_solo for o in registros],
+            ),
+            'nos': list(rede_localizacoes_graph.nodes(data=True)), # Atributos inclusos (ex: 'equipes' das bases)
+            'arestas': [(u, v, dados.get('weight', 1)) for u, v, dados in rede_localizacoes_graph.edges(data=True)],
+            'proximo_id': ocorrencias_ativas.proximo_id, # Cobre IDs já arquivados, fora do repositório
+        }
+        temporario = self.caminho_snapshot + '.tmp'
+        with open(temporario, 'wb') as arquivo:
+            pickle.dump(estado, arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, self.caminho_snapshot)
+
+        # Só depois do snapshot durável o log pode ser reiniciado
+        if self._log is not None:
+            self._log.close()
+        self._log = open(self.caminho_log, 'wb')
+        self._strings.clear()
+        self._registros_desde_snapshot = 0
+
+    # --- Restauração ---
+    def restaurar(self) -> dict:
+        """
+        Reconstrói `ocorrencias_ativas`, `fila_prioridade_atendimento` e (se persistido)
+        `rede_localizacoes_graph` a partir do snapshot mais recente e da cauda do log.
+        Deve ser chamada antes de o objeto ser registrado como observador.
+
+        Returns:
+            dict: Quantidade de ocorrências restauradas e de registros do log reaplicados.
+        """
+        ocorrencias_ativas.limpar()
+        fila_prioridade_atendimento.limpar()
+
+        if os.path.exists(self.caminho_snapshot):
+            with open(self.caminho_snapshot, 'rb') as arquivo:
+                estado = pickle.load(arquivo)
+            ocorrencias_ativas.adicionar_lote([Ocorrencia(*campos) for campos in zip(*estado['ocorrencias'])])
+            rede_localizacoes_graph.clear()
+            rede_localizacoes_graph.add_nodes_from(estado['nos']) # Pares (nome, atributos)
+            rede_localizacoes_graph.add_weighted_edges_from(estado['arestas'])
+            ocorrencias_ativas.avancar_ids_para(estado['proximo_id'])
+
+        registros_log = self._reaplicar_log()
+        roteador_pyrosai.invalidar()
+        if arquivo_ocorrencias is not None:
+            ocorrencias_ativas.avancar_ids_para(arquivo_ocorrencias.maior_id() + 1)
+
+        # Invariante da fila: exatamente as ocorrências DETECTADA aguardam atendimento
+        fila_prioridade_atendimento.inserir_lote((o.ID, o.severidade_num) for o in ocorrencias_ativas.por_status("DETECTADA"))
+        return {'ocorrencias': len(ocorrencias_ativas), 'registros_log': registros_log}
+
+    def _reaplicar_log(self) -> int:
+        if not os.path.exists(self.caminho_log):
+            return 0
+        with open(self.caminho_log, 'rb') as arquivo:
+            dados = arquivo.read()
+
+        strings = []
+        novas = []
+        aplicados = 0
+        posicao = 0
+        tamanho_total = len(dados)
+
+        def descarregar_novas():
+            if novas:
+                ocorrencias_ativas.adicionar_lote(novas)
+                novas.clear()
+
+        while posicao < tamanho_total:
+            op = dados[posicao]
+            if op == OP_INSERCAO:
+                if posicao + _FORMATO_INSERCAO.size > tamanho_total:
+                    break
+                _, ocorrencia_id, severidade_num, local, status, timestamp, temp, umid_ar, umid_solo = _FORMATO_INSERCAO.unpack_from(dados, posicao)
+                posicao += _FORMATO_INSERCAO.size
+                ocorrencia = Ocorrencia(ocorrencia_id, severidade_num, strings[local], STATUS_OCORRENCIA[status], timestamp,
+                                        _leitura_sensor(temp), _leitura_sensor(umid_ar), _leitura_sensor(umid_solo))
+                if ocorrencia_id in ocorrencias_ativas:
+                    descarregar_novas()
+                    ocorrencias_ativas.adicionar(ocorrencia)
+                else:
+                    novas.append(ocorrencia)
+            elif op == OP_STRING:
+                if posicao + _FORMATO_STRING.size > tamanho_total:
+                    break
+                _, indice, tamanho = _FORMATO_STRING.unpack_from(dados, posicao)
+                inicio = posicao + _FORMATO_STRING.size
+                if inicio + tamanho > tamanho_total:
+                    break
+                strings.append(dados[inicio:inicio + tamanho].decode('utf-8'))
+                posicao = inicio + tamanho
+            elif op in (OP_STATUS, OP_SEVERIDADE):
+                if posicao + _FORMATO_ALTERACAO.size > tamanho_total:
+                    break
+                _, ocorrencia_id, valor = _FORMATO_ALTERACAO.unpack_from(dados, posicao)
+                posicao += _FORMATO_ALTERACAO.size
+                descarregar_novas()
+                if ocorrencia_id in ocorrencias_ativas:
+                    if op == OP_STATUS:
+                        ocorrencias_ativas.atualizar_status(ocorrencia_id, STATUS_OCORRENCIA[valor])
+                    else:
+                        ocorrencias_ativas.atualizar_severidade(ocorrencia_id, valor)
+            elif op == OP_REMOCAO:
+                if posicao + _FORMATO_REMOCAO.size > tamanho_total:
+                    break
+                _, ocorrencia_id = _FORMATO_REMOCAO.unpack_from(dados, posicao)
+                posicao += _FORMATO_REMOCAO.size
+                descarregar_novas()
+                ocorrencias_ativas.remover_lote([ocorrencia_id])
+                ocorrencias_ativas.avancar_ids_para(ocorrencia_id + 1) # O ID arquivado não volta a ser usado
+            elif op == OP_ROTA:
+                if posicao + _FORMATO_ROTA.size > tamanho_total:
+                    break
+                _, origem, destino, peso = _FORMATO_ROTA.unpack_from(dados, posicao)
+                posicao += _FORMATO_ROTA.size
+                rede_localizacoes_graph.add_edge(strings[origem], strings[destino], weight=_leitura_sensor(peso))
+            elif op == OP_REMOCAO_ROTA:
+                if posicao + _FORMATO_REMOCAO_ROTA.size > tamanho_total:
+                    break
+                _, origem, destino = _FORMATO_REMOCAO_ROTA.unpack_from(dados, posicao)
+                posicao += _FORMATO_REMOCAO_ROTA.size
+                if rede_localizacoes_graph.has_edge(strings[origem], strings[destino]):
+                    rede_localizacoes_graph.remove_edge(strings[origem], strings[destino])
+            else:
+                break # Byte inválido: trata como cauda corrompida
+            aplicados += 1
+        descarregar_novas()
+
+        if posicao < tamanho_total:
+            # Registro parcial de uma gravação interrompida: descarta a cauda corrompida
+            with open(self.caminho_log, 'r+b') as arquivo:
+                arquivo.truncate(posicao)
+
+        # Continua o log atual: as strings já internadas mantêm seus índices
+        self._strings = {texto: i for i, texto in enumerate(strings)}
+        self._registros_desde_snapshot = aplicados
+        return aplicados
+
+    def fechar(self):
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+
+def ativar_persistencia(diretorio: str, **opcoes) -> PersistenciaEstado:
+    """
+    Restaura o estado salvo em `diretorio` (se houver) e passa a registrar todas as
+    mudanças seguintes nele. Retorna o objeto de persistência ativo.
+    """
+    global persistencia_estado
+    if persistencia_estado is not None:
+        desativar_persistencia()
+    persistencia = PersistenciaEstado(diretorio, **opcoes)
+    persistencia.restaurar()
+    ocorrencias_ativas.adicionar_observador(persistencia)
+    persistencia_estado = persistencia
+    return persistencia
+
+def desativar_persistencia():
+    """Grava um snapshot final e deixa de registrar as mudanças."""
+    global persistencia_estado
+    if persistencia_estado is None:
+        return
+    ocorrencias_ativas.remover_observador(persistencia_estado)
+    persistencia_estado.gravar_snapshot()
+    persistencia_estado.fechar()
+    persistencia_estado = None
+
+
+# --- Arquivamento em Camadas (SQLite) ---
+class ArquivoOcorrencias:
+    """
+    Camada fria do armazenamento: ocorrências extintas ou antigas saem do repositório em
+    memória e vão para um banco SQLite local, com índices por data de detecção e por
+    (localização, data). O conjunto quente fica proporcional aos incêndios vivos, enquanto
+    o histórico continua consultável. Gravações são em lote, numa única transação
+    (modo WAL), e idempotentes (`INSERT OR REPLACE` pelo ID).
+    """
+
+    COLUNAS = ("ID", "severidade_num", "localizacao", "status", "timestamp_deteccao", "temp", "umid_ar", "umid_solo")
+
+    def __init__(self, caminho: str, automatico: bool = True):
+        self.caminho = caminho
+        self.automatico = automatico # Arquiva cada ocorrência assim que ela é marcada EXTINTA
+        self._conexao = sqlite3.connect(caminho)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        with self._conexao:
+            self._conexao.execute("""
+                CREATE TABLE IF NOT EXISTS ocorrencias (
+                    ID INTEGER PRIMARY KEY, severidade_num INTEGER NOT NULL, localizacao TEXT NOT NULL,
+                    status TEXT NOT NULL, timestamp_deteccao REAL NOT NULL,
+                    temp REAL, umid_ar REAL, umid_solo REAL)""")
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_ocorrencias_data ON ocorrencias (timestamp_deteccao)")
+            self._conexao.execute("CREATE INDEX IF NOT EXISTS idx_ocorrencias_local_data ON ocorrencias (localizacao, timestamp_deteccao)")
+
+    def __len__(self):
+        return self._conexao.execute("SELECT COUNT(*) FROM ocorrencias").fetchone()[0]
+
+    @staticmethod
+    def _ocorrencia(linha) -> Ocorrencia:
+        # Colunas REAL voltam como float: leituras inteiras retornam como int, como no log
+        return Ocorrencia(*linha[:5], *map(_leitura_sensor, linha[5:]))
+
+    def maior_id(self) -> int:
+        return self._conexao.execute("SELECT COALESCE(MAX(ID), 0) FROM ocorrencias").fetchone()[0]
+
+    def arquivar(self, ocorrencias) -> int:
+        """Grava as ocorrências no arquivo em uma única transação. Retorna quantas foram gravadas."""
+        linhas = [(o.ID, o.severidade_num, o.localizacao, o.status, o.timestamp_deteccao, o.temp, o.umid_ar, o.umid_solo)
+                  for o in ocorrencias]
+        with self._conexao:
+            self._conexao.executemany(f"INSERT OR REPLACE INTO ocorrencias VALUES ({', '.join('?' * len(self.COLUNAS))})", linhas)
+        return len(linhas)
+
+    def _filtros(self, inicio, fim, localizacao, severidade_num):
+        condicoes, parametros = [], []
+        inicio, fim = interpretar_data(inicio), interpretar_data(fim)
+        for condicao, valor in (("localizacao = ?", localizacao), ("timestamp_deteccao >= ?", inicio),
+                                ("timestamp_deteccao < ?", fim), ("severidade_num = ?", severidade_num)):
+            if valor is not None:
+                condicoes.append(condicao)
+                parametros.append(valor)
+        return (" WHERE " + " AND ".join(condicoes) if condicoes else ""), parametros
+
+    def consultar(self, inicio=None, fim=None, localizacao: str = None, severidade_num: int = None,
+                  limite: int = None) -> list:
+        """
+        Ocorrências arquivadas, em ordem de detecção, filtradas por intervalo de detecção
+        [inicio, fim) (instantes numéricos ou textos no `FORMATO_DATA`), localização e severidade.
+        """
+        filtro, parametros = self._filtros(inicio, fim, localizacao, severidade_num)
+        sql = f"SELECT {', '.join(self.COLUNAS)} FROM ocorrencias{filtro} ORDER BY timestamp_deteccao, ID"
+        if limite is not None:
+            sql += " LIMIT ?"
+            parametros.append(limite)
+        return [self._ocorrencia(linha) for linha in self._conexao.execute(sql, parametros)]
+
+    def contar(self, inicio=None, fim=None, localizacao: str = None, severidade_num: int = None) -> int:
+        filtro, parametros = self._filtros(inicio, fim, localizacao, severidade_num)
+        return self._conexao.execute(f"SELECT COUNT(*) FROM ocorrencias{filtro}", parametros).fetchone()[0]
+
+    def get(self, ocorrencia_id, padrao=None):
+        linha = self._conexao.execute(f"SELECT {', '.join(self.COLUNAS)} FROM ocorrencias WHERE ID = ?", (ocorrencia_id,)).fetchone()
+        return self._ocorrencia(linha) if linha is not None else padrao
+
+    def fechar(self):
+        self._conexao.close()
+
+def arquivar_ocorrencias(ocorrencia_ids=None, idade_maxima: float = None) -> int:
+    """
+    Move ocorrências do repositório em memória para o `arquivo_ocorrencias`: as informadas
+    em `ocorrencia_ids` ou, por padrão, todas as EXTINTA. Com `idade_maxima` (segundos),
+    também as SOB_CONTROLE detectadas há mais tempo que isso; incêndios ainda ativos
+    (DETECTADA, EM_ATENDIMENTO) só saem da memória se informados em `ocorrencia_ids`. A gravação no arquivo acontece antes da remoção da memória, então uma
+    queda entre as duas etapas apenas repete o arquivamento (idempotente).
+
+    Returns:
+        int: Quantidade de ocorrências arquivadas.
+    """
+    if arquivo_ocorrencias is None:
+        raise RuntimeError("Arquivamento não ativado: chame `ativar_arquivamento` antes.")
+    if ocorrencia_ids is None:
+        ocorrencia_ids = [o.ID for o in ocorrencias_ativas.por_status("EXTINTA")]
+        if idade_maxima is not None:
+            limite = relogio_simulacao.agora() - idade_maxima
+            # `por_status` vem em ordem de ID (crescente no tempo): para na primeira recente
+            ocorrencia_ids += [o.ID for o in itertools.takewhile(lambda o: o.timestamp_deteccao < limite,
+                                                                 ocorrencias_ativas.por_status("SOB_CONTROLE"))]
+    ocorrencias = [ocorrencias_ativas[i] for i in ocorrencia_ids if i in ocorrencias_ativas]
+    if not ocorrencias:
+        return 0
+    arquivo_ocorrencias.arquivar(ocorrencias)
+    for ocorrencia in ocorrencias:
+        fila_prioridade_atendimento.remover(ocorrencia.ID)
+    ocorrencias_ativas.remover_lote([o.ID for o in ocorrencias])
+    if metricas_pyrosai.habilitado:
+        metricas_pyrosai.incrementar('ocorrencias_arquivadas', len(ocorrencias))
+    return len(ocorrencias)
+
+def consultar_historico(localizacao: str = None, inicio=None, fim=None, severidade_num: int = None) -> list:
+    """
+    Histórico completo (memória + arquivo) em ordem de ID, com os mesmos filtros de
+    `ArquivoOcorrencias.consultar`.
+    """
+    inicio, fim = interpretar_data(inicio), interpretar_data(fim)
+    candidatas = ocorrencias_ativas.por_localizacao(localizacao) if localizacao is not None else list(ocorrencias_ativas)
+    quentes = [o for o in candidatas
+               if (inicio is None or o.timestamp_deteccao >= inicio) and (fim is None or o.timestamp_deteccao < fim)
+               and (severidade_num is None or o.severidade_num == severidade_num)]
+    if arquivo_ocorrencias is None:
+        return quentes
+    frias = arquivo_ocorrencias.consultar(inicio, fim, localizacao, severidade_num)
+    return sorted(quentes + frias, key=lambda o: o.ID)
+
+def ativar_arquivamento(caminho: str, automatico: bool = True) -> ArquivoOcorrencias:
+    """
+    Abre (ou cria) o arquivo SQLite em `caminho` e move para ele as ocorrências já extintas.
+    Com `automatico=True`, cada ocorrência marcada EXTINTA é arquivada na hora.
+    """
+    global arquivo_ocorrencias
+    desativar_arquivamento()
+    arquivo_ocorrencias = ArquivoOcorrencias(caminho, automatico)
+    ocorrencias_ativas.avancar_ids_para(arquivo_ocorrencias.maior_id() + 1)
+    arquivar_ocorrencias()
+    return arquivo_ocorrencias
+
+def desativar_arquivamento():
+    global arquivo_ocorrencias
+    if arquivo_ocorrencias is not None:
+        arquivo_ocorrencias.fechar()
+        arquivo_ocorrencias = None
+
+
+# --- Simulação de Eventos Discretos (Relógio Virtual) ---
+# Tipos de evento; no mesmo instante, os eventos são tratados na ordem em que foram agendados
+EVENTO_DETECCAO, EVENTO_CHEGADA, EVENTO_CONTROLE, EVENTO_EXTINCAO, EVENTO_RETORNO = range(5)
+
+# Duração média (horas) do combate até o fogo ficar SOB_CONTROLE, por severidade
+HORAS_COMBATE_MEDIO = {1: 1.0, 2: 2.0, 3: 4.0, 4: 8.0}
+# Duração média (horas) do rescaldo, de SOB_CONTROLE até EXTINTA
+HORAS_RESCALDO_MEDIO = 2.0
+
+# Políticas de despacho: chave de ordenação das ocorrências que aguardam equipe
+POLITICAS_DESPACHO = {
+    "prioridade": lambda ocorrencia: (-ocorrencia.severidade_num, ocorrencia.ID), # Mais severa primeiro
+    "fifo": lambda ocorrencia: (ocorrencia.ID,),                                  # Ordem de detecção
+}
+
+INICIO_SIMULACAO_PADRAO = "2025-01-01 00:00:00"
+
+def _percentil(valores: list, fracao: float) -> float:
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(fracao * len(ordenados)))]
+
+class SimulacaoEventosDiscretos:
+    """
+    Simulação de eventos discretos das operações de combate: um heap de eventos
+    (instante, sequência, tipo, dados) e um `RelogioVirtual` que salta direto para o
+    próximo evento. Detecções chegam como um processo de Poisson; cada uma vira uma
+    ocorrência que aguarda uma equipe livre (na ordem da política de despacho), recebe
+    a equipe da base livre mais próxima, que viaja pela rota calculada, combate o fogo
+    e volta à base. Os status seguem DETECTADA -> EM_ATENDIMENTO -> SOB_CONTROLE -> EXTINTA.
+    As ocorrências vivem em um repositório próprio (`repositorio`), com timestamps do
+    relógio virtual: a simulação só lê o grafo e o roteador, e nada chega à fila, à
+    persistência ou ao arquivo do estado operacional.
+    A aleatoriedade vem de dois `random.Random` derivados de `seed`: um para as detecções e
+    outro para as operações. A mesma semente reproduz a mesma execução e, com políticas
+    diferentes, o mesmo fluxo de incêndios, o que torna a comparação justa.
+    Simplificação: a volta à base leva o mesmo tempo da ida.
+    """
+
+    def __init__(self, deteccoes_por_hora: float = 0.3, politica: str = "prioridade", velocidade_kmh: float = 60.0,
+                 equipes_por_base: dict = None, seed: int = None, inicio=INICIO_SIMULACAO_PADRAO):
+        if politica not in POLITICAS_DESPACHO:
+            raise ValueError(f"Política de despacho desconhecida: '{politica}'. Opções: {', '.join(POLITICAS_DESPACHO)}.")
+        self.deteccoes_por_hora = deteccoes_por_hora
+        self.politica = politica
+        self.velocidade_kmh = velocidade_kmh
+        self.rng_deteccoes = random.Random(seed)
+        self.rng = random.Random(None if seed is None else seed + 1)
+        self.relogio = RelogioVirtual(interpretar_data(inicio))
+        self.repositorio = RepositorioOcorrencias()
+        if equipes_por_base is None:
+            equipes_por_base = equipes_das_bases(rede_localizacoes_graph)
+        self.equipes_livres = dict(equipes_por_base)
+        self.total_equipes = sum(self.equipes_livres.values())
+
+        # Só locais alcançáveis por alguma base recebem detecções
+        distancias, _, _ = roteador_pyrosai._garantir_tabela()
+        self.locais = [no for no in rede_localizacoes_graph.nodes if no in distancias and no not in self.equipes_livres]
+
+        self._eventos = []
+        self._sequencia = itertools.count()
+        self._aguardando = [] # Heap (chave da política, ID) das ocorrências sem equipe
+        self._chave = POLITICAS_DESPACHO[politica]
+        self._tratadores = {
+            EVENTO_DETECCAO: self._ao_detectar,
+            EVENTO_CHEGADA: self._ao_chegar,
+            EVENTO_CONTROLE: self._ao_controlar,
+            EVENTO_EXTINCAO: self._ao_extinguir,
+            EVENTO_RETORNO: self._ao_retornar,
+        }
+        self.eventos_processados = 0
+        self.deteccoes = 0
+        self.extintas = 0
+        self.horas_equipe_ocupada = 0.0
+        self.dias_simulados = 0.0  # Acumulado entre chamadas de `executar`
+        self.segundos_reais = 0.0
+        self.tempos_espera = defaultdict(list)   # severidade -> horas da detecção ao despacho
+        self.tempos_resposta = defaultdict(list) # severidade -> horas da detecção à chegada
+
+    def _agendar(self, atraso_horas: float, tipo: int, dados=None):
+        instante = self.relogio.agora() + atraso_horas * 3600
+        heapq.heappush(self._eventos, (instante, next(self._sequencia), tipo, dados))
+
+    # --- Tratadores de Eventos ---
+    def _ao_detectar(self, _):
+        self.deteccoes += 1
+        rng = self.rng_deteccoes
+        temp, umid_ar, umid_solo = rng.randint(15, 45), rng.randint(5, 95), rng.randint(0, 90)
+        codigo = int(pyrosai_avaliar_criticidade_lote(temp, umid_ar, umid_solo))
+        ocorrencia = Ocorrencia(self.repositorio.reservar_ids(), codigo, rng.choice(self.locais), "DETECTADA",
+                                self.relogio.agora(), temp, umid_ar, umid_solo)
+        self.repositorio.adicionar(ocorrencia)
+        heapq.heappush(self._aguardando, (self._chave(ocorrencia), ocorrencia.ID))
+        self._agendar(rng.expovariate(self.deteccoes_por_hora), EVENTO_DETECCAO)
+        self._despachar_pendentes()
+
+    def _ao_chegar(self, dados):
+        ocorrencia_id, base, horas_viagem = dados
+        ocorrencia = self.repositorio[ocorrencia_id]
+        self.tempos_resposta[ocorrencia.severidade_num].append((self.relogio.agora() - ocorrencia.timestamp_deteccao) / 3600)
+        self._agendar(self.rng.expovariate(1 / HORAS_COMBATE_MEDIO[ocorrencia.severidade_num]), EVENTO_CONTROLE, dados)
+
+    def _ao_controlar(self, dados):
+        self.repositorio.atualizar_status(dados[0], "SOB_CONTROLE")
+        self._agendar(self.rng.expovariate(1 / HORAS_RESCALDO_MEDIO), EVENTO_EXTINCAO, dados)
+
+    def _ao_extinguir(self, dados):
+        ocorrencia_id, base, horas_viagem = dados
+        self.repositorio.atualizar_status(ocorrencia_id, "EXTINTA")
+        self.extintas += 1
+        self._agendar(horas_viagem, EVENTO_RETORNO, base)
+
+    def _ao_retornar(self, base):
+        self.equipes_livres[base] += 1
+        self._despachar_pendentes()
+
+    # --- Despacho ---
+    def _base_livre_mais_proxima(self, local):
+        """(base, distância, caminho) da base com equipe livre mais próxima de `local`, ou None."""
+        rota = roteador_pyrosai.base_mais_proxima(local)
+        if rota is not None and self.equipes_livres.get(rota[0], 0) > 0:
+            return rota # Caso comum: a base mais próxima de todas tem equipe livre (tabela em cache)
+        livres = [base for base, equipes in self.equipes_livres.items() if equipes > 0]
+        distancias, proximos, _ = _dijkstra_multi_origem(rede_localizacoes_graph, [local], alvos=livres, reverso=True,
+                                                         quantidade_alvos=1)
+        alcancadas = [base for base in livres if base in distancias]
+        if not alcancadas:
+            return None
+        base = min(alcancadas, key=distancias.get)
+        return base, distancias[base], _caminho_ate_raiz(proximos, base)
+
+    def _despachar_pendentes(self):
+        adiadas = []
+        while self._aguardando and any(self.equipes_livres.values()):
+            item = heapq.heappop(self._aguardando)
+            ocorrencia = self.repositorio[item[1]]
+            rota = self._base_livre_mais_proxima(ocorrencia.localizacao)
+            if rota is None:
+                adiadas.append(item) # Nenhuma base livre alcança o local: espera outra equipe
+                continue
+            base, distancia, _ = rota
+            self.equipes_livres[base] -= 1
+            self.repositorio.atualizar_status(ocorrencia.ID, "EM_ATENDIMENTO")
+            self.tempos_espera[ocorrencia.severidade_num].append((self.relogio.agora() - ocorrencia.timestamp_deteccao) / 3600)
+            horas_viagem = distancia / self.velocidade_kmh
+            self._agendar(horas_viagem, EVENTO_CHEGADA, (ocorrencia.ID, base, horas_viagem))
+        for item in adiadas:
+            heapq.heappush(self._aguardando, item)
+
+    # --- Execução ---
+    def executar(self, dias: float) -> dict:
+        """
+        Simula `dias` dias de operação e retorna o `resumo`. Pode ser chamada de novo
+        para continuar a mesma simulação; o resumo cobre todo o tempo já simulado.
+        """
+        inicio_real = time.perf_counter()
+        if not self._eventos:
+            self._agendar(self.rng_deteccoes.expovariate(self.deteccoes_por_hora), EVENTO_DETECCAO)
+        fim = self.relogio.agora() + dias * 86400
+        ocupadas_antes = self.total_equipes - sum(self.equipes_livres.values())
+        instante_anterior = self.relogio.agora()
+        while self._eventos and self._eventos[0][0] <= fim:
+            instante, _, tipo, dados = heapq.heappop(self._eventos)
+            self.horas_equipe_ocupada += ocupadas_antes * (instante - instante_anterior) / 3600
+            self.relogio.avancar_para(instante)
+            self._tratadores[tipo](dados)
+            self.eventos_processados += 1
+            ocupadas_antes = self.total_equipes - sum(self.equipes_livres.values())
+            instante_anterior = instante
+        self.horas_equipe_ocupada += ocupadas_antes * (fim - instante_anterior) / 3600
+        self.relogio.avancar_para(fim)
+        self.dias_simulados += dias
+        self.segundos_reais += time.perf_counter() - inicio_real
+        return self.resumo()
+
+    def resumo(self) -> dict:
+        """Indicadores para comparar políticas de despacho (tempos em horas)."""
+        por_severidade = {}
+        for codigo, nome in NOMES_SEVERIDADE.items():
+            resposta = self.tempos_resposta.get(codigo, [])
+            por_severidade[nome] = {
+                'atendidas': len(resposta),
+                'resposta_media_h': sum(resposta) / len(resposta) if resposta else 0.0,
+                'resposta_p90_h': _percentil(resposta, 0.9),
+                'espera_media_h': (sum(self.tempos_espera[codigo]) / len(self.tempos_espera[codigo])
+                                   if self.tempos_espera.get(codigo) else 0.0),
+            }
+        horas_disponiveis = self.total_equipes * self.dias_simulados * 24
+        return {
+            'politica': self.politica,
+            'dias_simulados': self.dias_simulados,
+            'deteccoes': self.deteccoes,
+            'extintas': self.extintas,
+            'aguardando_equipe': len(self._aguardando),
+            'eventos': self.eventos_processados,
+            'ocupacao_equipes': self.horas_equipe_ocupada / horas_disponiveis if horas_disponiveis else 0.0,
+            'por_severidade': por_severidade,
+            'segundos_reais': self.segundos_reais,
+        }
+
+def simular_operacoes(dias: float = 7, deteccoes_por_hora: float = 0.3, politica: str = "prioridade", seed: int = 42) -> dict:
+    """
+    Roda a `SimulacaoEventosDiscretos` sobre o grafo atual e exibe os indicadores por severidade.
+    """
+    print(f"\n--- Simulação de Eventos Discretos ({dias:g} dias, política '{politica}', semente {seed}) ---")
+    simulacao = SimulacaoEventosDiscretos(deteccoes_por_hora, politica, seed=seed)
+    resumo = simulacao.executar(dias)
+    print(f"  Detecções: {resumo['deteccoes']} | Extintas: {resumo['extintas']} | Aguardando equipe: {resumo['aguardando_equipe']}")
+    print(f"  Eventos: {resumo['eventos']} em {resumo['segundos_reais']:.2f}s reais | Ocupação das equipes: {resumo['ocupacao_equipes']:.0%}")
+    for nome, indicadores in resumo['por_severidade'].items():
+        print(f"  - {nome:<8}: {indicadores['atendidas']:>6} atendidas | resposta média {indicadores['resposta_media_h'] * 60:7.1f} min"
+              f" | p90 {indicadores['resposta_p90_h'] * 60:7.1f} min | espera média {indicadores['espera_media_h'] * 60:7.1f} min")
+    return resumo
 
 
 # --- Menu Principal do Simulador (mantido) ---
@@ -413,7 +3542,9 @@ def menu():
     print("  4. Atualizar Status de Ocorrência Simulada")
     print("  5. Gerar Relatório Simulado por Localização")
     print("  6. Simular Novas Detecções Aleatórias (Avaliação PyrosAI)")
-    print("  7. Buscar Ocorrência por Severidade (Simulação de Busca Binária)")
+    print("  7. Buscar Ocorrência por Severidade (Índice da PyrosAI)")
+    print("  8. Despachar Ocorrências em Lote (PyrosAI Atribuição Ótima)")
+    print("  9. Executar Serviço de Despacho Assíncrono (Simulação)")
     print("  0. Sair do Simulador")
     print("================================================================")
 
@@ -422,30 +3553,76 @@ def menu():
 
 # --- Loop Principal da Aplicação ---
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Projeto Artemis: Simulador de Resposta a Queimadas")
+    parser.add_argument("--ingerir", metavar="ARQUIVO", help="ingere leituras de um arquivo .csv/.jsonl sem interação e encerra")
+    parser.add_argument("--servico", type=float, metavar="SEGUNDOS", help="executa o serviço de despacho assíncrono por SEGUNDOS e encerra")
+    parser.add_argument("--propagacao", type=int, metavar="PASSOS", help="simula a propagação do fogo por PASSOS passos e encerra")
+    parser.add_argument("--simular-dias", type=float, metavar="DIAS", help="simula DIAS dias de operação em relógio virtual e encerra")
+    parser.add_argument("--politica", choices=sorted(POLITICAS_DESPACHO), default="prioridade", help="política de despacho da simulação")
+    parser.add_argument("--deteccoes-hora", type=float, default=0.3, metavar="TAXA", help="detecções por hora na simulação")
+    parser.add_argument("--seed", type=int, default=42, help="semente da simulação de eventos discretos")
+    parser.add_argument("--estado", metavar="DIRETORIO", help="restaura e persiste o estado do simulador neste diretório")
+    parser.add_argument("--arquivo", metavar="ARQUIVO", help="arquiva ocorrências extintas neste banco SQLite")
+    parser.add_argument("--metricas", metavar="ARQUIVO", help="habilita a instrumentação e grava um instantâneo JSON ao sair")
+    parser.add_argument("--metricas-porta", type=int, metavar="PORTA", help="habilita a instrumentação e expõe /metrics (Prometheus)")
+    argumentos = parser.parse_args()
+
+    if argumentos.metricas or argumentos.metricas_porta:
+        metricas_pyrosai.habilitar()
+    if argumentos.metricas_porta:
+        metricas_pyrosai.servir_prometheus(argumentos.metricas_porta)
+
     configurar_grafo_localizacoes() # Configura o grafo simulado no início da execução
+    if argumentos.estado:
+        ativar_persistencia(argumentos.estado)
+        print(f"  Estado restaurado de '{argumentos.estado}': {len(ocorrencias_ativas)} ocorrências.")
+    if argumentos.arquivo:
+        ativar_arquivamento(argumentos.arquivo)
+        print(f"  Arquivo histórico '{argumentos.arquivo}': {len(arquivo_ocorrencias)} ocorrências arquivadas.")
 
-    while True:
-        escolha = menu()
-
-        if escolha == '1':
-            inserir_nova_ocorrencia()
-        elif escolha == '2':
-            exibir_ocorrencias_ativas()
-        elif escolha == '3':
-            atender_proxima_ocorrencia()
-        elif escolha == '4':
-            atualizar_status_ocorrencia()
-        elif escolha == '5':
-            gerar_relatorio_atendimento_por_localizacao()
-        elif escolha == '6':
-            simular_chamadas_aleatorias()
-        elif escolha == '7':
-            severidade_busca = input("  Informe a severidade para buscar (BAIXA, MEDIA, ALTA, CRITICA): ")
-            buscar_ocorrencia_por_severidade(severidade_busca)
-        elif escolha == '0':
-            print("Saindo do Simulador do Projeto Artemis. Até mais!")
-            break
+    # Cada modo roda até o fim (ou até uma falha); o encerramento grava snapshot, fecha o arquivo e exporta as métricas
+    try:
+        if argumentos.servico:
+            executar_servico_simulado(argumentos.servico)
+        elif argumentos.simular_dias:
+            simular_operacoes(argumentos.simular_dias, argumentos.deteccoes_hora, politica=argumentos.politica, seed=argumentos.seed)
+        elif argumentos.propagacao:
+            simular_propagacao_fogo(argumentos.propagacao)
+        elif argumentos.ingerir:
+            print(f"\n--- Ingestão de Leituras de '{argumentos.ingerir}' ---")
+            print(ingerir_arquivo(argumentos.ingerir).resumo())
         else:
-            print("  Opção inválida. Por favor, tente novamente.")
-        
-        input("\n  Pressione Enter para continuar no simulador...") # Pausa para o usuário ler a saída
+            while True:
+                escolha = menu()
+
+                if escolha == '1':
+                    inserir_nova_ocorrencia()
+                elif escolha == '2':
+                    exibir_ocorrencias_ativas()
+                elif escolha == '3':
+                    atender_proxima_ocorrencia()
+                elif escolha == '4':
+                    atualizar_status_ocorrencia()
+                elif escolha == '5':
+                    gerar_relatorio_atendimento_por_localizacao()
+                elif escolha == '6':
+                    simular_chamadas_aleatorias()
+                elif escolha == '7':
+                    severidade_busca = input("  Informe a severidade para buscar (BAIXA, MEDIA, ALTA, CRITICA): ")
+                    buscar_ocorrencia_por_severidade(severidade_busca)
+                elif escolha == '8':
+                    atender_ocorrencias_em_lote()
+                elif escolha == '9':
+                    executar_servico_simulado()
+                elif escolha == '0':
+                    print("Saindo do Simulador do Projeto Artemis. Até mais!")
+                    break
+                else:
+                    print("  Opção inválida. Por favor, tente novamente.")
+            
+                input("\n  Pressione Enter para continuar no simulador...") # Pausa para o usuário ler a saída
+    finally:
+        desativar_persistencia()
+        desativar_arquivamento()
+        if argumentos.metricas:
+            metricas_pyrosai.exportar_json(argumentos.metricas)
@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dynamic  # noqa: E402
+
+
+def _reiniciar_estado():
+    dynamic.desativar_persistencia()
+    dynamic.desativar_arquivamento()
+    dynamic.ocorrencias_ativas.limpar()
+    dynamic.fila_prioridade_atendimento.limpar()
+    dynamic.rede_localizacoes_graph.clear()
+    dynamic.roteador_pyrosai.invalidar()
+
+
+@pytest.fixture
+def estado_simulador():
+    """Grafo padrão do simulador, com repositório e fila vazios e sem persistência."""
+    _reiniciar_estado()
+    dynamic.configurar_grafo_localizacoes()
+    yield dynamic
+    _reiniciar_estado()
@@ -0,0 +1,73 @@
+import pytest
+
+DIA = 86400
+
+
+@pytest.fixture
+def relogio(estado_simulador, monkeypatch):
+    relogio = estado_simulador.RelogioVirtual(estado_simulador.interpretar_data('2025-01-01 08:00:00'))
+    monkeypatch.setattr(estado_simulador, 'relogio_simulacao', relogio)
+    return relogio
+
+
+def test_arquivamento_por_idade_preserva_incendios_ativos(estado_simulador, relogio, tmp_path):
+    dynamic = estado_simulador
+    dynamic.ativar_arquivamento(str(tmp_path / 'arquivo.db'), automatico=False)
+    antigas = {status: dynamic.registrar_ocorrencia('Rio_Sereno', 'ALTA', 36, 20, 30) for status in dynamic.STATUS_OCORRENCIA}
+    for status, ocorrencia in antigas.items():
+        if status != "DETECTADA":
+            dynamic.alterar_status_ocorrencia(ocorrencia.ID, status)
+    relogio.avancar_para(relogio.agora() + 2 * DIA)
+    recente = dynamic.registrar_ocorrencia('Vila_Clara', 'MEDIA', 30, 40, 30)
+    dynamic.alterar_status_ocorrencia(recente.ID, "SOB_CONTROLE")
+
+    assert dynamic.arquivar_ocorrencias(idade_maxima=DIA) == 2
+    assert {o.status for o in dynamic.ocorrencias_ativas} == {"DETECTADA", "EM_ATENDIMENTO", "SOB_CONTROLE"}
+    assert recente.ID in dynamic.ocorrencias_ativas
+    assert antigas["DETECTADA"].ID in dynamic.fila_prioridade_atendimento
+    assert len(dynamic.arquivo_ocorrencias) == 2
+
+    # Incêndios ativos só saem da memória quando pedidos explicitamente
+    assert dynamic.arquivar_ocorrencias([antigas["DETECTADA"].ID]) == 1
+    assert len(dynamic.fila_prioridade_atendimento) == 0
+
+
+def test_ocorrencia_arquivada_volta_identica_e_nao_e_restaurada_na_memoria(estado_simulador, relogio, tmp_path):
+    dynamic = estado_simulador
+    dynamic.ativar_persistencia(str(tmp_path))
+    dynamic.ativar_arquivamento(str(tmp_path / 'arquivo.db'))
+    extinta = dynamic.registrar_ocorrencia('Pico_Alto', 'CRITICA', 40.5, 10, 5)
+    ativa = dynamic.registrar_ocorrencia('Rio_Sereno', 'BAIXA', 18, 90, 80)
+    dynamic.alterar_status_ocorrencia(extinta.ID, "EXTINTA") # Arquivada na hora (automático)
+    assert extinta.ID not in dynamic.ocorrencias_ativas
+    assert dynamic.arquivo_ocorrencias.get(extinta.ID) == extinta
+    assert isinstance(dynamic.arquivo_ocorrencias.get(extinta.ID).umid_ar, int)
+
+    dynamic.desativar_persistencia()
+    dynamic.desativar_arquivamento()
+    dynamic.ocorrencias_ativas.limpar()
+    dynamic.ativar_arquivamento(str(tmp_path / 'arquivo.db'))
+    dynamic.ativar_persistencia(str(tmp_path))
+    assert list(dynamic.ocorrencias_ativas) == [ativa]
+    assert dynamic.registrar_ocorrencia('Vila_Clara', 'MEDIA', 30, 40, 30).ID == ativa.ID + 1
+
+
+def test_consultar_historico_une_memoria_e_arquivo(estado_simulador, relogio, tmp_path):
+    dynamic = estado_simulador
+    dynamic.ativar_arquivamento(str(tmp_path / 'arquivo.db'))
+    registradas = []
+    for dia, (local, severidade) in enumerate([('Rio_Sereno', 'ALTA'), ('Vila_Clara', 'ALTA'),
+                                               ('Rio_Sereno', 'BAIXA'), ('Rio_Sereno', 'ALTA')]):
+        relogio.avancar_para(dynamic.interpretar_data('2025-01-01 08:00:00') + dia * DIA)
+        registradas.append(dynamic.registrar_ocorrencia(local, severidade, 36, 20, 30))
+    for ocorrencia in registradas[:2]:
+        dynamic.alterar_status_ocorrencia(ocorrencia.ID, "EXTINTA")
+
+    assert len(dynamic.ocorrencias_ativas) == 2 and len(dynamic.arquivo_ocorrencias) == 2
+    assert [o.ID for o in dynamic.consultar_historico()] == [o.ID for o in registradas]
+    assert [o.ID for o in dynamic.consultar_historico('Rio_Sereno')] == [registradas[i].ID for i in (0, 2, 3)]
+    alta = dynamic.SEVERIDADES['ALTA']
+    assert [o.ID for o in dynamic.consultar_historico(severidade_num=alta)] == [registradas[i].ID for i in (0, 1, 3)]
+    assert [o.ID for o in dynamic.consultar_historico('Rio_Sereno', inicio='2025-01-01 08:00:00',
+                                                      fim='2025-01-03 08:00:00')] == [registradas[0].ID]
+    assert dynamic.arquivo_ocorrencias.contar(localizacao='Rio_Sereno') == 1
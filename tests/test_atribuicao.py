@@ -0,0 +1,19 @@
+import itertools
+import random
+
+import dynamic
+
+
+def test_atribuicao_custo_minimo_igual_a_forca_bruta():
+    rng = random.Random(7)
+    for _ in range(300):
+        linhas = rng.randint(1, 5)
+        colunas = rng.randint(linhas, 6)
+        custos = [[rng.choice([0, rng.randint(1, 20), rng.uniform(0, 50)]) for _ in range(colunas)]
+                  for _ in range(linhas)]
+        atribuicao = dynamic._atribuicao_custo_minimo(custos)
+
+        assert len(set(atribuicao)) == linhas and all(0 <= coluna < colunas for coluna in atribuicao)
+        otimo = min(sum(custos[i][coluna] for i, coluna in enumerate(permutacao))
+                    for permutacao in itertools.permutations(range(colunas), linhas))
+        assert abs(sum(custos[i][coluna] for i, coluna in enumerate(atribuicao)) - otimo) < 1e-9
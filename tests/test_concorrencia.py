@@ -0,0 +1,127 @@
+import threading
+
+import pytest
+
+import dynamic
+
+
+def test_ingestao_concorrente_com_processos_produtores(estado_simulador, tmp_path):
+    dynamic = estado_simulador
+    caminho = tmp_path / 'leituras.csv'
+    caminho.write_text("localizacao,temp,umid_ar,umid_solo\n"
+                       + "Rio_Sereno,40,10,5\n" * 120 + "Cidade_Inexistente,40,10,5\n" * 30, encoding='utf-8')
+    lista = [('Vila_Clara', 38, 12, 8)] * 75 + [('Vila_Clara', 18, 90, 80)] * 25 # As últimas são BAIXA
+
+    estado = dynamic.EstadoOcorrenciasConcorrente()
+    estatisticas = dynamic.ingerir_leituras_concorrente([str(caminho), lista], estado, tamanho_lote=40,
+                                                        severidade_minima='MEDIA')
+
+    assert (estatisticas.leituras, estatisticas.registradas, estatisticas.rejeitadas) == (250, 195, 55)
+    assert estatisticas.lotes == 4 + 3
+    assert len(estado.repositorio) == len(estado.fila) == 195
+    assert sorted(o.ID for o in estado.repositorio.ativas()) == list(range(1, 196))
+    assert len(estado.repositorio.por_localizacao('Rio_Sereno')) == 120
+    assert len(dynamic.ocorrencias_ativas) == 0 # O estado global não é tocado
+
+
+def test_ingestao_concorrente_propaga_falha_de_um_produtor(estado_simulador, tmp_path):
+    dynamic = estado_simulador
+    estado = dynamic.EstadoOcorrenciasConcorrente()
+    with pytest.raises(FileNotFoundError):
+        dynamic.ingerir_leituras_concorrente([[('Rio_Sereno', 40, 10, 5)] * 10, str(tmp_path / 'ausente.csv')], estado)
+
+
+def _em_paralelo(funcao, quantidade_threads):
+    barreira = threading.Barrier(quantidade_threads)
+
+    def alvo(indice):
+        barreira.wait() # Todas começam juntas, maximizando a disputa
+        funcao(indice)
+
+    threads = [threading.Thread(target=alvo, args=(i,)) for i in range(quantidade_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_alocador_ids_nao_repete_ids_entre_threads():
+    alocador = dynamic.AlocadorIds()
+    blocos = [[] for _ in range(8)]
+
+    def reservar(indice):
+        for tamanho in [1, 3, 7] * 500:
+            blocos[indice].append((alocador.reservar(tamanho), tamanho))
+
+    _em_paralelo(reservar, 8)
+    ids = [i for bloco in blocos for primeiro, tamanho in bloco for i in range(primeiro, primeiro + tamanho)]
+    assert len(ids) == len(set(ids)) == 8 * 500 * 11
+    assert sorted(ids) == list(range(1, len(ids) + 1))
+    assert alocador.proximo == len(ids) + 1
+
+
+def test_repositorio_fragmentado_com_varias_threads():
+    repositorio = dynamic.RepositorioOcorrenciasFragmentado(quantidade_fragmentos=4, tamanho_faixa=16)
+    locais = ['Rio_Sereno', 'Vila_Clara', 'Pico_Alto']
+
+    def produzir(indice):
+        for _ in range(50):
+            primeiro = repositorio.reservar_ids(10)
+            ocorrencias = [dynamic.Ocorrencia(primeiro + i, 1 + i % 4, locais[indice % 3], "DETECTADA", 0.0, 30, 40, 30)
+                           for i in range(10)]
+            repositorio.adicionar_lote(ocorrencias)
+            for ocorrencia in ocorrencias[::2]:
+                repositorio.atualizar_status(ocorrencia.ID, "EM_ATENDIMENTO")
+
+    _em_paralelo(produzir, 6)
+    assert len(repositorio) == 6 * 50 * 10
+    ids = [o.ID for o in repositorio.ativas()]
+    assert ids == list(range(1, len(repositorio) + 1)) # Intercalado por ID, sem repetições
+    assert len(repositorio.por_status("EM_ATENDIMENTO")) == len(repositorio.por_status("DETECTADA")) == 1500
+    contagem = repositorio.contagem_por_localizacao()
+    assert {local: sum(por_status.values()) for local, por_status in contagem.items()} == dict.fromkeys(locais, 1000)
+    total = sum(repositorio.contagem_por_severidade_status().values())
+    assert total == len(repositorio)
+
+
+def test_fila_mpsc_com_produtores_e_despachante_simultaneos():
+    fila = dynamic.FilaPrioridadeConcorrente()
+    quantidade_produtores, lotes, tamanho_lote = 4, 200, 25
+    total = quantidade_produtores * lotes * tamanho_lote
+    extraidos = []
+    tamanhos = []
+    produtores_ativos = threading.Event()
+    produtores_ativos.set()
+
+    def produzir(indice):
+        base = indice * lotes * tamanho_lote
+        for lote in range(lotes):
+            inicio = base + lote * tamanho_lote
+            fila.inserir_lote((ocorrencia_id, 1 + ocorrencia_id % 4) for ocorrencia_id in range(inicio, inicio + tamanho_lote))
+            tamanhos.append(len(fila)) # Leitura de qualquer thread não toca o heap
+
+    def despachar():
+        while produtores_ativos.is_set() or len(fila):
+            ocorrencia_id = fila.extrair()
+            if ocorrencia_id is not None:
+                extraidos.append(ocorrencia_id)
+
+    despachante = threading.Thread(target=despachar)
+    despachante.start()
+    _em_paralelo(produzir, quantidade_produtores)
+    produtores_ativos.clear()
+    despachante.join()
+
+    assert sorted(extraidos) == list(range(total))
+    assert len(fila) == 0 and fila.extrair() is None
+    assert all(0 <= tamanho <= total for tamanho in tamanhos)
+
+
+def test_tamanho_da_fila_mpsc_nao_drena_a_entrada():
+    fila = dynamic.FilaPrioridadeConcorrente()
+    fila.inserir_lote([(1, 2), (2, 4)])
+    fila.inserir(3, 1)
+    assert len(fila) == 3
+    assert len(fila._entrada) == 2 and len(fila._fila) == 0
+    assert fila.extrair() == 2
+    assert len(fila) == 2
@@ -0,0 +1,19 @@
+import itertools
+import math
+
+import dynamic
+
+
+def _severidade_escalar(temperatura, umidade_ar, umidade_solo):
+    pontos = (dynamic._pontos_temperatura(temperatura)
+              + dynamic._pontos_umidade_ar(umidade_ar)
+              + dynamic._pontos_umidade_solo(umidade_solo))
+    return dynamic.SEVERIDADES[dynamic._classificar_pontos_risco(pontos)]
+
+
+def test_lote_igual_ao_escalar_inclusive_nan_e_infinito():
+    valores = [math.nan, math.inf, -math.inf, -5, 0, 10.5, 15, 20, 25.2, 35, 36, 50.1, 61, 71, 120]
+    combinacoes = list(itertools.product(valores, repeat=3))
+    temperaturas, umidades_ar, umidades_solo = zip(*combinacoes)
+    codigos = dynamic.pyrosai_avaliar_criticidade_lote(temperaturas, umidades_ar, umidades_solo)
+    assert list(codigos) == [_severidade_escalar(*leitura) for leitura in combinacoes]
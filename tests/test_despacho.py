@@ -0,0 +1,82 @@
+def test_ocorrencia_sem_rota_continua_na_fila_e_nao_bloqueia_as_demais(estado_simulador):
+    dynamic = estado_simulador
+    # Nenhuma base alcança a Estrada_Principal (ela só tem aresta de saída)
+    isolada = dynamic.registrar_ocorrencia('Estrada_Principal', 'CRITICA', 40, 10, 5)
+    alcancavel = dynamic.registrar_ocorrencia('Rio_Sereno', 'BAIXA', 18, 90, 80)
+
+    ocorrencia, rota = dynamic.despachar_proxima_ocorrencia()
+    assert ocorrencia is alcancavel and rota is not None
+    assert isolada.ID in dynamic.fila_prioridade_atendimento
+    assert isolada.status == "DETECTADA"
+
+    # Estacionada fora do heap: nada mais a despachar até as rotas mudarem
+    assert dynamic.despachar_proxima_ocorrencia() is None
+    assert dynamic.fila_prioridade_atendimento.quantidade_sem_rota == 1
+    assert len(dynamic.fila_prioridade_atendimento) == 1
+
+    dynamic.alterar_rota('Base_Alfa', 'Estrada_Principal', 4)
+    ocorrencia, rota = dynamic.despachar_proxima_ocorrencia()
+    assert ocorrencia is isolada and rota == ('Base_Alfa', 4, ['Base_Alfa', 'Estrada_Principal'])
+    assert len(dynamic.fila_prioridade_atendimento) == 0
+
+
+def test_custo_do_despacho_nao_cresce_com_ocorrencias_sem_rota(estado_simulador):
+    dynamic = estado_simulador
+    roteador = dynamic.roteador_pyrosai
+    for _ in range(2000):
+        dynamic.registrar_ocorrencia('Estrada_Principal', 'CRITICA', 40, 10, 5)
+    assert dynamic.despachar_proxima_ocorrencia()[1] is None # Estaciona todas de uma vez
+    for _ in range(5):
+        dynamic.registrar_ocorrencia('Rio_Sereno', 'BAIXA', 18, 90, 80)
+
+    consultas = []
+    original = roteador.base_mais_proxima
+    roteador.base_mais_proxima = lambda destino: consultas.append(destino) or original(destino)
+    try:
+        for _ in range(5):
+            assert dynamic.despachar_proxima_ocorrencia()[1] is not None
+    finally:
+        del roteador.base_mais_proxima
+    assert consultas == ['Rio_Sereno'] * 5
+    assert dynamic.fila_prioridade_atendimento.quantidade_sem_rota == 2000
+
+
+def test_alterar_status_de_ocorrencia_estacionada(estado_simulador):
+    dynamic = estado_simulador
+    isolada = dynamic.registrar_ocorrencia('Estrada_Principal', 'MEDIA', 30, 40, 30)
+    assert dynamic.despachar_proxima_ocorrencia()[1] is None
+    dynamic.escalonar_severidade_ocorrencia(isolada.ID, 'CRITICA')
+    assert isolada.ID in dynamic.fila_prioridade_atendimento
+    dynamic.alterar_status_ocorrencia(isolada.ID, 'EXTINTA')
+    assert len(dynamic.fila_prioridade_atendimento) == 0
+
+
+def test_lote_atende_a_mais_severa_mesmo_longe(estado_simulador):
+    dynamic = estado_simulador
+    grafo = dynamic.rede_localizacoes_graph
+    grafo.clear()
+    grafo.add_weighted_edges_from([('Base_A', 'Longe', 100), ('Base_A', 'Perto', 1)])
+    critica = dynamic.registrar_ocorrencia('Longe', 'CRITICA', 40, 10, 5)
+    baixa = dynamic.registrar_ocorrencia('Perto', 'BAIXA', 18, 90, 80)
+
+    resultado = {ocorrencia.ID: rota for ocorrencia, rota in dynamic.despachar_lote(2, {'Base_A': 1})}
+    assert resultado[critica.ID] == ('Base_A', 100, ['Base_A', 'Longe'])
+    assert resultado[baixa.ID] is None
+    assert baixa.ID in dynamic.fila_prioridade_atendimento
+
+
+def test_lote_maximiza_cobertura_por_severidade_antes_da_distancia(estado_simulador):
+    dynamic = estado_simulador
+    grafo = dynamic.rede_localizacoes_graph
+    grafo.clear()
+    # Base_A é a única que alcança a ALTA; a CRITICA também é alcançada por Base_B, mais longe
+    grafo.add_weighted_edges_from([('Base_A', 'Critica', 1), ('Base_B', 'Critica', 50), ('Base_A', 'Alta', 60),
+                                   ('Base_B', 'Baixa', 1)])
+    critica = dynamic.registrar_ocorrencia('Critica', 'CRITICA', 40, 10, 5)
+    alta = dynamic.registrar_ocorrencia('Alta', 'ALTA', 36, 20, 30)
+    baixa = dynamic.registrar_ocorrencia('Baixa', 'BAIXA', 18, 90, 80)
+
+    resultado = {ocorrencia.ID: rota for ocorrencia, rota in dynamic.despachar_lote(3, {'Base_A': 1, 'Base_B': 1})}
+    assert resultado[critica.ID][0] == 'Base_B'
+    assert resultado[alta.ID][0] == 'Base_A'
+    assert resultado[baixa.ID] is None
@@ -0,0 +1,29 @@
+import random
+
+import networkx as nx
+
+import dynamic
+
+
+def test_grafo_vazio_sobrevive_a_gravacao_binaria(tmp_path):
+    dynamic.GrafoCSR.de_networkx(nx.DiGraph()).salvar_binario(str(tmp_path))
+    grafo = dynamic.GrafoCSR.carregar_binario(str(tmp_path))
+    assert grafo.number_of_nodes() == 0
+    assert list(grafo.nodes) == []
+
+
+def test_csr_gravado_e_networkx_dao_as_mesmas_rotas(tmp_path):
+    rng = random.Random(5)
+    original = nx.DiGraph()
+    nomes = [f'Base_{i}' if i < 3 else f'Local_{i}' for i in range(40)]
+    original.add_nodes_from(nomes)
+    for _ in range(120):
+        original.add_edge(*rng.sample(nomes, 2), weight=rng.randint(0, 9))
+    dynamic.GrafoCSR.de_networkx(original).salvar_binario(str(tmp_path))
+    csr = dynamic.GrafoCSR.carregar_binario(str(tmp_path))
+
+    bases = dynamic.listar_bases(original)
+    distancias, _, raizes = dynamic._dijkstra_multi_origem(original, bases)
+    distancias_csr, _, raizes_csr = dynamic._dijkstra_multi_origem(csr, bases)
+    assert distancias_csr == distancias
+    assert raizes_csr == raizes
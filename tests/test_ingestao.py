@@ -0,0 +1,63 @@
+import json
+import math
+
+
+def test_csv_com_campos_vazios_nao_interrompe_a_ingestao(estado_simulador, tmp_path):
+    dynamic = estado_simulador
+    caminho = tmp_path / 'leituras.csv'
+    caminho.write_text(
+        "umid_solo,localizacao,temp,umid_ar\n"  # Colunas localizadas pelo cabeçalho
+        "5,Rio_Sereno,40,10\n"
+        "8.5,Rio_Sereno,,12.5\n"                # Sensor de temperatura sem valor
+        "5,Cidade_Inexistente,40,10\n"          # Fora do grafo
+        "80,Rio_Sereno,18,90\n"                 # BAIXA, abaixo do mínimo
+        "\n"
+        "5,Rio_Sereno\n",                       # Linha incompleta
+        encoding='utf-8')
+
+    assert list(dynamic.ler_leituras_csv(caminho))[0] == ('Rio_Sereno', 40, 10, 5)
+    estatisticas = dynamic.ingerir_arquivo(str(caminho), tamanho_lote=2, severidade_minima='MEDIA')
+
+    assert (estatisticas.leituras, estatisticas.registradas, estatisticas.rejeitadas) == (5, 2, 3)
+    assert estatisticas.lotes == 3
+    registradas = sorted(dynamic.ocorrencias_ativas, key=lambda o: o.ID)
+    assert [o.localizacao for o in registradas] == ['Rio_Sereno', 'Rio_Sereno']
+    assert registradas[0].temp == 40 and isinstance(registradas[0].temp, int)
+    assert math.isnan(registradas[1].temp) and registradas[1].umid_ar == 12.5
+    assert len(dynamic.fila_prioridade_atendimento) == 2
+
+
+def test_jsonl_com_valores_nulos_e_linhas_corrompidas(estado_simulador, tmp_path):
+    dynamic = estado_simulador
+    caminho = tmp_path / 'leituras.jsonl'
+    linhas = [
+        json.dumps({'localizacao': 'Rio_Sereno', 'temp': 40, 'umid_ar': 10, 'umid_solo': 5}),
+        json.dumps({'localizacao': 'Rio_Sereno', 'temp': None, 'umid_ar': 'x', 'umid_solo': 5}),
+        json.dumps({'temp': 40, 'umid_ar': 10, 'umid_solo': 5}),
+        '{"localizacao": "Rio_Sereno", ',
+        '[1, 2, 3]',
+        '',
+    ]
+    caminho.write_text("\n".join(linhas) + "\n", encoding='utf-8')
+
+    leituras = list(dynamic.ler_leituras_jsonl(caminho))
+    assert len(leituras) == 5
+    assert leituras[1][0] == 'Rio_Sereno' and math.isnan(leituras[1][1]) and math.isnan(leituras[1][2])
+
+    estatisticas = dynamic.ingerir_arquivo(str(caminho))
+    assert (estatisticas.leituras, estatisticas.registradas, estatisticas.rejeitadas, estatisticas.lotes) == (5, 2, 3, 1)
+
+
+def test_estatisticas_por_estagio(estado_simulador):
+    dynamic = estado_simulador
+    leituras = [('Rio_Sereno', 40, 10, 5)] * 7
+    estatisticas = dynamic.EstatisticasIngestao()
+    lotes = list(dynamic.pipeline_ingestao(leituras, tamanho_lote=3, estatisticas=estatisticas))
+
+    assert [len(lote) for lote in lotes] == [3, 3, 1]
+    assert (estatisticas.leituras, estatisticas.registradas, estatisticas.lotes) == (7, 7, 3)
+    assert min(estatisticas.tempo_leitura, estatisticas.tempo_pontuacao, estatisticas.tempo_registro) >= 0
+    vazoes = estatisticas.vazao_por_estagio()
+    assert set(vazoes) == {'leitura', 'pontuacao', 'registro', 'total'}
+    assert vazoes['total'] > 0
+    assert 'Registradas: 7' in estatisticas.resumo()
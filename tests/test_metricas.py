@@ -0,0 +1,28 @@
+import dynamic
+
+
+def test_formato_prometheus_dos_histogramas(estado_simulador):
+    metricas = dynamic.MetricasPyrosAI()
+    limites = dynamic.HistogramaLatencia.LIMITES
+    for segundos in (limites[2], limites[2] * 0.5, limites[5], 100.0): # O limite pertence ao próprio balde (le)
+        metricas.observar('estagio_fila', segundos)
+    metricas.incrementar('leituras_ingeridas', 3)
+    texto = metricas.formatar_prometheus()
+    linhas = texto.splitlines()
+
+    assert texto.endswith("\n")
+    assert "# TYPE pyrosai_estagio_fila_segundos histogram" in linhas
+    assert "# TYPE pyrosai_leituras_ingeridas_total counter" in linhas
+    assert "pyrosai_leituras_ingeridas_total 3.0" in linhas
+
+    baldes = [linha for linha in linhas if linha.startswith('pyrosai_estagio_fila_segundos_bucket')]
+    assert len(baldes) == len(limites) + 1
+    rotulos = [linha.split('le="')[1].split('"')[0] for linha in baldes]
+    assert [float(rotulo) for rotulo in rotulos[:-1]] == list(limites) # Sem perda na volta para float
+    assert rotulos[-1] == "+Inf"
+    acumulados = [int(linha.rsplit(' ', 1)[1]) for linha in baldes]
+    assert acumulados[:2] == [0, 0] and acumulados[2] == 2 and acumulados[5] == 3
+    assert acumulados[-2] == 3 and acumulados[-1] == 4
+    assert "pyrosai_estagio_fila_segundos_count 4" in linhas
+    soma = next(linha for linha in linhas if linha.startswith('pyrosai_estagio_fila_segundos_sum'))
+    assert float(soma.split()[1]) == limites[2] + limites[2] * 0.5 + limites[5] + 100.0
@@ -0,0 +1,86 @@
+def test_snapshot_preserva_equipes_das_bases(estado_simulador, tmp_path):
+    dynamic = estado_simulador
+    dynamic.ativar_persistencia(str(tmp_path))
+    dynamic.desativar_persistencia() # Grava o snapshot
+
+    dynamic.rede_localizacoes_graph.clear()
+    dynamic.ativar_persistencia(str(tmp_path))
+    assert dynamic.equipes_das_bases(dynamic.rede_localizacoes_graph) == {'Base_Alfa': 2, 'Base_Beta': 2}
+
+
+def _estado_atual(dynamic):
+    ocorrencias = sorted((o.ID, o.severidade_num, o.localizacao, o.status, o.timestamp_deteccao,
+                          o.temp, o.umid_ar, o.umid_solo) for o in dynamic.ocorrencias_ativas)
+    arestas = sorted((u, v, dados['weight']) for u, v, dados in dynamic.rede_localizacoes_graph.edges(data=True))
+    fila = sorted(dynamic.fila_prioridade_atendimento._entradas)
+    return ocorrencias, arestas, fila
+
+
+def test_snapshot_mais_cauda_do_log_reconstroi_o_estado(estado_simulador, tmp_path):
+    import random
+
+    dynamic = estado_simulador
+    rng = random.Random(3)
+    locais = list(dynamic.rede_localizacoes_graph.nodes)
+    # Snapshot a cada 7 registros: o estado final vem de um snapshot e de uma cauda de log
+    persistencia = dynamic.ativar_persistencia(str(tmp_path), intervalo_snapshot=7)
+    for _ in range(40):
+        ocorrencia = dynamic.registrar_ocorrencia(rng.choice(locais), rng.choice(list(dynamic.SEVERIDADES)),
+                                                  rng.randint(15, 45), rng.randint(5, 95), rng.uniform(0, 90))
+        acao = rng.random()
+        if acao < 0.3:
+            dynamic.alterar_status_ocorrencia(ocorrencia.ID, rng.choice(["EM_ATENDIMENTO", "SOB_CONTROLE", "EXTINTA"]))
+        elif acao < 0.5:
+            dynamic.escalonar_severidade_ocorrencia(ocorrencia.ID, rng.choice(list(dynamic.SEVERIDADES)))
+        elif acao < 0.6:
+            dynamic.alterar_status_ocorrencia(ocorrencia.ID, "EXTINTA")
+            dynamic.ocorrencias_ativas.remover_lote([ocorrencia.ID]) # Como faz o arquivamento
+    dynamic.alterar_rota('Rio_Sereno', 'Pico_Alto', 4.5)
+    dynamic.remover_rota('Floresta_Vermelha', 'Rio_Sereno')
+    dynamic.registrar_ocorrencia('Vila_Clara', 'ALTA', 36, 20, 30)
+    esperado = _estado_atual(dynamic)
+    assert persistencia._registros_desde_snapshot > 0
+
+    # Queda: sem snapshot final, com um registro parcial no fim do log
+    dynamic.ocorrencias_ativas.remover_observador(persistencia)
+    persistencia.fechar()
+    dynamic.persistencia_estado = None
+    with open(persistencia.caminho_log, 'ab') as log:
+        log.write(bytes([dynamic.OP_INSERCAO, 1, 2]))
+    dynamic.ocorrencias_ativas.limpar()
+    dynamic.rede_localizacoes_graph.clear()
+
+    dynamic.ativar_persistencia(str(tmp_path))
+    assert _estado_atual(dynamic) == esperado
+    proximo = dynamic.registrar_ocorrencia('Rio_Sereno', 'BAIXA', 18, 90, 80)
+    assert proximo.ID > max(ocorrencia[0] for ocorrencia in esperado[0])
+
+
+def _reiniciar_sem_arquivo(dynamic, tmp_path, com_snapshot: bool):
+    persistencia = dynamic.persistencia_estado
+    if com_snapshot:
+        dynamic.desativar_persistencia()
+    else: # Queda: o arquivamento só está na cauda do log
+        dynamic.ocorrencias_ativas.remover_observador(persistencia)
+        persistencia.fechar()
+        dynamic.persistencia_estado = None
+    dynamic.desativar_arquivamento()
+    dynamic.ocorrencias_ativas.limpar()
+    dynamic.ativar_persistencia(str(tmp_path))
+
+
+def test_id_arquivado_nao_e_reutilizado_apos_reinicio(estado_simulador, tmp_path):
+    dynamic = estado_simulador
+    for com_snapshot in (True, False):
+        diretorio = tmp_path / str(com_snapshot)
+        dynamic.ativar_persistencia(str(diretorio))
+        dynamic.ativar_arquivamento(str(diretorio / 'arquivo.db'), automatico=False)
+        primeira = dynamic.registrar_ocorrencia('Rio_Sereno', 'ALTA', 36, 20, 30)
+        arquivada = dynamic.registrar_ocorrencia('Vila_Clara', 'MEDIA', 30, 40, 30)
+        assert dynamic.arquivar_ocorrencias([arquivada.ID]) == 1
+
+        _reiniciar_sem_arquivo(dynamic, diretorio, com_snapshot)
+        assert [o.ID for o in dynamic.ocorrencias_ativas] == [primeira.ID]
+        assert dynamic.registrar_ocorrencia('Pico_Alto', 'BAIXA', 18, 90, 80).ID == arquivada.ID + 1
+        dynamic.desativar_persistencia()
+        dynamic.ocorrencias_ativas.limpar()
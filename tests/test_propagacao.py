@@ -0,0 +1,57 @@
+import numpy as np
+
+import dynamic
+
+
+def _executar(seed, clima):
+    dynamic.ocorrencias_ativas.limpar()
+    dynamic.fila_prioridade_atendimento.limpar()
+    simulador = dynamic.SimuladorPropagacaoFogo(*clima, seed=seed)
+    ocorrencias = simulador.ignitar_aleatorio(4) + simulador.executar(30)
+    resumo = [(o.localizacao, o.severidade_num, o.temp, o.umid_ar, o.umid_solo) for o in ocorrencias]
+    return simulador.estado.copy(), simulador.passos, resumo
+
+
+def test_propagacao_reproduzivel_com_a_mesma_semente(estado_simulador):
+    clima = dynamic.gerar_clima_sintetico(96, 96, resolucao=8, seed=1)
+    estado, passos, ocorrencias = _executar(7, clima)
+    assert np.count_nonzero(estado) > 4 and ocorrencias
+
+    repetido = _executar(7, clima)
+    assert np.array_equal(repetido[0], estado) and repetido[1:] == (passos, ocorrencias)
+
+    outra_semente = _executar(8, clima)
+    assert not np.array_equal(outra_semente[0], estado)
+
+
+def test_uma_ocorrencia_por_regiao_que_pega_fogo(estado_simulador):
+    temperaturas = np.full((4, 4), 22.0)
+    temperaturas[0, 1] = 40.0 # Célula mais crítica da região 0
+    umidades_ar, umidades_solo = np.full((4, 4), 40.0), np.full((4, 4), 30.0)
+    mapa = np.array([[0, 0, 1, 1],
+                     [0, 0, 1, 1],
+                     [0, 0, 1, 1],
+                     [-1, -1, -1, -1]]) # Última linha fora da rede monitorada
+    simulador = dynamic.SimuladorPropagacaoFogo(temperaturas, umidades_ar, umidades_solo,
+                                                nos=['Rio_Sereno', 'Vila_Clara'], mapa_regioes=mapa, seed=0)
+
+    ocorrencias = simulador.ignitar([0, 0, 1, 3], [0, 1, 0, 0])
+    assert len(ocorrencias) == 1
+    assert ocorrencias[0].localizacao == 'Rio_Sereno' and ocorrencias[0].temp == 40.0
+    assert ocorrencias[0].severidade_num == int(simulador.codigos[0, 1])
+    assert simulador.celulas_queimando == 4
+
+    # Região já em chamas não gera nova ocorrência; a que acabou de pegar fogo gera uma só
+    ocorrencias = simulador.ignitar([2, 0, 1], [0, 2, 3])
+    assert [o.localizacao for o in ocorrencias] == ['Vila_Clara']
+    assert len(dynamic.ocorrencias_ativas) == 2
+    assert {o.ID for o in dynamic.ocorrencias_ativas} == {1, 2}
+    assert len(dynamic.fila_prioridade_atendimento) == 2
+    assert simulador.ignitar([3], [3]) == []
+
+    for _ in range(10):
+        queimando_antes = set(simulador.mapa_regioes[simulador.estado == dynamic.CELULA_QUEIMANDO].tolist())
+        novas = simulador.passo()
+        locais = [o.localizacao for o in novas]
+        assert len(locais) == len(set(locais))
+        assert all(simulador.nos.index(local) not in queimando_antes for local in locais)
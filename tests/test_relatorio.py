@@ -0,0 +1,65 @@
+import csv
+import json
+import random
+
+import pytest
+
+
+def _popular(dynamic, quantidade=60):
+    rng = random.Random(9)
+    locais = ['Rio_Sereno', 'Vila_Clara', 'Pico_Alto', 'Bosque_Azul']
+    for _ in range(quantidade):
+        ocorrencia = dynamic.registrar_ocorrencia(rng.choice(locais), rng.choice(list(dynamic.SEVERIDADES)),
+                                                  rng.randint(15, 45), rng.randint(5, 95), rng.uniform(0, 90))
+        if rng.random() < 0.5:
+            dynamic.alterar_status_ocorrencia(ocorrencia.ID, rng.choice(dynamic.STATUS_OCORRENCIA[1:]))
+
+
+def _esperado(dynamic):
+    # Varredura completa: agrupado por localização (ordem da primeira ocorrência), depois por ID
+    ordem_locais = list(dict.fromkeys(o.localizacao for o in sorted(dynamic.ocorrencias_ativas, key=lambda o: o.ID)))
+    return [(o.localizacao, o.ID, o.severidade, o.status, o.timestamp_deteccao, o.temp, o.umid_ar, o.umid_solo)
+            for local in ordem_locais
+            for o in sorted(dynamic.ocorrencias_ativas, key=lambda o: o.ID) if o.localizacao == local]
+
+
+def test_exportacao_csv_em_blocos(estado_simulador, tmp_path):
+    dynamic = estado_simulador
+    _popular(dynamic)
+    caminho = tmp_path / 'relatorio.csv'
+    assert dynamic.exportar_relatorio_detalhado(str(caminho), tamanho_bloco=7) == 60
+
+    with open(caminho, newline='', encoding='utf-8') as arquivo:
+        linhas = list(csv.reader(arquivo))
+    assert tuple(linhas[0]) == dynamic.CAMPOS_RELATORIO
+    assert linhas[1:] == [[str(valor) for valor in linha] for linha in _esperado(dynamic)]
+
+
+def test_exportacao_jsonl_e_formato_explicito(estado_simulador, tmp_path):
+    dynamic = estado_simulador
+    _popular(dynamic)
+    caminho = tmp_path / 'relatorio.txt'
+    with pytest.raises(ValueError):
+        dynamic.exportar_relatorio_detalhado(str(caminho))
+    assert dynamic.exportar_relatorio_detalhado(str(caminho), formato='jsonl', tamanho_bloco=16) == 60
+
+    with open(caminho, encoding='utf-8') as arquivo:
+        registros = [json.loads(linha) for linha in arquivo]
+    assert registros == [dict(zip(dynamic.CAMPOS_RELATORIO, linha)) for linha in _esperado(dynamic)]
+
+
+def test_resumo_e_relatorio_iguais_a_varredura_completa(estado_simulador):
+    dynamic = estado_simulador
+    _popular(dynamic, 200)
+    todas = sorted(dynamic.ocorrencias_ativas, key=lambda o: o.ID)
+
+    resumo = {}
+    for o in todas:
+        resumo.setdefault(o.localizacao, {}).setdefault(o.status, 0)
+        resumo[o.localizacao][o.status] += 1
+    assert dynamic.montar_resumo_por_localizacao() == resumo
+
+    relatorio = dynamic.montar_relatorio_por_localizacao()
+    assert list(relatorio) == list(dict.fromkeys(o.localizacao for o in todas))
+    assert relatorio == {local: [o for o in todas if o.localizacao == local] for local in relatorio}
+    assert sum(map(len, relatorio.values())) == len(todas)
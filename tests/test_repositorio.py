@@ -0,0 +1,67 @@
+import random
+from collections import Counter
+
+import dynamic
+
+
+def _conferir_com_varredura(repositorio):
+    todas = sorted(repositorio, key=lambda o: o.ID)
+    assert len(repositorio) == len(todas)
+    for severidade_num in dynamic.NOMES_SEVERIDADE:
+        assert repositorio.por_severidade(severidade_num) == [
+            o for o in todas if o.severidade_num == severidade_num and o.status != "EXTINTA"]
+        assert repositorio.por_severidade(severidade_num, incluir_extintas=True) == [
+            o for o in todas if o.severidade_num == severidade_num]
+    for status in dynamic.STATUS_OCORRENCIA:
+        assert repositorio.por_status(status) == [o for o in todas if o.status == status]
+    assert repositorio.ativas() == [o for o in todas if o.status != "EXTINTA"]
+
+    locais = {o.localizacao for o in todas}
+    assert set(repositorio.localizacoes()) == locais
+    for local in locais:
+        assert sorted(repositorio.por_localizacao(local), key=lambda o: o.ID) == [o for o in todas if o.localizacao == local]
+        assert sorted(repositorio.ids_por_localizacao(local)) == [o.ID for o in todas if o.localizacao == local]
+
+    # Contadores sem chaves zeradas: iguais aos de uma contagem completa
+    por_local = {}
+    for (local, status), quantidade in Counter((o.localizacao, o.status) for o in todas).items():
+        por_local.setdefault(local, {})[status] = quantidade
+    assert repositorio.contagem_por_localizacao() == por_local
+    assert repositorio.contagem_por_severidade_status() == dict(Counter((o.severidade_num, o.status) for o in todas))
+    if todas:
+        assert repositorio.proximo_id > todas[-1].ID
+
+
+def test_indices_e_contadores_acompanham_insercao_mudanca_e_remocao():
+    rng = random.Random(5)
+    repositorio = dynamic.RepositorioOcorrencias()
+    locais = ['Rio_Sereno', 'Vila_Clara', 'Pico_Alto', 'Bosque_Azul']
+
+    def nova(ocorrencia_id=None):
+        return dynamic.Ocorrencia(ocorrencia_id or repositorio.reservar_ids(), rng.choice(list(dynamic.NOMES_SEVERIDADE)),
+                                  rng.choice(locais), rng.choice(dynamic.STATUS_OCORRENCIA), 0.0, 30, 40, 30)
+
+    for passo in range(400):
+        ids = [o.ID for o in repositorio]
+        acao = rng.random()
+        if acao < 0.25 or not ids:
+            repositorio.adicionar(nova())
+        elif acao < 0.35:
+            primeiro = repositorio.reservar_ids(5)
+            repositorio.adicionar_lote([nova(primeiro + i) for i in range(5)])
+        elif acao < 0.45:
+            repositorio.adicionar(nova(rng.choice(ids))) # Substitui um registro existente
+        elif acao < 0.65:
+            repositorio.atualizar_status(rng.choice(ids), rng.choice(dynamic.STATUS_OCORRENCIA))
+        elif acao < 0.8:
+            repositorio.atualizar_severidade(rng.choice(ids), rng.choice(list(dynamic.NOMES_SEVERIDADE)))
+        else:
+            assert len(repositorio.remover_lote(rng.sample(ids, min(3, len(ids))) + [-1])) == min(3, len(ids))
+        if passo % 20 == 0:
+            _conferir_com_varredura(repositorio)
+    _conferir_com_varredura(repositorio)
+
+    for ocorrencia_id in [o.ID for o in repositorio]:
+        repositorio.remover_lote([ocorrencia_id])
+    _conferir_com_varredura(repositorio)
+    assert repositorio.contagem_por_localizacao() == {} and repositorio.contagem_por_severidade_status() == {}
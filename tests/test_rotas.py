@@ -0,0 +1,119 @@
+import pytest
+
+
+def test_edicao_direta_do_grafo_invalida_a_tabela(estado_simulador):
+    dynamic = estado_simulador
+    grafo, roteador = dynamic.rede_localizacoes_graph, dynamic.roteador_pyrosai
+    assert roteador.base_mais_proxima('Rio_Sereno')[1] == 17
+
+    grafo.remove_edge('Floresta_Vermelha', 'Rio_Sereno')
+    assert roteador.base_mais_proxima('Rio_Sereno')[1] == 30
+
+    grafo.add_edge('Base_Beta', 'Rio_Sereno', weight=2)
+    assert roteador.base_mais_proxima('Rio_Sereno') == ('Base_Beta', 2, ['Base_Beta', 'Rio_Sereno'])
+
+
+def test_lote_invalido_nao_altera_grafo_nem_rotas(estado_simulador):
+    import networkx as nx
+
+    dynamic = estado_simulador
+    assert dynamic.roteador_pyrosai.base_mais_proxima('Rio_Sereno')[1] == 17
+    with pytest.raises(nx.NetworkXError):
+        dynamic.atualizar_rotas_em_lote([('Floresta_Vermelha', 'Rio_Sereno', None), ('Rio_Sereno', 'Nao_Existe', None)])
+    assert dynamic.rede_localizacoes_graph.has_edge('Floresta_Vermelha', 'Rio_Sereno')
+    assert dynamic.roteador_pyrosai.base_mais_proxima('Rio_Sereno')[1] == 17
+
+    # Itens anteriores do mesmo lote contam na validação
+    dynamic.atualizar_rotas_em_lote([('Base_Beta', 'Rio_Sereno', 3), ('Base_Beta', 'Rio_Sereno', None)])
+    assert dynamic.roteador_pyrosai.base_mais_proxima('Rio_Sereno')[1] == 17
+
+
+def _grafo_aleatorio(dynamic, rng):
+    grafo = dynamic.GrafoLocalizacoes()
+    quantidade = rng.randint(6, 25)
+    nomes = [f'Base_{i}' if i < rng.randint(1, 4) else f'Local_{i}' for i in range(quantidade)]
+    grafo.add_nodes_from(nomes)
+    for _ in range(rng.randint(quantidade, 4 * quantidade)):
+        origem, destino = rng.sample(nomes, 2)
+        grafo.add_edge(origem, destino, weight=rng.choice([0, rng.randint(1, 9), rng.uniform(0, 9)]))
+    return grafo, nomes
+
+
+def test_reparo_incremental_igual_ao_recalculo_completo():
+    import random
+
+    import dynamic
+
+    rng = random.Random(12)
+    for _ in range(300):
+        grafo, nomes = _grafo_aleatorio(dynamic, rng)
+        roteador = dynamic.RoteadorPyrosAI(grafo)
+        roteador._garantir_tabela()
+        for _ in range(3):
+            lote = []
+            for _ in range(rng.randint(1, 6)):
+                arestas = list(grafo.edges)
+                acao = rng.random()
+                if arestas and acao < 0.35:
+                    lote.append((*rng.choice(arestas), None))
+                elif arestas and acao < 0.7:
+                    lote.append((*rng.choice(arestas), rng.choice([0, rng.randint(1, 12)])))
+                else:
+                    lote.append((*rng.sample(nomes, 2), rng.randint(0, 9)))
+                # Como na validação do roteador: só remove arestas que existem após os itens anteriores
+                origem, destino, peso = lote[-1]
+                anteriores = [item[2] for item in lote[:-1] if item[:2] == (origem, destino)]
+                if peso is None and anteriores and anteriores[-1] is None:
+                    lote.pop()
+            roteador.aplicar_atualizacoes(lote)
+            assert roteador._assinatura == roteador._assinatura_grafo() # Reparado, não recalculado
+
+            distancias, predecessores, raizes = roteador._tabela
+            esperado_dist, _, esperado_raizes = dynamic._dijkstra_multi_origem(grafo, dynamic.listar_bases(grafo))
+            assert distancias == esperado_dist
+            assert raizes == esperado_raizes
+            for no, predecessor in predecessores.items():
+                if predecessor is not None:
+                    assert distancias[no] == distancias[predecessor] + grafo[predecessor][no]['weight']
+
+
+def test_roteamento_paralelo_preserva_a_ordem_e_indica_rotas_ausentes():
+    import random
+
+    import networkx as nx
+
+    import dynamic
+
+    rng = random.Random(4)
+    grafo = dynamic.GrafoLocalizacoes()
+    nomes = [f'Local_{i}' for i in range(40)]
+    grafo.add_nodes_from(nomes + ['Ilhado'])
+    for _ in range(120):
+        origem, destino = rng.sample(nomes, 2)
+        grafo.add_edge(origem, destino, weight=rng.uniform(1, 9)) # Pesos reais: sem empates de caminho
+
+    consultas = [tuple(rng.sample(nomes, 2)) for _ in range(150)]
+    consultas += [('Ilhado', 'Local_0'), ('Local_0', 'Ilhado'), ('Nao_Existe', 'Local_1'), (consultas[0][0], consultas[0][0])]
+    rng.shuffle(consultas)
+
+    esperado = []
+    for origem, destino in consultas:
+        try:
+            distancia, caminho = nx.single_source_dijkstra(grafo, origem, destino)
+            esperado.append((caminho, distancia))
+        except (nx.NetworkXNoPath, nx.NodeNotFound):
+            esperado.append(None)
+    assert None in esperado and esperado.count(None) < len(esperado)
+
+    for backend in (grafo, dynamic.GrafoCSR.de_networkx(grafo)):
+        with dynamic.RoteamentoParalelo(backend, processos=2) as roteamento:
+            resultados = roteamento.calcular_rotas(consultas, blocos_por_processo=3)
+            assert roteamento.calcular_rotas([]) == []
+        assert len(resultados) == len(consultas)
+        for (origem, destino), resultado, referencia in zip(consultas, resultados, esperado):
+            if referencia is None:
+                assert resultado is None, (origem, destino)
+            else:
+                caminho, distancia = resultado
+                assert caminho == referencia[0] and caminho[0] == origem and caminho[-1] == destino
+                assert distancia == pytest.approx(referencia[1])
@@ -0,0 +1,27 @@
+import asyncio
+
+import pytest
+
+
+def _leituras(quantidade, local='Rio_Sereno'):
+    return [(local, 30, 40, 20)] * quantidade
+
+
+def test_servico_despacha_e_encerra_com_ocorrencias_sem_rota(estado_simulador):
+    dynamic = estado_simulador
+    servico = dynamic.ServicoDespachoAsync(capacidade_fila=16, tamanho_lote=8)
+    # Nenhuma base alcança a Estrada_Principal: essas ocorrências não contam como despachadas
+    feeds = [_leituras(50), _leituras(30, 'Estrada_Principal')]
+    resumo = asyncio.run(asyncio.wait_for(servico.executar(feeds), 5))
+    assert resumo['registradas'] == 80
+    assert resumo['despachadas'] == 50
+    assert len(dynamic.fila_prioridade_atendimento) == 30
+
+
+def test_falha_na_pontuacao_encerra_o_servico_com_a_excecao(estado_simulador):
+    dynamic = estado_simulador
+    servico = dynamic.ServicoDespachoAsync(capacidade_fila=4, tamanho_lote=2)
+    # Uma leitura inválida derruba a pontuação com a fila limitada cheia atrás dela
+    feeds = [[('Rio_Sereno', 'sem leitura', 40, 20)] + _leituras(100)]
+    with pytest.raises(TypeError):
+        asyncio.run(asyncio.wait_for(servico.executar(feeds), 5))
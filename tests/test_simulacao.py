@@ -0,0 +1,37 @@
+import os
+
+import pytest
+
+
+def test_simulacao_reproduzivel_e_isolada_do_estado_operacional(estado_simulador, tmp_path):
+    dynamic = estado_simulador
+    dynamic.ativar_persistencia(str(tmp_path))
+    operacional = dynamic.registrar_ocorrencia('Rio_Sereno', 'ALTA', 36, 20, 30)
+    tamanho_log = os.path.getsize(dynamic.persistencia_estado.caminho_log)
+
+    resumos = []
+    for _ in range(2):
+        simulacao = dynamic.SimulacaoEventosDiscretos(deteccoes_por_hora=0.5, seed=11)
+        resumo = simulacao.executar(14)
+        resumo.pop('segundos_reais')
+        resumos.append(resumo)
+    assert resumos[0] == resumos[1]
+    assert resumos[0]['deteccoes'] > 100
+    assert len(simulacao.repositorio) == resumos[0]['deteccoes']
+
+    assert list(dynamic.ocorrencias_ativas) == [operacional]
+    assert list(dynamic.fila_prioridade_atendimento._entradas) == [operacional.ID]
+    assert os.path.getsize(dynamic.persistencia_estado.caminho_log) == tamanho_log
+
+
+def test_execucoes_repetidas_acumulam_o_tempo_simulado(estado_simulador):
+    dynamic = estado_simulador
+    continua = dynamic.SimulacaoEventosDiscretos(deteccoes_por_hora=0.5, seed=3)
+    continua.executar(7)
+    resumo = continua.executar(7)
+    assert resumo['dias_simulados'] == 14
+    assert 0.0 <= resumo['ocupacao_equipes'] <= 1.0
+
+    unica = dynamic.SimulacaoEventosDiscretos(deteccoes_por_hora=0.5, seed=3).executar(14)
+    assert resumo['ocupacao_equipes'] == pytest.approx(unica['ocupacao_equipes'])
+    assert resumo['deteccoes'] == unica['deteccoes']